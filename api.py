@@ -1,31 +1,53 @@
 from fastapi import FastAPI, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 import tempfile
+import shutil
 import os
 
-from core.preprocess import preprocess_audio
-from core.transcription import transcribe
-from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics_with_labels
+from core.executor import AnalysisExecutor, analysis_job
+from core.cache import PipelineCache
+from core.uploads import UploadTooLarge, safe_filename, save_upload
 
 app = FastAPI(title="Podcast Intelligence API")
+pipeline_cache = PipelineCache()
+
+# Analysis runs in worker processes so the event loop keeps serving requests
+analysis_executor = AnalysisExecutor()
+
+
+@app.on_event("startup")
+def start_workers():
+    analysis_executor.start()
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    analysis_executor.shutdown()
 
 
 @app.post("/analyze")
 async def analyze_podcast(file: UploadFile = File(...)):
-    # Save uploaded file
+    # Save uploaded file in chunks (hashed on the way, size-limited)
     temp_dir = tempfile.mkdtemp()
-    audio_path = os.path.join(temp_dir, file.filename)
+    audio_path = os.path.join(temp_dir, safe_filename(file.filename))
 
-    with open(audio_path, "wb") as f:
-        f.write(await file.read())
+    try:
+        try:
+            audio_hash, _ = await run_in_threadpool(save_upload, file.file, audio_path)
+        except UploadTooLarge as e:
+            return JSONResponse(status_code=413, content={"error": str(e)})
 
-    # Pipeline
-    processed_audio = preprocess_audio(audio_path)
-    sentences = transcribe(processed_audio)
-    embeddings = get_embeddings(sentences)
-    topics = segment_topics_with_labels(sentences, embeddings)
+        # Pipeline (stages already computed for this audio come from the cache)
+        result, cache_counts = await analysis_executor.run(
+            analysis_job, audio_path, {"audio_hash": audio_hash}, None
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    if cache_counts:
+        pipeline_cache.merge_counts(cache_counts)
 
     return {
-        "transcription": " ".join(s["text"] for s in sentences),
-        "chapters": topics
+        "transcription": result["full_text"],
+        "chapters": result["topics"]
     }
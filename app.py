@@ -7,12 +7,20 @@ import shutil
 from datetime import datetime
 
 # --- IMPORTING CORE HELPERS ---
+# (the analysis pipeline runs in the backend, so no model modules are imported here)
 from core.audio_loader import download_youtube_audio
-from core.preprocess import preprocess_audio
-from core.transcription import transcribe
-from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics_with_labels
-from core.exporter import export_to_json, export_to_pdf
+
+def download_export(backend_url, task_id, fmt, output_path):
+    """
+    Stream a backend export to disk in chunks; None if it isn't available
+    """
+    with requests.get(f"{backend_url}/export/{task_id}/{fmt}", stream=True, timeout=300) as res:
+        if res.status_code != 200:
+            return None
+        with open(output_path, "wb") as f:
+            for chunk in res.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+    return output_path
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -319,29 +327,32 @@ if st.session_state.audio_path:
                 st.error(f"Could not connect to Backend: {e}")
                 st.stop()
 
-        # 2. THE WAITING ROOM (Polling)
+        # 2. THE WAITING ROOM (long-poll: the backend answers as soon as the job changes)
         status_text = st.empty()
         progress_bar = st.progress(0)
+        version = None
         
         while True:
             try:
                 BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000")
-                check = requests.get(f"{BACKEND_URL}/status/{task_id}").json()
+                params = {"version": version, "wait": 25} if version is not None else {}
+                check = requests.get(f"{BACKEND_URL}/status/{task_id}", params=params, timeout=60).json()
                 status = check.get("status")
+                version = check.get("version")
                 
                 if status == "completed":
-                    st.session_state.full_text = check["result"]["full_text"]
-                    st.session_state.topics = check["result"]["topics"]
+                    result = requests.get(
+                        f"{BACKEND_URL}/result/{task_id}", params={"include": "topics,full_text", "topic_fields": "label,start,end,summary,sentiment"}, timeout=60
+                    ).json()
+                    st.session_state.full_text = result["full_text"]
+                    st.session_state.topics = result["topics"]
                     st.session_state.analysis_done = True
                     
-                    # Generate files
+                    # Fetch the exports the backend renders (once per task)
                     os.makedirs("outputs", exist_ok=True)
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    st.session_state.json_path = f"outputs/chapters_{timestamp}.json"
-                    st.session_state.pdf_path = f"outputs/chapters_{timestamp}.pdf"
-
-                    export_to_json(st.session_state.topics, st.session_state.json_path)
-                    export_to_pdf(st.session_state.topics, st.session_state.full_text, st.session_state.pdf_path)
+                    st.session_state.json_path = download_export(BACKEND_URL, task_id, "json", f"outputs/chapters_{timestamp}.json")
+                    st.session_state.pdf_path = download_export(BACKEND_URL, task_id, "pdf", f"outputs/chapters_{timestamp}.pdf")
 
                     st.success("Analysis Complete! ✅")
                     st.rerun() 
@@ -357,7 +368,8 @@ if st.session_state.audio_path:
             except Exception as e:
                 st.error(f"Connection lost: {e}")
                 break
-            time.sleep(5)
+            if version is None:
+                time.sleep(1)  # task not visible yet; nothing to long-poll on
 
 # =================================================
 # DISPLAY RESULTS (Polished)
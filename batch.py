@@ -0,0 +1,76 @@
+"""
+Batch-process many episodes from the command line.
+
+    python batch.py data/ --out outputs/batch
+    python batch.py episodes.txt more/episode.mp3 --out outputs/batch --whisper-model tiny
+
+Inputs are directories, audio files or .txt manifests (one path per line).
+Results go to <out>/results/<name>-<hash>.json; <out>/manifest.jsonl is the
+checkpoint log, so re-running the same command after a crash or Ctrl-C
+picks up where it stopped.
+"""
+import argparse
+import sys
+
+from core.batch import (
+    BATCH_ANALYZE_WORKERS, BATCH_DECODE_WORKERS, BATCH_PREFETCH, DONE, collect_inputs, run_batch,
+)
+from core.topic_segmentation import SEGMENTERS
+from core.transcription_backends import BACKENDS, WHISPER_MODEL_SIZES
+
+
+def print_record(record):
+    if record["status"] == DONE:
+        print(
+            f"✅ {record['path']}  {record['audio_seconds'] / 60:.1f} min audio, "
+            f"{record['topics']} topics in {record['seconds']:.1f}s"
+        )
+    else:
+        print(f"❌ {record['path']}: {record['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="directories, audio files or .txt manifests")
+    parser.add_argument("--out", default="outputs/batch", help="results + checkpoint directory")
+    parser.add_argument("--recursive", action="store_true", help="descend into sub-directories")
+    parser.add_argument("--decode-workers", type=int, default=BATCH_DECODE_WORKERS)
+    parser.add_argument("--prefetch", type=int, default=BATCH_PREFETCH, help="decoded episodes held ahead")
+    parser.add_argument("--analyze-workers", type=int, default=BATCH_ANALYZE_WORKERS)
+    parser.add_argument("--transcribe-backend", choices=sorted(BACKENDS))
+    parser.add_argument("--whisper-model", choices=WHISPER_MODEL_SIZES)
+    parser.add_argument("--threshold", type=float, default=0.65)
+    parser.add_argument("--window", type=int)
+    parser.add_argument("--segmenter", choices=SEGMENTERS, help="topic segmentation engine (default: TOPIC_SEGMENTER)")
+    parser.add_argument("--skip-failed", action="store_true", help="don't retry files that failed before")
+    args = parser.parse_args(argv)
+
+    files = collect_inputs(args.inputs, recursive=args.recursive)
+    if not files:
+        sys.exit("No audio files found")
+    print(f"🔹 {len(files)} files → {args.out}")
+
+    summary = run_batch(
+        files, args.out,
+        decode_workers=args.decode_workers,
+        prefetch=args.prefetch,
+        analyze_workers=args.analyze_workers,
+        transcribe_backend=args.transcribe_backend,
+        whisper_model=args.whisper_model,
+        threshold=args.threshold,
+        window=args.window,
+        segmenter=args.segmenter,
+        retry_failed=not args.skip_failed,
+        on_file=print_record,
+    )
+
+    print(
+        f"\n📊 {summary['done']} done, {summary['failed']} failed, {summary['skipped']} already done | "
+        f"{summary['audio_seconds'] / 3600:.2f} audio-hours in {summary['wall_seconds'] / 3600:.3f} wall-hours "
+        f"= {summary['audio_hours_per_wall_hour']} audio-hours per wall-hour"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
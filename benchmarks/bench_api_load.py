@@ -0,0 +1,97 @@
+"""
+Load test: do /status and /chat stay fast while episodes are being analyzed?
+
+Measures request latency against a running server twice, first while it is
+idle and then while `--analyses` uploads of `--audio` are being processed.
+With analysis in worker processes the two should be close; when it ran on
+the event loop, /status stalled for the length of a whole stage.
+
+Start the server (dedupe off: every upload is the same file), then run from the repo root:
+    UPLOAD_DEDUPE=0 uvicorn main:app --port 8000
+    python -m benchmarks.bench_api_load --audio sample.mp3 --analyses 2 --chat-task <completed task id>
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ms = np.asarray(samples) * 1000
+    return {
+        "n": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+
+
+def timed(method, url, **kwargs):
+    t0 = time.perf_counter()
+    response = requests.request(method, url, timeout=120, **kwargs)
+    response.raise_for_status()
+    return time.perf_counter() - t0
+
+
+def hammer(base, task_id, chat_task, seconds, clients):
+    """
+    `clients` threads each loop over GET /status (and POST /chat when a
+    completed task is given) for `seconds`; returns latencies per endpoint.
+    """
+    latencies = {"status": [], "chat": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(n):
+        while time.perf_counter() < deadline:
+            if chat_task and n == 0:
+                name, took = "chat", timed(
+                    "POST", f"{base}/chat", json={"task_id": chat_task, "query": "What is the main topic?"}
+                )
+            else:
+                name, took = "status", timed("GET", f"{base}/status/{task_id}")
+            with lock:
+                latencies[name].append(took)
+
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(client, range(clients)))
+
+    return {name: percentiles(samples) for name, samples in latencies.items() if samples}
+
+
+def submit(base, audio):
+    with open(audio, "rb") as f:
+        response = requests.post(f"{base}/analyze", files={"file": (os.path.basename(audio), f)}, timeout=600)
+    response.raise_for_status()
+    return response.json()["task_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--audio", required=True, help="episode to upload for the concurrent analyses")
+    parser.add_argument("--analyses", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--chat-task", help="completed task id to exercise /chat as well")
+    args = parser.parse_args()
+
+    idle = hammer(args.url, "missing", args.chat_task, args.seconds, args.clients)
+    print(json.dumps({"phase": "idle", **idle}))
+
+    task_ids = [submit(args.url, args.audio) for _ in range(args.analyses)]
+    loaded = hammer(args.url, task_ids[0], args.chat_task, args.seconds, args.clients)
+    states = [requests.get(f"{args.url}/status/{t}", timeout=30).json().get("status") for t in task_ids]
+    print(json.dumps({"phase": "analyzing", "analyses": args.analyses, "job_states": states, **loaded}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: per-pair sklearn cosine loop vs batched boundary detection.
+
+Run from the repo root:
+    python -m benchmarks.bench_boundary_detection
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from core.boundary_detection import detect_boundaries
+
+DIM = 384
+
+
+def legacy_boundaries(embeddings, threshold):
+    boundaries = []
+    for i in range(1, len(embeddings)):
+        sim = cosine_similarity(
+            embeddings[i - 1].reshape(1, -1),
+            embeddings[i].reshape(1, -1)
+        )[0][0]
+        if sim < threshold:
+            boundaries.append(i)
+    return np.array(boundaries, dtype=np.int64)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--threshold", type=float, default=0.65)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'n':>8} {'legacy (s)':>12} {'batched (s)':>12} {'windowed (s)':>13} {'speedup':>9}")
+    for n in args.sizes:
+        # Random walk so neighbours are correlated, like real transcripts
+        steps = rng.normal(size=(n, DIM)).astype(np.float32)
+        embeddings = np.cumsum(steps, axis=0) * 0.05 + steps
+
+        legacy_t, legacy = timed(lambda: legacy_boundaries(embeddings, args.threshold), 1)
+        batched_t, batched = timed(lambda: detect_boundaries(embeddings, args.threshold), args.repeat)
+        windowed_t, _ = timed(lambda: detect_boundaries(embeddings, window=3), args.repeat)
+
+        assert np.array_equal(legacy, batched), "batched boundaries differ from legacy loop"
+        print(f"{n:>8} {legacy_t:>12.4f} {batched_t:>12.4f} {windowed_t:>13.4f} {legacy_t / batched_t:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
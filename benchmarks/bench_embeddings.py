@@ -0,0 +1,119 @@
+"""
+Embedding throughput: the old fixed batch_size=8 in transcript order vs.
+length-bucketed batches from a token budget, per backend.
+
+Each backend loads in a fresh interpreter (EMBEDDING_BACKEND is read at
+import) and the embedding cache is off, so every sentence is really
+encoded. Run from the repo root where the models are installed:
+    python -m benchmarks.bench_embeddings --backends torch int8 onnx --threads 1 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+CHILD = r"""
+import json, sys, time
+import numpy as np
+from benchmarks.synthetic import synthetic_podcast
+from core.model_registry import get_model
+from core.embeddings import encode_uncached
+
+n_sentences, threads, repeat = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+rng = np.random.default_rng(0)
+podcast = synthetic_podcast(minutes=n_sentences * 4 / 60, seed=0)
+texts = [s["text"] for s in podcast["sentences"]][:n_sentences]
+# real transcripts mix one-word replies with long turns
+for i in rng.choice(len(texts), len(texts) // 3, replace=False):
+    texts[i] = rng.choice(["Yeah.", "Right.", "Exactly.", "Mm-hmm.", "Sure, sure."])
+for i in rng.choice(len(texts), len(texts) // 10, replace=False):
+    texts[i] = " ".join([texts[i]] * 5)
+
+model = get_model("sentence_transformer")
+import torch
+torch.set_num_threads(threads)
+
+def legacy():
+    return np.asarray(model.encode(texts, batch_size=8, show_progress_bar=False), dtype=np.float32)
+
+def bucketed():
+    return encode_uncached(texts, threads=threads)
+
+legacy(); bucketed()  # warm-up
+out = {}
+for name, fn in (("fixed_batch_8", legacy), ("bucketed", bucketed)):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        emb = fn()
+        best = min(best, time.perf_counter() - t0)
+    out[name] = {"seconds": round(best, 4), "sentences_per_s": round(len(texts) / best, 1), "emb": emb}
+
+a, b = out["fixed_batch_8"].pop("emb"), out["bucketed"].pop("emb")
+cos = (a * b).sum(1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+print(json.dumps({
+    "sentences": len(texts),
+    "threads": threads,
+    **out,
+    "speedup": round(out["fixed_batch_8"]["seconds"] / out["bucketed"]["seconds"], 2),
+    "min_cosine_vs_fixed": round(float(cos.min()), 5),
+}))
+"""
+
+REFERENCE = r"""
+import sys, numpy as np
+from benchmarks.synthetic import synthetic_podcast
+from core.embeddings import encode_uncached
+texts = [s["text"] for s in synthetic_podcast(minutes=200 * 4 / 60, seed=1)["sentences"]][:200]
+np.save(sys.argv[1], encode_uncached(texts))
+"""
+
+
+def run(code, backend, *args):
+    env = dict(os.environ, EMBEDDING_BACKEND=backend, EMBEDDING_CACHE="0")
+    out = subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return out.strip().splitlines()[-1] if out.strip() else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8"], choices=["torch", "int8", "onnx"])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    reference = None
+    for backend in args.backends:
+        # quality: how far do quantized vectors drift from the float model?
+        path = os.path.join(tmp, f"{backend}.npy")
+        try:
+            run(REFERENCE, backend, path)
+        except subprocess.CalledProcessError as e:
+            print(json.dumps({"backend": backend, "error": e.stderr.strip().splitlines()[-1]}))
+            continue
+        emb = np.load(path)
+        reference = emb if reference is None and backend == "torch" else reference
+        drift = None
+        if reference is not None and backend != "torch":
+            cos = (emb * reference).sum(1) / (np.linalg.norm(emb, axis=1) * np.linalg.norm(reference, axis=1))
+            drift = {"mean_cosine_vs_torch": round(float(cos.mean()), 5), "min_cosine_vs_torch": round(float(cos.min()), 5)}
+
+        for threads in args.threads:
+            result = json.loads(run(CHILD, backend, args.sentences, threads, args.repeat))
+            print(json.dumps({"backend": backend, **result, **(drift or {})}))
+
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Keyword labeling benchmark: one KeyBERT call per topic vs. the batched path.
+
+Uses the real MiniLM model on a synthetic transcript, so run it where the
+models are installed:
+    python -m benchmarks.bench_keywords --topics 10 20 40 80
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.embeddings import get_embeddings
+from core.topic_labeling import extract_topic_keywords, extract_keywords_batch
+
+VOCAB = (
+    "startup funding investor product market growth revenue team hiring culture "
+    "health sleep exercise stress therapy diet habits family children parenting "
+    "school teacher learning college exam software data model training cloud "
+    "music guitar album tour concert football coach season league goal"
+).split()
+
+
+def synthetic_topics(n_topics, sentences_per_topic, rng):
+    topics = []
+    for _ in range(n_topics):
+        words = rng.choice(VOCAB, 6, replace=False)
+        sentences = [
+            {"text": " ".join(rng.choice(words, 10)) + ".", "start": 0.0, "end": 1.0}
+            for _ in range(sentences_per_topic)
+        ]
+        topics.append({"sentences": sentences})
+    return topics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", type=int, nargs="+", default=[10, 20, 40, 80])
+    parser.add_argument("--sentences-per-topic", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    get_embeddings([{"text": "warm up"}])
+    extract_topic_keywords([{"text": "warm up"}])
+
+    for n in args.topics:
+        topics = synthetic_topics(n, args.sentences_per_topic, rng)
+        sentences = [s for t in topics for s in t["sentences"]]
+        embeddings = get_embeddings(sentences)
+
+        t0 = time.perf_counter()
+        for t in topics:
+            extract_topic_keywords(t["sentences"])
+        per_topic = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        extract_keywords_batch(topics, embeddings)
+        batched = time.perf_counter() - t0
+
+        print(json.dumps({
+            "topics": n,
+            "per_topic_s": round(per_topic, 3),
+            "batched_s": round(batched, 3),
+            "speedup": round(per_topic / batched, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
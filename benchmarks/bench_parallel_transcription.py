@@ -0,0 +1,53 @@
+"""
+Scaling benchmark for chunked, parallel Whisper transcription on CPU.
+
+Run from the repo root with any audio file:
+    python -m benchmarks.bench_parallel_transcription data/sample.mp3 --workers 1 2 4
+"""
+import argparse
+import json
+import time
+
+import soundfile as sf
+
+from core.preprocess import preprocess_audio
+from core.transcription import transcribe, transcribe_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-chunk-seconds", type=float, default=120)
+    args = parser.parse_args()
+
+    wav_path = preprocess_audio(args.audio)
+    audio, sr = sf.read(wav_path, dtype="float32")
+    duration = len(audio) / sr
+
+    baseline = None
+    for workers in args.workers:
+        if workers == 1:
+            run = lambda: transcribe(wav_path, workers=1)
+        else:
+            # warm the pool so model loading is not counted as transcription time
+            transcribe_parallel(audio[: sr * 5], workers, args.max_chunk_seconds)
+            run = lambda: transcribe_parallel(audio, workers, args.max_chunk_seconds)
+
+        t0 = time.perf_counter()
+        _, sentences = run()
+        wall = time.perf_counter() - t0
+        baseline = baseline or wall
+
+        print(json.dumps({
+            "workers": workers,
+            "audio_s": round(duration, 1),
+            "wall_s": round(wall, 2),
+            "real_time_factor": round(wall / duration, 3),
+            "speedup": round(baseline / wall, 2),
+            "segments": len(sentences),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Decode benchmark: WAV round-trip (old path) vs. streaming ffmpeg → NumPy.
+
+"wav" reproduces what the pipeline used to do before Whisper saw any audio:
+preprocess_audio writes a WAV, transcribe reads it fully with soundfile just
+for the duration, and Whisper decodes the WAV again through ffmpeg.
+"stream" is preprocess.load_audio_array. Each mode runs in a fresh process
+so peak RSS is comparable. Also checks that no temp directories leak.
+
+    python -m benchmarks.bench_preprocess data/long_audio.mp3
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+CHILD = r"""
+import json, os, resource, subprocess, sys, tempfile, time
+import numpy as np
+
+mode, path = sys.argv[1], sys.argv[2]
+tmp_root = tempfile.gettempdir()
+before = set(os.listdir(tmp_root))
+
+t0 = time.perf_counter()
+if mode == "wav":
+    import soundfile as sf
+    from core.preprocess import preprocess_audio
+    wav = preprocess_audio(path)
+    data, sr = sf.read(wav)
+    duration = len(data) / sr
+    del data
+    raw = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", wav,
+         "-f", "s16le", "-ac", "1", "-ar", "16000", "-"],
+        check=True, capture_output=True
+    ).stdout
+    audio = np.frombuffer(raw, np.int16).flatten().astype(np.float32) / 32768.0
+else:
+    from core.preprocess import load_audio_array, probe_duration
+    duration = probe_duration(path)
+    audio = load_audio_array(path, duration=duration)
+wall = time.perf_counter() - t0
+
+leaked = sorted(set(os.listdir(tmp_root)) - before)
+print(json.dumps({
+    "mode": mode,
+    "audio_s": round(duration, 1),
+    "wall_s": round(wall, 2),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "samples": int(len(audio)),
+    "leaked_temp_entries": len(leaked),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio")
+    parser.add_argument("--modes", nargs="+", default=["wav", "stream"], choices=["wav", "stream"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, mode, args.audio],
+            check=True, capture_output=True, text=True
+        ).stdout
+        print(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Result API payloads: bytes on the wire and server time for the old
+whole-result response (every topic carrying copies of its sentences,
+json.dumps of everything) vs. the paginated /result endpoint: a first page,
+a time range, a projected page, and each of them gzip-compressed.
+
+Legacy "ms" is json.dumps alone (a lower bound for that response); the
+other rows time the whole in-process request, routing included.
+
+Runs in-process on a synthetic episode, no server or models needed:
+    python -m benchmarks.bench_result_api --hours 3
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+TOPIC_SECONDS = 300
+
+
+def synthetic_result(hours, seed=0):
+    rng = random.Random(seed)
+    words = "the model data people really think going market question because music story".split()
+    sentences, t = [], 0.0
+    while t < hours * 3600:
+        duration = rng.uniform(2.0, 8.0)
+        text = " ".join(rng.choice(words) for _ in range(int(duration * 2.5)))
+        sentences.append({"text": text.capitalize() + ".", "start": round(t, 2), "end": round(t + duration, 2)})
+        t += duration + 0.2
+
+    topics, first = [], 0
+    while first < len(sentences):
+        last = first
+        while last + 1 < len(sentences) and sentences[last + 1]["end"] - sentences[first]["start"] < TOPIC_SECONDS:
+            last += 1
+        chunk = sentences[first:last + 1]
+        topics.append({
+            "label": f"Topic {len(topics) + 1}", "start": chunk[0]["start"], "end": chunk[-1]["end"],
+            "summary": " ".join(s["text"] for s in chunk[:2]), "keywords": words[:5], "sentiment": "Neutral 😐",
+            "sentences": chunk,
+        })
+        first = last + 1
+    return {
+        "full_text": " ".join(s["text"] for s in sentences),
+        "topics": topics,
+        "sentences": sentences,
+        "metadata": {"sentence_count": len(sentences), "topic_count": len(topics)},
+    }
+
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        response = fn()
+        best = min(best, time.perf_counter() - t0)
+    return response, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_result_api_")
+    os.environ["JOB_DIR"] = os.path.join(work, "jobs")
+    os.environ["LIBRARY_INDEX_DIR"] = os.path.join(work, "library")
+    os.environ.setdefault("GROQ_API_KEY", "unused")
+    os.environ["ANALYSIS_WORKERS"] = "0"
+
+    from fastapi.testclient import TestClient
+
+    import main as server
+    from core.job_queue import COMPLETED
+    from core.result_index import compact_topics, orjson, write_result_index
+
+    result = synthetic_result(args.hours)
+    task_id = "bench"
+    server.job_queue.submit(task_id, "synthetic.wav", {})
+    stored = dict(result, topics=compact_topics(result["topics"]))
+    server.job_queue._write_result(task_id, stored)
+    write_result_index(server.result_prefix(task_id), stored)
+    with server.job_queue._db() as conn:
+        conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (COMPLETED, task_id))
+
+    client = TestClient(server.app)
+    middle = result["sentences"][len(result["sentences"]) // 2]["start"]
+    cases = {
+        "page (500 sentences)": {},
+        "time range (10 min)": {"start": middle, "end": middle + 600},
+        "projected page (start,end)": {"sentence_fields": "start,end", "topic_fields": "label,start,end"},
+        "chapters only": {"include": "topics"},
+    }
+
+    print(json.dumps({
+        "sentences": len(result["sentences"]), "topics": len(result["topics"]), "orjson": orjson is not None,
+    }))
+    legacy, took = measure(lambda: json.dumps(result).encode("utf-8"), args.repeats)
+    baseline = len(legacy)
+    print(json.dumps({"case": "legacy full result", "kb": round(baseline / 1024, 1), "ms": round(took * 1000, 1)}))
+
+    for name, params in cases.items():
+        for encoding in ("identity", "gzip"):
+            # count the bytes actually sent: httpx would transparently decompress .content
+            def fetch():
+                with client.stream("GET", f"/result/{task_id}", params=params,
+                                   headers={"Accept-Encoding": encoding}) as response:
+                    return b"".join(response.iter_raw())
+            body, took = measure(fetch, args.repeats)
+            print(json.dumps({
+                "case": name, "encoding": encoding, "kb": round(len(body) / 1024, 1), "ms": round(took * 1000, 1),
+                "smaller_than_legacy": round(baseline / len(body), 1),
+            }))
+    shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Greedy vs. dynamic-programming topic merging on synthetic podcasts:
+runtime, topic count, how often the two put a boundary in the same place
+(F1 of DP boundaries against greedy ones) and each one's F1 against the
+planted topic changes.
+
+Both merge the same threshold micro-topics under topic_chunking's
+duration/sentence limits. "dp/sent" runs the DP with every sentence as its
+own micro-topic (the worst case for its runtime, and no dependence on the
+threshold at all).
+
+Run from the repo root:
+    python -m benchmarks.bench_segmentation
+    python -m benchmarks.bench_segmentation --sizes 1000 10000 --penalty 1 2 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import boundary_f1, synthetic_podcast
+from core.boundary_detection import build_micro_topics, segment_micro_topics
+from core.optimal_segmentation import SEGMENT_PENALTY, chunk_topics_optimal
+from core.topic_chunking import chunk_topics
+
+TOLERANCE = 2  # sentences
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def boundaries(topics):
+    return np.cumsum([0] + [len(t["sentences"]) for t in topics])[1:-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 10_000], help="sentences")
+    parser.add_argument("--topic-minutes", type=float, default=1.5, help="mean planted topic length")
+    parser.add_argument("--penalty", type=float, nargs="+", default=[SEGMENT_PENALTY])
+    parser.add_argument("--threshold", type=float, default=0.65)
+    parser.add_argument("--noise", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"boundary tolerance ±{TOLERANCE} sentences; time excludes micro-segmentation")
+    print(f"{'n':>7} {'micro':>6} {'engine':>12} {'time (s)':>9} {'topics':>7} {'agree F1':>9} {'truth F1':>9}")
+    for n in args.sizes:
+        minutes = n * 4.0 / 60
+        podcast = synthetic_podcast(
+            minutes=minutes, n_topics=max(2, int(minutes / args.topic_minutes)), noise=args.noise
+        )
+        sentences, embeddings, truth = podcast["sentences"], podcast["embeddings"], podcast["boundaries"]
+        micro = segment_micro_topics(sentences, embeddings, args.threshold)
+        per_sentence = build_micro_topics(sentences, np.arange(1, len(sentences)))
+
+        greedy_t, greedy = timed(lambda: boundaries(chunk_topics(micro, embeddings)), args.repeat)
+        print(f"{n:>7} {len(micro):>6} {'greedy':>12} {greedy_t:>9.3f} {len(greedy) + 1:>7} {'':>9} "
+              f"{boundary_f1(greedy, truth, TOLERANCE)['f1']:>9.3f}")
+
+        for penalty in args.penalty:
+            for name, units in ((f"dp ({penalty:g})", micro), (f"dp/sent ({penalty:g})", per_sentence)):
+                dp_t, dp = timed(lambda: boundaries(chunk_topics_optimal(units, embeddings, penalty)), args.repeat)
+                print(f"{n:>7} {len(units):>6} {name:>12} {dp_t:>9.3f} {len(dp) + 1:>7} "
+                      f"{boundary_f1(dp, greedy, TOLERANCE)['f1']:>9.3f} {boundary_f1(dp, truth, TOLERANCE)['f1']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
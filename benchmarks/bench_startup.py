@@ -0,0 +1,70 @@
+"""
+Startup benchmark: import cost, time-to-first-request and resident memory
+with lazy model loading vs. warming everything up front.
+
+Each scenario runs in a fresh interpreter so module and model caches are cold.
+Run from the repo root:
+    python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+CHILD = r"""
+import json, resource, sys, time
+
+def rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+t0 = time.perf_counter()
+from core.embeddings import get_embeddings
+from core.topic_segmentation import segment_topics_with_labels
+from core.transcription import transcribe
+from core import model_registry
+import_s = time.perf_counter() - t0
+import_rss = rss_mb()
+
+warm_s = 0.0
+if sys.argv[1] == "warm":
+    t1 = time.perf_counter()
+    model_registry.warm_up()
+    warm_s = time.perf_counter() - t1
+
+# "first request": the cheapest model-backed call the API makes (a /chat query embedding)
+t2 = time.perf_counter()
+get_embeddings([{"text": "what is this episode about?"}])
+first_request_s = time.perf_counter() - t2
+
+print(json.dumps({
+    "mode": sys.argv[1],
+    "import_s": round(import_s, 3),
+    "import_rss_mb": round(import_rss, 1),
+    "warm_up_s": round(warm_s, 3),
+    "first_request_s": round(first_request_s, 3),
+    "peak_rss_mb": round(rss_mb(), 1),
+    "loaded_models": model_registry.loaded_models(),
+}))
+"""
+
+
+def run(mode):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["lazy", "warm"], choices=["lazy", "warm"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        print(json.dumps(run(mode)))
+
+
+if __name__ == "__main__":
+    main()
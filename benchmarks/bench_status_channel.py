@@ -0,0 +1,129 @@
+"""
+Status channel load test: requests and bytes per job for the old fixed
+interval polling vs. long-polling /status, and how late each one notices
+that a job finished.
+
+Both modes follow the same jobs at the same time, so the completion lag of
+polling is measured against long-poll (whose own lag is the watcher's
+0.25 s tick). Each mode fetches the result once at the end, as app.py does.
+
+Start the server with dedupe off (every upload below is the same file),
+then run from the repo root:
+    UPLOAD_DEDUPE=0 uvicorn main:app --port 8000
+    python -m benchmarks.bench_status_channel --audio sample.mp3 --jobs 4
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+TERMINAL = ("completed", "failed")
+
+
+class Traffic:
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        # a fresh connection per request, like app.py (the server drops idle keep-alives after 5 s)
+        response = requests.get(url, timeout=120, **kwargs)
+        size = len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        with self._lock:
+            self.requests += 1
+            self.bytes += size
+        return response
+
+
+def fetch_result(traffic, base, task_id, limit=0):
+    return traffic.get(f"{base}/result/{task_id}", params={"limit": limit, "full_text": "true"})
+
+
+def follow_polling(base, task_id, interval, traffic, legacy=False):
+    """
+    The old app.py loop: GET /status, sleep `interval`, repeat. legacy=True
+    also downloads every sentence at the end, as the old completed /status did.
+    """
+    while True:
+        status = traffic.get(f"{base}/status/{task_id}").json()
+        if status.get("status") in TERMINAL:
+            seen = time.perf_counter()
+            if status["status"] == "completed":
+                fetch_result(traffic, base, task_id, limit=5000 if legacy else 0)
+            return seen
+        time.sleep(interval)
+
+
+def follow_long_poll(base, task_id, wait, traffic):
+    version = None
+    while True:
+        params = {"version": version, "wait": wait} if version is not None else {}
+        status = traffic.get(f"{base}/status/{task_id}", params=params).json()
+        if status.get("status") in TERMINAL:
+            seen = time.perf_counter()
+            if status["status"] == "completed":
+                fetch_result(traffic, base, task_id)
+            return seen
+        if status.get("version") is None:
+            time.sleep(0.5)
+        version = status.get("version")
+
+
+def submit(base, audio):
+    with open(audio, "rb") as f:
+        response = requests.post(f"{base}/analyze", files={"file": (os.path.basename(audio), f)}, timeout=600)
+    response.raise_for_status()
+    return response.json()["task_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--audio", required=True, help="episode to upload")
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=5.0, help="polling interval of the old loop")
+    parser.add_argument("--wait", type=float, default=25.0, help="long-poll hold time")
+    args = parser.parse_args()
+
+    task_ids = [submit(args.url, args.audio) for _ in range(args.jobs)]
+    if len(set(task_ids)) < len(task_ids):
+        print("⚠️ uploads were deduplicated; restart the server with UPLOAD_DEDUPE=0")
+
+    traffic = {"legacy_polling": Traffic(), "polling": Traffic(), "long_poll": Traffic()}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(3 * len(task_ids)) as pool:
+        seen = {
+            "legacy_polling": [
+                pool.submit(follow_polling, args.url, t, args.interval, traffic["legacy_polling"], True)
+                for t in task_ids
+            ],
+            "polling": [pool.submit(follow_polling, args.url, t, args.interval, traffic["polling"]) for t in task_ids],
+            "long_poll": [pool.submit(follow_long_poll, args.url, t, args.wait, traffic["long_poll"]) for t in task_ids],
+        }
+        seen = {mode: [f.result() for f in futures] for mode, futures in seen.items()}
+    wall = time.perf_counter() - t0
+    for mode, t in traffic.items():
+        row = {
+            "mode": mode,
+            "jobs": len(task_ids),
+            "wall_seconds": round(wall, 1),
+            "requests_per_job": round(t.requests / len(task_ids), 1),
+            "requests_per_second": round(t.requests / wall, 2),
+            "kb_per_job": round(t.bytes / len(task_ids) / 1024, 1),
+        }
+        if mode != "long_poll":
+            lags = sorted(p - q for p, q in zip(seen[mode], seen["long_poll"]))
+            row["extra_lag_vs_long_poll_s"] = {
+                "mean": round(sum(lags) / len(lags), 2),
+                "max": round(lags[-1], 2),
+            }
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Summarization throughput: one pipeline call per topic vs. summarize_topics batches.
+
+Uses the real DistilBART pipeline, so run it where the models are installed:
+    python -m benchmarks.bench_summarizer --topics 40 --batch-sizes 1 4 8 16
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.summarizer import summarize_topic, summarize_topics
+
+WORDS = (
+    "the guest explains how the company grew from a small team into a global "
+    "business while the host asks about funding hiring culture mistakes and "
+    "the lessons they would share with new founders listening today"
+).split()
+
+
+def synthetic_topics(n, rng):
+    # chapter lengths between ~40 and ~400 words, like real episodes
+    return [
+        {"sentences": [{"text": " ".join(rng.choice(WORDS, int(rng.integers(40, 400))))}]}
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    topics = synthetic_topics(args.topics, np.random.default_rng(0))
+    summarize_topic(topics[0]["sentences"])  # load the model outside the timings
+
+    t0 = time.perf_counter()
+    for t in topics:
+        summarize_topic(t["sentences"])
+    loop_s = time.perf_counter() - t0
+    print(json.dumps({"mode": "per_topic", "seconds": round(loop_s, 2),
+                      "topics_per_s": round(args.topics / loop_s, 2)}))
+
+    for batch_size in args.batch_sizes:
+        stats = []
+        t0 = time.perf_counter()
+        summarize_topics(topics, batch_size=batch_size, batch_stats=stats)
+        batched_s = time.perf_counter() - t0
+        latencies = [b["seconds"] for b in stats]
+        print(json.dumps({
+            "mode": "batched",
+            "batch_size": batch_size,
+            "seconds": round(batched_s, 2),
+            "topics_per_s": round(args.topics / batched_s, 2),
+            "speedup": round(loop_s / batched_s, 2),
+            "batch_p50_s": round(float(np.median(latencies)), 3) if latencies else 0.0,
+            "batch_max_s": round(max(latencies), 3) if latencies else 0.0,
+        }))
+
+
+if __name__ == "__main__":
+    main()
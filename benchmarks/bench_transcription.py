@@ -0,0 +1,135 @@
+"""
+Transcription speed vs. accuracy: word error rate on a local reference set
+against real-time factor, per backend and Whisper model size.
+
+The reference set is a directory of audio files, each with a same-named
+.txt reference transcript next to it (data/reference/episode1.mp3 +
+data/reference/episode1.txt). Each (backend, size) pair runs in a fresh
+interpreter so load time and memory are measured cold.
+
+Run from the repo root:
+    python -m benchmarks.bench_transcription --reference data/reference \
+        --backends whisper whisper-int8 faster-whisper --sizes tiny base small
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg")
+
+CHILD = r"""
+import json, resource, sys, time
+from core.preprocess import load_audio_array, SAMPLE_RATE
+from core.transcription_backends import get_transcriber
+
+backend, size = sys.argv[1], sys.argv[2]
+files = json.loads(sys.argv[3])
+
+t0 = time.perf_counter()
+transcriber = get_transcriber(backend, size)
+load_s = time.perf_counter() - t0
+
+rows = []
+for path in files:
+    audio = load_audio_array(path)
+    t1 = time.perf_counter()
+    result = transcriber.transcribe(audio)
+    rows.append({
+        "file": path,
+        "audio_seconds": len(audio) / SAMPLE_RATE,
+        "seconds": time.perf_counter() - t1,
+        "text": result["text"],
+    })
+
+print(json.dumps({
+    "load_s": round(load_s, 2),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "files": rows,
+}))
+"""
+
+
+def normalize_words(text):
+    """
+    Lower-case words without punctuation, the usual WER normalization
+    """
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower().replace("-", " ")).split()
+
+
+def word_errors(reference, hypothesis):
+    """
+    Word-level Levenshtein distance (substitutions + deletions + insertions)
+    """
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return len(hyp), 0
+    prev = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, start=1):
+        cur = [i]
+        for j, other in enumerate(hyp, start=1):
+            cur.append(min(prev[j - 1] + (word != other), prev[j] + 1, cur[j - 1] + 1))
+        prev = cur
+    return prev[-1], len(ref)
+
+
+def reference_set(directory):
+    pairs = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        txt = os.path.join(directory, stem + ".txt")
+        if ext.lower() in AUDIO_EXTENSIONS and os.path.exists(txt):
+            with open(txt, "r", encoding="utf-8") as f:
+                pairs.append((os.path.join(directory, name), f.read()))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reference", default="data/reference", help="directory of audio + .txt pairs")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "whisper-int8"])
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base"])
+    args = parser.parse_args()
+
+    pairs = reference_set(args.reference)
+    if not pairs:
+        sys.exit(f"No audio files with matching .txt references in {args.reference}")
+    references = dict(pairs)
+
+    for backend in args.backends:
+        for size in args.sizes:
+            proc = subprocess.run(
+                [sys.executable, "-c", CHILD, backend, size, json.dumps([p for p, _ in pairs])],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(json.dumps({"backend": backend, "size": size,
+                                  "error": proc.stderr.strip().splitlines()[-1]}))
+                continue
+            run = json.loads(proc.stdout.strip().splitlines()[-1])
+
+            errors = words = 0
+            audio_s = compute_s = 0.0
+            for row in run["files"]:
+                e, n = word_errors(references[row["file"]], row["text"])
+                errors, words = errors + e, words + n
+                audio_s += row["audio_seconds"]
+                compute_s += row["seconds"]
+
+            print(json.dumps({
+                "backend": backend,
+                "size": size,
+                "files": len(run["files"]),
+                "audio_seconds": round(audio_s, 1),
+                "wer": round(errors / words, 4) if words else None,
+                # < 1 means faster than real time
+                "real_time_factor": round(compute_s / audio_s, 4) if audio_s else None,
+                "load_s": run["load_s"],
+                "peak_rss_mb": run["peak_rss_mb"],
+            }))
+
+
+if __name__ == "__main__":
+    main()
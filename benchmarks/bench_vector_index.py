@@ -0,0 +1,99 @@
+"""
+Retrieval benchmark: brute-force cosine + full argsort (the old /chat path)
+vs. the IVF index, per episode and across a synthetic library.
+
+Run from the repo root:
+    python -m benchmarks.bench_vector_index --episodes 1000 --sentences 500
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from core.embedding_store import normalize
+from core.vector_index import IVFIndex, LibraryIndex, top_k
+
+DIM = 384
+
+
+def synthetic_library(episodes, sentences, centres, rng):
+    """
+    Clustered unit vectors: every sentence is a noisy copy of a topic centre
+    """
+    for _ in range(episodes):
+        topics = rng.integers(0, len(centres), sentences)
+        yield normalize(centres[topics] + rng.normal(size=(sentences, DIM)).astype(np.float32) * 0.8)
+
+
+def latency_ms(fn, queries):
+    times = []
+    out = []
+    for q in queries:
+        t0 = time.perf_counter()
+        out.append(fn(q))
+        times.append((time.perf_counter() - t0) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 95), out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--sentences", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, default=None)
+    parser.add_argument("--float32", action="store_true", help="disable int8 quantization")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centres = rng.normal(size=(args.topics, DIM)).astype(np.float32)
+    root = tempfile.mkdtemp()
+    library = LibraryIndex(root, dim=DIM, quantize=not args.float32)
+
+    t0 = time.perf_counter()
+    chunks = []
+    for i, emb in enumerate(synthetic_library(args.episodes, args.sentences, centres, rng)):
+        library.add_episode(f"episode-{i}", emb)
+        chunks.append(emb)
+    build_s = time.perf_counter() - t0
+    matrix = np.concatenate(chunks)
+    queries = next(synthetic_library(1, args.queries, centres, rng))
+
+    def brute(q):
+        sims = matrix @ q
+        return np.argsort(sims)[-args.k:][::-1]
+
+    def ivf(q):
+        hits = library.search(q, k=args.k, n_probe=args.n_probe)
+        return [int(h["task_id"].split("-")[1]) * args.sentences + h["sentence_index"] for h in hits]
+
+    b50, b95, exact = latency_ms(brute, queries)
+    i50, i95, approx = latency_ms(ivf, queries)
+    recall = np.mean([len(set(a) & set(e)) / args.k for a, e in zip(approx, exact)])
+
+    # per-episode path used by /chat
+    episode = chunks[0]
+    index = IVFIndex.build(episode)
+    e50, _, _ = latency_ms(lambda q: index.search(q, k=5), queries)
+    a50, _, _ = latency_ms(lambda q: np.argsort(episode @ q)[-5:][::-1], queries)
+
+    print(json.dumps({
+        "rows": len(matrix),
+        "quantized": not args.float32,
+        "library_build_s": round(build_s, 2),
+        "library_lists": 0 if library.index is None else len(library.index.centroids),
+        "brute_p50_ms": round(b50, 2),
+        "brute_p95_ms": round(b95, 2),
+        "ivf_p50_ms": round(i50, 2),
+        "ivf_p95_ms": round(i95, 2),
+        f"recall_at_{args.k}": round(float(recall), 3),
+        "episode_argsort_p50_ms": round(a50, 3),
+        "episode_index_p50_ms": round(e50, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+End-to-end benchmark suite on synthetic podcasts.
+
+Times every core stage in isolation plus the analysis/pipeline end to end,
+writes the results as JSON and, given a stored baseline, fails (exit 1) when
+a case got slower than `--tolerance` x its baseline time or segmentation
+quality dropped. Cases whose dependencies are missing (models, ffmpeg) are
+reported as skipped, so the offline part runs anywhere.
+
+Run from the repo root:
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json   # refresh the stored baseline
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_podcast, synthetic_audio, write_wav, boundary_f1, SAMPLE_RATE
+from core.instrumentation import StageMetrics
+
+DEFAULT_TOLERANCE = 1.5    # slower than 1.5x baseline counts as a regression (shared CI boxes jitter ~30%)
+QUALITY_DROP = 0.05        # F1 lower than baseline - 0.05 counts as a regression
+MIN_SAMPLE_SECONDS = 0.05  # fast cases repeat inside a sample until it lasts this long
+
+
+def missing(requires):
+    """
+    First unavailable dependency: python modules by name, "ffmpeg" as a binary
+    """
+    for dep in requires:
+        if dep == "ffmpeg":
+            if shutil.which("ffmpeg") is None:
+                return dep
+        elif importlib.util.find_spec(dep) is None:
+            return dep
+    return None
+
+
+# -----------------------
+# CASES
+# -----------------------
+# Each case: (name, requires, run(ctx) -> {"items", "audio_seconds", ...extra})
+def case_preprocess(ctx):
+    from core.preprocess import load_audio_array
+    audio = load_audio_array(ctx["wav_path"])
+    return {"audio_seconds": len(audio) / SAMPLE_RATE}
+
+
+def case_audio_chunking(ctx):
+    from core.audio_chunking import split_on_silence
+    chunks = split_on_silence(ctx["audio"], 120)
+    return {"items": len(chunks), "audio_seconds": len(ctx["audio"]) / SAMPLE_RATE}
+
+
+def case_transcribe(ctx):
+    from core.transcription import transcribe_chunk
+    # Whisper on synthetic tones: measures real-time factor, not accuracy
+    audio = ctx["audio"][:SAMPLE_RATE * 60]
+    _, sentences = transcribe_chunk(audio)
+    return {"items": len(sentences), "audio_seconds": len(audio) / SAMPLE_RATE}
+
+
+def case_embed(ctx):
+    from core.embeddings import get_embeddings
+    get_embeddings(ctx["sentences"])
+    return {"items": len(ctx["sentences"])}
+
+
+def case_micro_segment(ctx):
+    from core.boundary_detection import detect_boundaries, build_micro_topics
+    boundaries = detect_boundaries(ctx["embeddings"], ctx["threshold"])
+    ctx["micro_topics"] = build_micro_topics(ctx["sentences"], boundaries)
+    return {"items": len(ctx["sentences"]), **boundary_f1(boundaries, ctx["boundaries"])}
+
+
+def case_chunk(ctx):
+    from core.topic_chunking import chunk_topics
+    topics = chunk_topics(ctx["micro_topics"], ctx["embeddings"])
+    ctx["topics"] = topics
+    starts = np.cumsum([0] + [len(t["sentences"]) for t in topics])[1:-1]
+    return {"items": len(ctx["micro_topics"]), "topics": len(topics), **boundary_f1(starts, ctx["boundaries"], 2)}
+
+
+def case_chunk_optimal(ctx):
+    from core.optimal_segmentation import chunk_topics_optimal
+    topics = chunk_topics_optimal(ctx["micro_topics"], ctx["embeddings"])
+    starts = np.cumsum([0] + [len(t["sentences"]) for t in topics])[1:-1]
+    return {"items": len(ctx["micro_topics"]), "topics": len(topics), **boundary_f1(starts, ctx["boundaries"], 2)}
+
+
+def case_chapter_tree(ctx):
+    from core.chapter_tree import ChapterTree
+    tree = ChapterTree.build(ctx["micro_topics"], ctx["embeddings"])
+    for k in range(1, tree.n_leaves + 1):
+        tree.cut(k)
+    level = tree.cut(len(ctx["boundaries"]) + 1)
+    starts = [int(tree.spans[node][0]) for node in level[1:]]
+    return {"items": len(ctx["micro_topics"]), "levels": tree.n_leaves, **boundary_f1(starts, ctx["boundaries"], 2)}
+
+
+def case_keyword(ctx):
+    from core.topic_labeling import extract_keywords_batch
+    extract_keywords_batch(ctx["topics"], ctx["embeddings"])
+    return {"items": len(ctx["topics"])}
+
+
+def case_summarize(ctx):
+    from core.summarizer import summarize_topics
+    summarize_topics(ctx["topics"])
+    return {"items": len(ctx["topics"])}
+
+
+def case_sentiment(ctx):
+    from core.pipeline import add_sentiment
+    topics = [{"summary": " ".join(s["text"] for s in t["sentences"][:2])} for t in ctx["topics"]]
+    add_sentiment(topics)
+    return {"items": len(topics)}
+
+
+def case_embedding_store(ctx):
+    from core.embedding_store import save_embeddings, load_embeddings
+    path = os.path.join(ctx["tmp"], "emb.npy")
+    save_embeddings(path, ctx["embeddings"])
+    stored = load_embeddings(path)
+    for q in ctx["embeddings"][:100]:
+        stored.scores(q)
+    return {"items": len(ctx["embeddings"])}
+
+
+def case_vector_index(ctx):
+    from core.embedding_store import normalize
+    from core.vector_index import IVFIndex
+    data = normalize(ctx["embeddings"])
+    index = IVFIndex.build(data)
+    queries = data[:: max(1, len(data) // 200)]
+    for q in queries:
+        index.search(q, k=5)
+    return {"items": len(queries)}
+
+
+def case_analysis(ctx):
+    from core.topic_segmentation import segment_topics_with_labels
+    from core.pipeline import add_sentiment
+    topics = segment_topics_with_labels(ctx["sentences"], ctx["embeddings"], threshold=ctx["threshold"])
+    add_sentiment(topics)
+    return {"items": len(ctx["sentences"]), "audio_seconds": ctx["duration"], "topics": len(topics)}
+
+
+def case_pipeline(ctx):
+    from core.pipeline import run_pipeline
+    try:
+        result = run_pipeline(ctx["wav_path"])
+    except ValueError as e:
+        # tones carry no words, so Whisper may find no speech at all
+        return {"audio_seconds": ctx["duration"], "note": str(e)[:60]}
+    return {"items": len(result["sentences"]), "audio_seconds": ctx["duration"]}
+
+
+CASES = [
+    ("preprocess", ("ffmpeg", "soundfile"), case_preprocess),
+    ("audio_chunking", (), case_audio_chunking),
+    ("transcribe", ("whisper",), case_transcribe),
+    ("embed", ("sentence_transformers",), case_embed),
+    ("micro_segment", (), case_micro_segment),
+    ("chunk", (), case_chunk),
+    ("chunk_optimal", (), case_chunk_optimal),
+    ("chapter_tree", (), case_chapter_tree),
+    ("keyword", ("sentence_transformers",), case_keyword),
+    ("summarize", ("transformers",), case_summarize),
+    ("sentiment", ("textblob",), case_sentiment),
+    ("embedding_store", (), case_embedding_store),
+    ("vector_index", (), case_vector_index),
+    ("analysis_end_to_end", ("sentence_transformers", "transformers", "textblob"), case_analysis),
+    ("pipeline_end_to_end", ("ffmpeg", "soundfile", "whisper", "sentence_transformers",
+                             "transformers", "textblob"), case_pipeline),
+]
+
+
+# -----------------------
+# RUNNER
+# -----------------------
+def run_case(name, fn, ctx, repeat):
+    """
+    Best-of/median over `repeat` samples. Fast cases are looped inside each
+    sample (like timeit's autorange) until a sample lasts MIN_SAMPLE_SECONDS,
+    and times are reported per call.
+    """
+    t0 = time.perf_counter()
+    extra = fn(ctx) or {}  # warm-up call, also sizes the inner loop
+    number = max(1, int(np.ceil(MIN_SAMPLE_SECONDS / max(time.perf_counter() - t0, 1e-9))))
+
+    walls, cpus, peaks = [], [], []
+    for _ in range(repeat):
+        metrics = StageMetrics()
+        with metrics.stage(name):
+            for _ in range(number):
+                extra = fn(ctx) or {}
+        entry = metrics.stages[name]
+        walls.append(entry["wall_seconds"] / number)
+        cpus.append(entry["cpu_seconds"] / number)
+        peaks.append(entry["peak_rss_bytes"])
+
+    median = float(np.median(walls))
+    result = {
+        "median_s": round(median, 6),
+        "min_s": round(min(walls), 6),
+        "loops": number,
+        "cpu_s": round(float(np.median(cpus)), 6),
+        "peak_rss_mb": round(max(peaks) / 2 ** 20, 1),
+    }
+    items = extra.pop("items", 0)
+    audio_seconds = extra.pop("audio_seconds", 0)
+    if items:
+        result["items"] = items
+        result["items_per_s"] = round(items / median, 1) if median else None
+    if audio_seconds:
+        result["audio_seconds"] = round(audio_seconds, 1)
+        result["realtime_factor"] = round(audio_seconds / median, 1) if median else None
+    result.update(extra)
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Per-case ratio against the baseline; returns (rows, regressions).
+    Compares best-of-N times, which are far less noisy than medians for
+    sub-millisecond cases.
+    """
+    rows, regressions = [], []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "min_s" not in current or "min_s" not in base:
+            continue
+        ratio = current["min_s"] / base["min_s"] if base["min_s"] else 1.0
+        row = {"case": name, "baseline_s": base["min_s"], "current_s": current["min_s"], "ratio": round(ratio, 2)}
+        if ratio > tolerance:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+        if "f1" in base and "f1" in current and current["f1"] < base["f1"] - QUALITY_DROP:
+            regressions.append(f"{name}: boundary F1 {current['f1']} < baseline {base['f1']}")
+        rows.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--topics", type=int, default=8)
+    parser.add_argument("--noise", type=float, default=0.6, help="embedding scatter around each topic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.65)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", help="subset of case names")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="also write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    podcast = synthetic_podcast(args.minutes, args.topics, noise=args.noise, seed=args.seed)
+    tmp = tempfile.mkdtemp(prefix="bench-")
+    ctx = dict(podcast, threshold=args.threshold, tmp=tmp)
+
+    selected = [c for c in CASES if not args.cases or c[0] in args.cases]
+    needs_audio = {"preprocess", "audio_chunking", "transcribe", "pipeline_end_to_end"}
+    if any(name in needs_audio for name, _, _ in selected):
+        ctx["audio"] = synthetic_audio(podcast["sentences"], podcast["topic_ids"], seed=args.seed)
+        if importlib.util.find_spec("soundfile"):
+            ctx["wav_path"] = write_wav(os.path.join(tmp, "episode.wav"), ctx["audio"])
+
+    # chunk/keyword/summarize/sentiment build on the micro-segmentation output
+    case_micro_segment(ctx)
+    case_chunk(ctx)
+
+    results = {}
+    try:
+        for name, requires, fn in selected:
+            absent = missing(requires)
+            if absent:
+                results[name] = {"skipped": f"missing {absent}"}
+                print(f"⏭️  {name}: skipped (missing {absent})", file=sys.stderr)
+                continue
+            print(f"🔹 {name}", file=sys.stderr)
+            results[name] = run_case(name, fn, ctx, args.repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "environment": environment(),
+        "config": {
+            "minutes": args.minutes, "topics": args.topics, "noise": args.noise, "seed": args.seed,
+            "threshold": args.threshold, "repeat": args.repeat,
+            "sentences": len(podcast["sentences"]),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("sentences") != len(podcast["sentences"]):
+            print("⚠️  baseline was recorded on a different synthetic podcast; ratios are not comparable",
+                  file=sys.stderr)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        report["comparison"] = {"tolerance": args.tolerance, "cases": rows, "regressions": regressions}
+        for message in regressions:
+            print(f"❌ {message}", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
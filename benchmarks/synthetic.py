@@ -0,0 +1,140 @@
+"""
+Synthetic podcasts for offline benchmarks: transcripts, sentence embeddings
+and (optionally) audio with a known topic structure.
+
+Everything is generated from a seed, so two runs of the suite see exactly
+the same input and their timings are comparable.
+"""
+import numpy as np
+
+SAMPLE_RATE = 16000
+DIM = 384
+
+TOPIC_VOCABS = [
+    "startup funding investor product market growth revenue founder pitch valuation".split(),
+    "health sleep exercise stress therapy diet habits recovery doctor routine".split(),
+    "family children parenting school teacher homework bedtime siblings holiday rules".split(),
+    "software data model training cloud latency deploy server database python".split(),
+    "music guitar album tour concert studio lyrics drummer label festival".split(),
+    "football coach season league goal transfer stadium keeper tactics derby".split(),
+    "climate energy solar carbon policy emissions battery grid wind storage".split(),
+    "history empire war treaty dynasty archive revolution museum century king".split(),
+]
+FILLER = "so and the we you know really just like think it was that is a of to".split()
+
+
+# -----------------------
+# TRANSCRIPT + EMBEDDINGS
+# -----------------------
+def synthetic_podcast(minutes=30.0, n_topics=8, seconds_per_sentence=4.0, dim=DIM,
+                      noise=0.6, drift=0.15, seed=0):
+    """
+    A transcript of ~`minutes` split into `n_topics` topics of random length.
+
+    Each topic draws its words from its own vocabulary, and its sentence
+    embeddings scatter around a topic centroid (adjacent same-topic cosine
+    ~ 1 / (1 + noise^2)) with a slow random-walk `drift`, like real speech.
+
+    Returns {"sentences", "embeddings" (float32, n x dim), "topic_ids",
+    "boundaries" (indices that start a new topic), "duration"}.
+    """
+    rng = np.random.default_rng(seed)
+    n = max(n_topics, int(minutes * 60 / seconds_per_sentence))
+
+    # random topic lengths that add up to n
+    cuts = np.sort(rng.choice(np.arange(1, n), n_topics - 1, replace=False)) if n_topics > 1 else []
+    topic_ids = np.zeros(n, dtype=np.int64)
+    for t, cut in enumerate(cuts, start=1):
+        topic_ids[cut:] = t
+
+    centroids = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    steps = rng.normal(scale=1 / np.sqrt(dim), size=(n, dim)).astype(np.float32)
+    walk = np.cumsum(steps, axis=0) * drift / np.sqrt(np.arange(1, n + 1))[:, None]
+    jitter = rng.normal(scale=noise / np.sqrt(dim), size=(n, dim)).astype(np.float32)
+    embeddings = (centroids[topic_ids] + walk + jitter).astype(np.float32)
+
+    sentences = []
+    t = 0.0
+    for i in range(n):
+        vocab = TOPIC_VOCABS[topic_ids[i] % len(TOPIC_VOCABS)]
+        n_words = int(rng.integers(8, 18))
+        words = [
+            rng.choice(vocab) if rng.random() < 0.5 else rng.choice(FILLER)
+            for _ in range(n_words)
+        ]
+        length = float(rng.uniform(0.6, 1.4) * seconds_per_sentence)
+        sentences.append({
+            "text": " ".join(words).capitalize() + ".",
+            "start": round(t, 2),
+            "end": round(t + length, 2),
+        })
+        t += length
+
+    return {
+        "sentences": sentences,
+        "embeddings": embeddings,
+        "topic_ids": topic_ids,
+        "boundaries": np.flatnonzero(np.diff(topic_ids)) + 1,
+        "duration": t,
+    }
+
+
+# -----------------------
+# AUDIO
+# -----------------------
+def synthetic_audio(sentences, topic_ids=None, pause=0.35, topic_pause=1.2, seed=0):
+    """
+    16 kHz float32 audio following the transcript timeline: every sentence is
+    a burst of amplitude-modulated tones, with silent gaps between sentences
+    (longer ones at topic changes) so silence-based splitting has real work.
+    Whisper hears no words in it; use it for decode/chunking/throughput only.
+    """
+    rng = np.random.default_rng(seed)
+    duration = sentences[-1]["end"] if sentences else 0.0
+    audio = np.zeros(int((duration + topic_pause) * SAMPLE_RATE), dtype=np.float32)
+
+    for i, s in enumerate(sentences):
+        gap = pause
+        if topic_ids is not None and i + 1 < len(topic_ids) and topic_ids[i + 1] != topic_ids[i]:
+            gap = topic_pause
+        lo = int(s["start"] * SAMPLE_RATE)
+        hi = max(lo, int((s["end"] - gap) * SAMPLE_RATE))
+        if hi <= lo:
+            continue
+        t = np.arange(hi - lo, dtype=np.float32) / SAMPLE_RATE
+        pitch = rng.uniform(110, 240)
+        voice = np.sin(2 * np.pi * pitch * t) + 0.4 * np.sin(2 * np.pi * 2.7 * pitch * t)
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)  # syllable-rate wobble
+        audio[lo:hi] = 0.2 * voice * envelope
+
+    audio += rng.normal(scale=1e-4, size=len(audio)).astype(np.float32)  # room noise floor
+    return audio
+
+
+def write_wav(path, audio):
+    import soundfile as sf
+    sf.write(path, audio, SAMPLE_RATE, subtype="PCM_16")
+    return path
+
+
+# -----------------------
+# QUALITY
+# -----------------------
+def boundary_f1(predicted, truth, tolerance=1):
+    """
+    Precision/recall/F1 of predicted topic starts against the true ones,
+    counting a prediction within `tolerance` sentences as a hit
+    """
+    predicted = np.asarray(predicted, dtype=np.int64)
+    truth = np.asarray(truth, dtype=np.int64)
+    if len(predicted) == 0 or len(truth) == 0:
+        return {"precision": 0.0, "recall": 0.0, "f1": 0.0}
+
+    hit_pred = np.abs(predicted[:, None] - truth[None, :]).min(axis=1) <= tolerance
+    hit_true = np.abs(truth[:, None] - predicted[None, :]).min(axis=1) <= tolerance
+    precision = float(hit_pred.mean())
+    recall = float(hit_true.mean())
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3)}
@@ -0,0 +1,71 @@
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+SAMPLE_RATE = 16000
+FRAME_MS = 30                # energy frame size
+MIN_SILENCE_MS = 300         # a cut point must sit inside this much quiet audio
+SEARCH_SECONDS = 20          # look this far back from the chunk limit for a pause
+
+
+# -----------------------
+# ENERGY-BASED VAD
+# -----------------------
+def frame_energy(audio, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """
+    RMS energy per non-overlapping frame
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32), frame
+
+    frames = np.asarray(audio[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1)), frame
+
+
+def find_split_points(audio, max_chunk_seconds, sample_rate=SAMPLE_RATE,
+                      min_silence_ms=MIN_SILENCE_MS, search_seconds=SEARCH_SECONDS):
+    """
+    Sample offsets at which to cut `audio` so no chunk exceeds max_chunk_seconds.
+
+    Each cut goes at the quietest stretch (lowest mean energy over
+    min_silence_ms) in the last `search_seconds` before the limit, so chunks
+    end on pauses rather than mid-word.
+    """
+    max_samples = int(max_chunk_seconds * sample_rate)
+    if len(audio) <= max_samples:
+        return []
+
+    energy, frame = frame_energy(audio, sample_rate)
+    smooth = max(1, int(min_silence_ms / FRAME_MS))
+    if len(energy) >= smooth:
+        # mean energy of the window centred on each frame
+        energy = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+
+    max_frames = max(1, max_samples // frame)
+    search_frames = min(max_frames - 1, int(search_seconds * 1000 / FRAME_MS))
+
+    splits = []
+    pos = 0
+    while len(audio) - pos * frame > max_samples:
+        limit = pos + max_frames
+        lo = max(pos + 1, limit - search_frames)
+        cut = lo + int(np.argmin(energy[lo:limit])) if limit > lo else limit
+        splits.append(cut * frame)
+        pos = cut
+
+    return splits
+
+
+def split_on_silence(audio, max_chunk_seconds, sample_rate=SAMPLE_RATE):
+    """
+    -> [(offset_seconds, chunk_array)] covering the whole signal in order
+    """
+    edges = [0] + find_split_points(audio, max_chunk_seconds, sample_rate) + [len(audio)]
+    return [
+        (lo / sample_rate, audio[lo:hi])
+        for lo, hi in zip(edges[:-1], edges[1:])
+        if hi > lo
+    ]
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.embeddings import get_embeddings
+from core.instrumentation import StageMetrics, stage
+from core.job_queue import _json_default
+from core.pipeline import add_sentiment, NO_SPEECH_ERROR
+from core.preprocess import SAMPLE_RATE, load_audio_array
+from core.topic_segmentation import segment_topics_with_labels
+from core.transcription import transcribe
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg")
+# ffmpeg decode threads (the work happens in the ffmpeg subprocess)
+BATCH_DECODE_WORKERS = int(os.environ.get("BATCH_DECODE_WORKERS", "2"))
+# decoded episodes waiting for the transcriber; each holds 64 KB per second of audio
+BATCH_PREFETCH = int(os.environ.get("BATCH_PREFETCH", "2"))
+# threads embedding/segmenting finished transcripts while the next one is transcribed
+BATCH_ANALYZE_WORKERS = int(os.environ.get("BATCH_ANALYZE_WORKERS", "1"))
+
+DONE = "done"
+FAILED = "failed"
+
+
+# -----------------------
+# INPUTS
+# -----------------------
+def collect_inputs(paths, recursive=False):
+    """
+    Audio files from a mix of directories, audio files and manifest files
+    (.txt, one path per line, relative to the manifest's directory; # comments)
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, _, names in sorted(os.walk(path)):
+                    files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(AUDIO_EXTENSIONS))
+            else:
+                files.extend(
+                    os.path.join(path, n) for n in sorted(os.listdir(path)) if n.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        elif path.lower().endswith(".txt"):
+            base = os.path.dirname(path)
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        files.append(os.path.join(base, line))
+        else:
+            files.append(path)
+
+    # keep the first occurrence of each file
+    seen = set()
+    unique = []
+    for path in files:
+        real = os.path.realpath(path)
+        if real not in seen:
+            seen.add(real)
+            unique.append(path)
+    return unique
+
+
+def file_identity(path):
+    """
+    Cheap change detector for resume: an edited or replaced episode is redone
+    """
+    st = os.stat(path)
+    return {"path": os.path.realpath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def result_name(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.blake2b(os.path.realpath(path).encode("utf-8"), digest_size=4).hexdigest()
+    return f"{stem}-{digest}.json"
+
+
+def write_json_atomic(path, value):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# -----------------------
+# CHECKPOINT MANIFEST
+# -----------------------
+class BatchManifest:
+    """
+    Append-only checkpoint log (<out_dir>/manifest.jsonl), one record per
+    finished or failed file. On open the log is replayed and the last record
+    per file wins, so a crashed or interrupted run resumes with the files it
+    had not finished. A record is only appended after the file's result JSON
+    has been atomically written.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.results_dir = os.path.join(out_dir, "results")
+        self.path = os.path.join(out_dir, "manifest.jsonl")
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self.records = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # last line cut short by a crash
+                    self.records[record["path"]] = record
+
+    def is_done(self, path):
+        try:
+            identity = file_identity(path)
+        except OSError:
+            return False  # missing / unreadable: it is attempted and recorded as failed
+        record = self.records.get(identity["path"])
+        return (
+            record is not None
+            and record["status"] == DONE
+            and record["size"] == identity["size"]
+            and record["mtime_ns"] == identity["mtime_ns"]
+            and os.path.exists(os.path.join(self.results_dir, record["result"]))
+        )
+
+    def has_failed(self, path):
+        record = self.records.get(os.path.realpath(path))
+        return record is not None and record["status"] == FAILED
+
+    def append(self, record):
+        self.records[record["path"]] = record
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# -----------------------
+# STAGES
+# -----------------------
+def _decode(path):
+    t0 = time.perf_counter()
+    audio = load_audio_array(path)
+    return audio, time.perf_counter() - t0
+
+
+def _analyze(path, result_path, transcript, metrics, threshold, window, segmenter=None):
+    """
+    Embed, segment, label and summarize one transcript and write its result
+    """
+    full_text, sentences = transcript
+    if not sentences:
+        raise ValueError(NO_SPEECH_ERROR)
+
+    with stage(metrics, "embed", items=len(sentences)):
+        embeddings = get_embeddings(sentences)
+    topics, tree = segment_topics_with_labels(
+        sentences, embeddings, threshold=threshold, window=window, metrics=metrics, segmenter=segmenter,
+        with_tree=True,
+    )
+    with stage(metrics, "sentiment", items=len(topics)):
+        add_sentiment(topics)
+
+    write_json_atomic(result_path, {
+        "file": path,
+        "full_text": full_text,
+        "sentences": sentences,
+        "topics": topics,
+        "chapter_tree": tree.to_dict(),
+        "metrics": metrics.report(),
+    })
+    return topics
+
+
+# -----------------------
+# BATCH RUN
+# -----------------------
+def run_batch(files, out_dir, decode_workers=None, prefetch=None, analyze_workers=None,
+              transcribe_backend=None, whisper_model=None, threshold=0.65, window=None,
+              retry_failed=True, on_file=None, segmenter=None):
+    """
+    Process `files` into <out_dir>/results/, pipelined across files:
+
+        decode (ffmpeg threads) → transcribe (this thread) → analyze (threads)
+
+    Episode N+1 is decoding while episode N is transcribed, and episode N's
+    embedding/segmentation overlaps the transcription of N+1. At most
+    `prefetch` decoded episodes and `analyze_workers` + 1 pending analyses
+    are held at once, so memory stays bounded however long the batch is.
+    Transcription itself still spreads chunks over TRANSCRIBE_WORKERS
+    processes.
+
+    Files already done in the checkpoint manifest are skipped (and failed
+    ones too unless retry_failed). on_file(record) is called as each file
+    finishes. Returns the run summary, also written to <out_dir>/summary.json.
+    """
+    decode_workers = decode_workers or BATCH_DECODE_WORKERS
+    prefetch = prefetch or BATCH_PREFETCH
+    analyze_workers = analyze_workers or BATCH_ANALYZE_WORKERS
+    asr = {"backend": transcribe_backend, "model_size": whisper_model}
+
+    manifest = BatchManifest(out_dir)
+    todo = [
+        f for f in files
+        if not manifest.is_done(f) and (retry_failed or not manifest.has_failed(f))
+    ]
+    summary = {
+        "files": len(files),
+        "skipped": len(files) - len(todo),
+        "done": 0,
+        "failed": 0,
+        "audio_seconds": 0.0,
+    }
+
+    def finish(record):
+        manifest.append(record)
+        summary["done" if record["status"] == DONE else "failed"] += 1
+        if record["status"] == DONE:
+            summary["audio_seconds"] += record["audio_seconds"]
+        if on_file:
+            on_file(record)
+
+    def failed(path, started, error):
+        try:
+            identity = file_identity(path)
+        except OSError:
+            identity = {"path": os.path.realpath(path)}  # gone or unreadable: no size/mtime to record
+        return dict(
+            identity, status=FAILED, error=str(error),
+            seconds=round(time.perf_counter() - started, 3),
+        )
+
+    t_start = time.perf_counter()
+    pending_files = iter(todo)
+    decoding = deque()    # (path, started, future)
+    analyzing = deque()   # (path, record, future)
+
+    def fill_decode_queue():
+        while len(decoding) < prefetch:
+            path = next(pending_files, None)
+            if path is None:
+                return
+            decoding.append((path, time.perf_counter(), decode_pool.submit(_decode, path)))
+
+    def collect_analysis():
+        path, record, future = analyzing.popleft()
+        try:
+            topics = future.result()
+        except Exception as e:
+            finish(failed(path, record.pop("started"), e))
+            return
+        record["seconds"] = round(time.perf_counter() - record.pop("started"), 3)
+        record["topics"] = len(topics)
+        finish(record)
+
+    with ThreadPoolExecutor(decode_workers) as decode_pool, ThreadPoolExecutor(analyze_workers) as analyze_pool:
+        fill_decode_queue()
+        while decoding:
+            path, started, future = decoding.popleft()
+            try:
+                identity = file_identity(path)
+                audio, decode_s = future.result()
+                fill_decode_queue()  # decoding of the next episodes overlaps this transcription
+                metrics = StageMetrics()
+                audio_seconds = len(audio) / SAMPLE_RATE
+                with stage(metrics, "transcribe", audio_seconds=audio_seconds) as counts:
+                    transcript = transcribe(audio, **asr)
+                    counts["items"] = len(transcript[1])
+                del audio
+            except Exception as e:
+                fill_decode_queue()
+                finish(failed(path, started, e))
+                continue
+
+            while len(analyzing) > analyze_workers:
+                collect_analysis()
+
+            name = result_name(path)
+            record = dict(
+                identity, status=DONE, result=name, started=started,
+                audio_seconds=round(audio_seconds, 3), decode_seconds=round(decode_s, 3),
+            )
+            analyzing.append((path, record, analyze_pool.submit(
+                _analyze, path, os.path.join(manifest.results_dir, name), transcript, metrics, threshold, window,
+                segmenter,
+            )))
+
+        while analyzing:
+            collect_analysis()
+
+    wall = time.perf_counter() - t_start
+    summary["wall_seconds"] = round(wall, 3)
+    summary["audio_seconds"] = round(summary["audio_seconds"], 3)
+    summary["audio_hours_per_wall_hour"] = round(summary["audio_seconds"] / wall, 2) if wall > 0 else None
+    write_json_atomic(os.path.join(out_dir, "summary.json"), summary)
+    return summary
@@ -0,0 +1,138 @@
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+DEFAULT_THRESHOLD = 0.65
+DEFAULT_WINDOW = 3      # sentences per block in windowed (TextTiling) mode
+
+
+# -----------------------
+# SIMILARITY HELPERS
+# -----------------------
+def normalize_rows(embeddings):
+    """
+    L2-normalize every row once so cosine similarity becomes a dot product
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def adjacent_similarities(embeddings):
+    """
+    Cosine similarity of every (i - 1, i) sentence pair in one pass.
+    Returns an array of length n - 1 where entry g is the gap before sentence g + 1.
+    """
+    if len(embeddings) < 2:
+        return np.zeros(0, dtype=np.float32)
+
+    normed = normalize_rows(embeddings)
+    return np.einsum("ij,ij->i", normed[:-1], normed[1:])
+
+
+def block_similarities(embeddings, window=DEFAULT_WINDOW):
+    """
+    TextTiling-style gap scores: cosine similarity between the mean of the
+    `window` sentences before each gap and the `window` sentences after it.
+    Block sums come from a single prefix sum, so this is O(n * dim).
+    """
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(0, dtype=np.float32)
+
+    normed = normalize_rows(embeddings)
+    prefix = np.zeros((n + 1, normed.shape[1]), dtype=np.float64)
+    np.cumsum(normed, axis=0, out=prefix[1:])
+
+    gaps = np.arange(1, n)
+    left = prefix[gaps] - prefix[np.maximum(gaps - window, 0)]
+    right = prefix[np.minimum(gaps + window, n)] - prefix[gaps]
+
+    num = np.einsum("ij,ij->i", left, right)
+    denom = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    denom[denom == 0] = 1.0
+    return (num / denom).astype(np.float32)
+
+
+def depth_scores(similarities, window=DEFAULT_WINDOW):
+    """
+    Depth of each gap below the highest similarity within `window` gaps on
+    either side (TextTiling depth score). Deeper valleys = stronger boundaries.
+    """
+    m = len(similarities)
+    if m == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    padded = np.pad(similarities, window, mode="edge")
+    views = np.lib.stride_tricks.sliding_window_view(padded, window + 1)
+    left_peak = views[:m].max(axis=1)
+    right_peak = views[window:window + m].max(axis=1)
+
+    return (left_peak - similarities) + (right_peak - similarities)
+
+
+# -----------------------
+# BOUNDARY DETECTION
+# -----------------------
+def detect_boundaries(embeddings, threshold=DEFAULT_THRESHOLD, window=None, depth_cutoff=None):
+    """
+    Return the indices of sentences that start a new micro-topic.
+
+    - window=None: a boundary wherever adjacent similarity < threshold
+    - window=k:    TextTiling mode; a boundary at local minima of the block
+                   similarity whose depth score >= depth_cutoff
+                   (default: mean - std / 2 of the depth scores)
+    """
+    if window is None:
+        sims = adjacent_similarities(embeddings)
+        return np.flatnonzero(sims < threshold) + 1
+
+    sims = block_similarities(embeddings, window)
+    if len(sims) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    depths = depth_scores(sims, window)
+    if depth_cutoff is None:
+        depth_cutoff = depths.mean() - depths.std() / 2
+
+    padded = np.pad(sims, 1, mode="edge")
+    is_valley = (sims <= padded[:-2]) & (sims <= padded[2:])
+
+    return np.flatnonzero(is_valley & (depths > 0) & (depths >= depth_cutoff)) + 1
+
+
+def build_micro_topics(sentences, boundaries):
+    """
+    Split the sentence list at `boundaries` into topic dicts
+    -> [{"sentences": [...], "start": float, "end": float}]
+    """
+    if not sentences:
+        return []
+
+    edges = [0] + [int(b) for b in boundaries] + [len(sentences)]
+    topics = []
+
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        chunk = sentences[lo:hi]
+        topics.append({
+            "sentences": chunk,
+            "start": chunk[0]["start"],
+            "end": chunk[-1]["end"]
+        })
+
+    return topics
+
+
+def segment_micro_topics(sentences, embeddings, threshold=DEFAULT_THRESHOLD, window=None):
+    """
+    Convenience wrapper: detect boundaries and build micro-topic dicts
+    """
+    if not sentences:
+        return []
+
+    boundaries = detect_boundaries(embeddings, threshold=threshold, window=window)
+    return build_micro_topics(sentences, boundaries)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+CACHE_DIR = os.environ.get("PIPELINE_CACHE_DIR", "cache/pipeline")
+CACHE_MAX_MB = int(os.environ.get("PIPELINE_CACHE_MAX_MB", "2048"))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# -----------------------
+# KEYS
+# -----------------------
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    sha256 of the file content, read in fixed-size chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(config):
+    """
+    Short stable hash of a JSON-serializable config dict
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# -----------------------
+# CACHE
+# -----------------------
+class PipelineCache:
+    """
+    Content-addressed, size-bounded store for per-stage pipeline outputs.
+
+    Entries live as single files named "<audio_hash>-<stage>-<config fp>.<ext>"
+    under `root`. Reads refresh the file's mtime, and once the total size
+    passes `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- keys & bookkeeping ----------
+    def key(self, audio_hash, stage, config):
+        return f"{audio_hash}-{stage}-{fingerprint(config)}"
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, f"{key}.{ext}")
+
+    def _lookup(self, stage, key, ext):
+        path = self._path(key, ext)
+        found = os.path.exists(path)
+        with self._lock:
+            counter = self.hits if found else self.misses
+            counter[stage] = counter.get(stage, 0) + 1
+        if found:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # evicted between the exists() check and now
+                return None
+        return path if found else None
+
+    def _commit(self, tmp_path, key, ext):
+        path = self._path(key, ext)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def _tmp_path(self, ext):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=f".{ext}.tmp")
+        os.close(fd)
+        return tmp_path
+
+    # ---------- typed accessors ----------
+    def get_file(self, stage, key, ext="wav"):
+        return self._lookup(stage, key, ext)
+
+    def put_file(self, key, src_path, ext="wav"):
+        tmp_path = self._tmp_path(ext)
+        shutil.copyfile(src_path, tmp_path)
+        return self._commit(tmp_path, key, ext)
+
+    def get_json(self, stage, key):
+        path = self._lookup(stage, key, "json")
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put_json(self, key, value):
+        tmp_path = self._tmp_path("json")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        return self._commit(tmp_path, key, "json")
+
+    def get_array(self, stage, key):
+        path = self._lookup(stage, key, "npy")
+        return None if path is None else np.load(path)
+
+    def put_array(self, key, array):
+        tmp_path = self._tmp_path("npy")
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        return self._commit(tmp_path, key, "npy")
+
+    # ---------- eviction & stats ----------
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Drop least recently used entries until the cache fits in max_bytes
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+    def drain_counts(self):
+        """
+        Hit/miss/eviction counters since the last drain, reset to zero.
+        Worker processes return these with each job so the API process can
+        merge_counts() them into the numbers /cache/stats reports.
+        """
+        with self._lock:
+            counts = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+            self.hits, self.misses, self.evictions = {}, {}, 0
+        return counts
+
+    def merge_counts(self, counts):
+        with self._lock:
+            for name in ("hits", "misses"):
+                counter = getattr(self, name)
+                for stage, n in counts.get(name, {}).items():
+                    counter[stage] = counter.get(stage, 0) + n
+            self.evictions += counts.get("evictions", 0)
+
+    def stats(self):
+        with self._lock:
+            hits = dict(self.hits)
+            misses = dict(self.misses)
+            evictions = self.evictions
+        total_hits = sum(hits.values())
+        total = total_hits + sum(misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(total_hits / total, 3) if total else 0.0,
+            "evictions": evictions,
+            "entries": len(self._entries()),
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
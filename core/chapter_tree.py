@@ -0,0 +1,232 @@
+import heapq
+
+import numpy as np
+
+from core.boundary_detection import normalize_rows, segment_micro_topics
+from core.topic_chunking import topics_to_spans
+
+
+# -----------------------
+# MERGE TREE
+# -----------------------
+class ChapterTree:
+    """
+    Binary merge tree over an episode's micro-topics, from which a chapter
+    list of any size can be cut without touching the embeddings again.
+
+    Nodes 0..m-1 are the micro-topics (leaves); merge t creates node m + t
+    from two adjacent nodes, so every node is a contiguous run of
+    sentences. Undoing the last k - 1 merges leaves exactly k chapters.
+
+    spans: (n_nodes, 2) sentence index range [lo, hi) per node
+    times: (n_nodes, 2) start / end seconds per node
+    merges: (m - 1, 2) children of each merge, in merge order
+    costs:  Ward cost of each merge (how dissimilar the two halves were)
+    """
+
+    def __init__(self, spans, times, merges, costs):
+        self.spans = spans
+        self.times = times
+        self.merges = merges
+        self.costs = costs
+
+    @property
+    def n_leaves(self):
+        return len(self.merges) + 1 if len(self.spans) else 0
+
+    @property
+    def root(self):
+        return len(self.spans) - 1
+
+    @classmethod
+    def build(cls, micro_topics, sentence_embeddings):
+        """
+        Agglomerative clustering restricted to neighbours: repeatedly merge
+        the adjacent pair with the smallest Ward cost
+
+            n_a * n_b / (n_a + n_b) * ||mean_a - mean_b||^2
+
+        over unit sentence embeddings. Each cluster keeps a running sum and
+        count, so a merge is O(dim) and its centroid never has to be
+        recomputed from the sentences; a heap with lazy deletion of stale
+        pairs gives O(m log m) merges overall. Ward's size weighting folds
+        short fragments into their neighbours before whole topics are
+        joined, so coarse cuts are not littered with one-sentence chapters.
+        """
+        m = len(micro_topics)
+        if m == 0:
+            empty = np.zeros((0, 2))
+            return cls(empty.astype(np.int64), empty, empty.astype(np.int64), np.zeros(0))
+
+        leaf_spans = np.array(topics_to_spans(micro_topics), dtype=np.int64)
+        normed = normalize_rows(sentence_embeddings).astype(np.float64)
+        prefix = np.zeros((len(normed) + 1, normed.shape[1]), dtype=np.float64)
+        np.cumsum(normed, axis=0, out=prefix[1:])
+
+        n_nodes = 2 * m - 1
+        spans = np.zeros((n_nodes, 2), dtype=np.int64)
+        times = np.zeros((n_nodes, 2), dtype=np.float64)
+        spans[:m] = leaf_spans
+        times[:m] = [(t["start"], t["end"]) for t in micro_topics]
+
+        sums = {i: prefix[hi] - prefix[lo] for i, (lo, hi) in enumerate(leaf_spans)}
+        counts = {i: int(hi - lo) for i, (lo, hi) in enumerate(leaf_spans)}
+        prev = {i: i - 1 for i in range(m)}
+        nxt = {i: i + 1 for i in range(m)}
+        prev[0], nxt[m - 1] = None, None
+
+        def ward(a, b):
+            diff = sums[a] / counts[a] - sums[b] / counts[b]
+            return counts[a] * counts[b] / (counts[a] + counts[b]) * float(diff @ diff)
+
+        heap = [(ward(i, i + 1), i, i + 1) for i in range(m - 1)]
+        heapq.heapify(heap)
+
+        merges = np.zeros((m - 1, 2), dtype=np.int64)
+        costs = np.zeros(m - 1, dtype=np.float64)
+        for t in range(m - 1):
+            while True:
+                cost, a, b = heapq.heappop(heap)
+                if a in sums and b in sums and nxt[a] == b:
+                    break
+
+            node = m + t
+            merges[t] = (a, b)
+            costs[t] = cost
+            spans[node] = (spans[a][0], spans[b][1])
+            times[node] = (times[a][0], times[b][1])
+
+            sums[node] = sums.pop(a) + sums.pop(b)
+            counts[node] = counts.pop(a) + counts.pop(b)
+            left, right = prev.pop(a), nxt.pop(b)
+            del nxt[a], prev[b]
+            prev[node], nxt[node] = left, right
+            if left is not None:
+                nxt[left] = node
+                heapq.heappush(heap, (ward(left, node), left, node))
+            if right is not None:
+                prev[right] = node
+                heapq.heappush(heap, (ward(node, right), node, right))
+
+        return cls(spans, times, merges, costs)
+
+    @classmethod
+    def from_sentences(cls, sentences, sentence_embeddings, threshold=0.65, window=None):
+        """
+        Tree over freshly detected micro-topics (for results segmented
+        without one, e.g. streamed analyses)
+        """
+        micro_topics = segment_micro_topics(sentences, sentence_embeddings, threshold=threshold, window=window)
+        return cls.build(micro_topics, sentence_embeddings)
+
+    # ---------- cutting ----------
+    def children(self, node):
+        """
+        (left, right) of an inner node, None for a micro-topic
+        """
+        m = self.n_leaves
+        return tuple(int(c) for c in self.merges[node - m]) if node >= m else None
+
+    def cut(self, k):
+        """
+        Node ids of the k-chapter level in timeline order, O(k): start from
+        the root and split the most recent merges first, keeping the
+        chapters in a linked list so each split is O(1).
+        """
+        m = self.n_leaves
+        if m == 0:
+            return []
+        k = max(1, min(int(k), m))
+
+        head = self.root
+        prev, nxt = {head: None}, {head: None}
+        for node in range(self.root, self.root - (k - 1), -1):
+            left, right = self.children(node)
+            before, after = prev.pop(node), nxt.pop(node)
+            prev[left], nxt[left] = before, right
+            prev[right], nxt[right] = left, after
+            if before is None:
+                head = left
+            else:
+                nxt[before] = left
+            if after is not None:
+                prev[after] = right
+
+        level = []
+        node = head
+        while node is not None:
+            level.append(node)
+            node = nxt[node]
+        return level
+
+    def node_info(self, node):
+        lo, hi = (int(x) for x in self.spans[node])
+        start, end = (float(x) for x in self.times[node])
+        return {
+            "node": int(node),
+            "start": start,
+            "end": end,
+            "first_sentence": lo,
+            "sentence_count": hi - lo,
+            "children": self.children(node),
+        }
+
+    # ---------- storage ----------
+    def to_dict(self):
+        """
+        JSON-serializable form: micro-topics + merge order (inner nodes are
+        rebuilt from them on load)
+        """
+        m = self.n_leaves
+        return {
+            "leaves": [[int(lo), int(hi), float(s), float(e)] for (lo, hi), (s, e) in zip(self.spans[:m], self.times[:m])],
+            "merges": self.merges.tolist(),
+            "costs": [round(float(c), 6) for c in self.costs],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        leaves = data["leaves"]
+        m = len(leaves)
+        merges = np.array(data["merges"], dtype=np.int64).reshape(-1, 2)
+        n_nodes = max(2 * m - 1, 0)
+        spans = np.zeros((n_nodes, 2), dtype=np.int64)
+        times = np.zeros((n_nodes, 2), dtype=np.float64)
+        for i, (lo, hi, start, end) in enumerate(leaves):
+            spans[i], times[i] = (lo, hi), (start, end)
+        for t, (a, b) in enumerate(merges):
+            spans[m + t] = (spans[a][0], spans[b][1])
+            times[m + t] = (times[a][0], times[b][1])
+        return cls(spans, times, merges, np.array(data.get("costs", []), dtype=np.float64))
+
+
+# -----------------------
+# CHAPTER TEXT (runs in an analysis worker)
+# -----------------------
+def describe_chapters(topics, embeddings_path, describe):
+    """
+    Keywords, label, summary and sentiment for topics[i] for each i in
+    `describe`. `topics` is a whole cut (contiguous, covering every
+    sentence), which the batched keyword pass needs; only the requested
+    ones are summarized. Returns one dict per index in `describe`.
+    """
+    from core.embedding_store import load_embeddings
+    from core.pipeline import add_sentiment
+    from core.summarizer import summarize_topics
+    from core.topic_labeling import extract_keywords_batch, generate_topic_label
+
+    embeddings = load_embeddings(embeddings_path).to_array()
+    keywords = extract_keywords_batch(topics, embeddings)
+
+    chosen = [topics[i] for i in describe]
+    try:
+        summaries = summarize_topics(chosen)
+    except Exception:
+        summaries = [" ".join(s["text"] for s in topic["sentences"][:2]) for topic in chosen]
+
+    described = [
+        {"keywords": keywords[i], "label": generate_topic_label(keywords[i]), "summary": summary}
+        for i, summary in zip(describe, summaries)
+    ]
+    add_sentiment(described)
+    return described
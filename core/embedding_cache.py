@@ -0,0 +1,294 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE", "1") != "0"
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", "cache/embeddings")
+EMBEDDING_CACHE_MAX_MB = int(os.environ.get("EMBEDDING_CACHE_MAX_MB", "512"))
+INITIAL_ROWS = 4096
+
+# one index record: 16-byte text key + arena slot
+RECORD = np.dtype([("key", "V16"), ("slot", "<i8")])
+HITS, MISSES, EVICTIONS = range(3)
+
+
+# -----------------------
+# KEYS
+# -----------------------
+def normalize_text(text):
+    """
+    Unicode-normalized, whitespace-collapsed text: what counts as "the same
+    sentence" for caching. Case is kept; the model decides whether it matters.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def text_key(model_name, text):
+    payload = f"{model_name}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+# -----------------------
+# CACHE
+# -----------------------
+class EmbeddingCache:
+    """
+    Persistent, size-bounded sentence-embedding cache for one model.
+
+    Vectors live in a memory-mapped float32 arena (vectors.f32, one row per
+    slot); index.log is an append-only list of (key, slot) records replayed
+    on open, where a later record for a slot replaces the earlier owner.
+    The arena doubles up to max_bytes, after which the least recently used
+    slots (as seen by this process) are reused.
+
+    Worker processes and the API process share the files: every operation
+    holds an exclusive flock and first catches up on records other processes
+    appended. Hit/miss/eviction counters are shared the same way.
+    """
+
+    def __init__(self, model_name, root=EMBEDDING_CACHE_DIR, max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.dir = os.path.join(root, re.sub(r"[^A-Za-z0-9._-]+", "_", model_name))
+        os.makedirs(self.dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.log_path = os.path.join(self.dir, "index.log")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+        self.dim = None
+        self._vectors = None
+        self._index = {}
+        self._owner = []                      # slot -> key
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._tick = 0
+        self._log_ino = None
+        self._log_offset = 0
+
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(os.path.join(self.dir, "lock"), "a+")
+
+        counters_path = os.path.join(self.dir, "counters.bin")
+        if not os.path.exists(counters_path) or os.path.getsize(counters_path) < 24:
+            with open(counters_path, "wb") as f:
+                f.write(bytes(24))
+        self._counters = np.memmap(counters_path, dtype="<i8", mode="r+", shape=(3,))
+
+    # ---------- locking & sync ----------
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @property
+    def max_rows(self):
+        return max(1, self.max_bytes // (4 * self.dim)) if self.dim else 0
+
+    def _capacity(self):
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _map_vectors(self):
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        if rows != self._capacity():
+            self._vectors = (
+                np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim)) if rows else None
+            )
+            grown = np.zeros(rows, dtype=np.int64)
+            grown[:len(self._last_used)] = self._last_used[:rows]
+            self._last_used = grown
+
+    def _claim_slot(self, slot, key):
+        while len(self._owner) <= slot:
+            self._owner.append(None)
+        old = self._owner[slot]
+        if old is not None and self._index.get(old) == slot:
+            del self._index[old]
+        self._owner[slot] = key
+        self._index[key] = slot
+
+    def _refresh(self):
+        """
+        Catch up with what other processes wrote since our last look
+        """
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if self.dim is None:
+            return
+
+        self._map_vectors()
+        if not os.path.exists(self.log_path):
+            return
+
+        stat = os.stat(self.log_path)
+        if stat.st_ino != self._log_ino:
+            # first open, or another process compacted the log
+            self._index, self._owner, self._log_offset = {}, [], 0
+            self._log_ino = stat.st_ino
+
+        size = stat.st_size - stat.st_size % RECORD.itemsize
+        if size != stat.st_size:
+            # a crash cut the last record short (writers hold the lock, so nobody is mid-append)
+            with open(self.log_path, "r+b") as f:
+                f.truncate(size)
+        if size > self._log_offset:
+            records = np.fromfile(self.log_path, dtype=RECORD, offset=self._log_offset)
+            capacity = self._capacity()
+            for record in records:
+                slot = int(record["slot"])
+                if slot < capacity:
+                    self._claim_slot(slot, record["key"].tobytes())
+            self._log_offset = size
+
+    # ---------- storage ----------
+    def _grow(self, rows):
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(rows * 4 * self.dim)  # extends with zeros
+        self._map_vectors()
+
+    def _free_slots(self, count, protected):
+        """
+        `count` slots to write into: unused ones first, then by growing the
+        arena, then by evicting the least recently used entries
+        """
+        slots = []
+        used = len(self._owner)
+        if used < self._capacity():
+            take = min(count, self._capacity() - used)
+            slots.extend(range(used, used + take))
+            self._owner.extend([None] * take)
+
+        if len(slots) < count and self._capacity() < self.max_rows:
+            target = max(INITIAL_ROWS, self._capacity() * 2, len(self._owner) + count - len(slots))
+            first = len(self._owner)
+            self._grow(min(target, self.max_rows))
+            take = min(count - len(slots), self._capacity() - first)
+            slots.extend(range(first, first + take))
+            self._owner.extend([None] * take)
+
+        short = count - len(slots)
+        if short > 0:
+            ages = self._last_used[:len(self._owner)].copy()
+            ages[list(protected) + slots] = np.iinfo(np.int64).max
+            short = min(short, len(ages))
+            victims = np.argpartition(ages, short - 1)[:short] if short else []
+            slots.extend(int(v) for v in victims)
+            self._counters[EVICTIONS] += len(victims)
+        return slots
+
+    def _compact(self):
+        records = np.array(list(self._index.items()), dtype=RECORD)
+        tmp_path = self.log_path + ".tmp"
+        records.tofile(tmp_path)
+        os.replace(tmp_path, self.log_path)
+        stat = os.stat(self.log_path)
+        self._log_ino, self._log_offset = stat.st_ino, stat.st_size
+
+    # ---------- public API ----------
+    def get_many(self, keys):
+        """
+        (vectors, hit mask): rows for keys found in the cache, zeros elsewhere.
+        vectors is None while the cache is still empty.
+        """
+        with self._locked():
+            hit = np.zeros(len(keys), dtype=bool)
+            out = None
+            if self._vectors is not None:
+                out = np.zeros((len(keys), self.dim), dtype=np.float32)
+                for i, key in enumerate(keys):
+                    slot = self._index.get(key)
+                    if slot is not None:
+                        out[i] = self._vectors[slot]
+                        hit[i] = True
+                        self._tick += 1
+                        self._last_used[slot] = self._tick
+            self._counters[HITS] += int(hit.sum())
+            self._counters[MISSES] += int(len(keys) - hit.sum())
+            return out, hit
+
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+
+        with self._locked():
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {vectors.shape[1]} != cached dim {self.dim}")
+
+            new = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._index:
+                    new[key] = vector
+            if not new:
+                return
+
+            recent = [self._index[k] for k in keys if k in self._index]
+            slots = self._free_slots(len(new), recent)
+            records = np.empty(len(slots), dtype=RECORD)
+            for n, (slot, (key, vector)) in enumerate(zip(slots, new.items())):
+                self._vectors[slot] = vector
+                self._claim_slot(slot, key)
+                self._tick += 1
+                self._last_used[slot] = self._tick
+                records[n] = (key, slot)
+            self._vectors.flush()  # vectors reach the file before the records that point at them
+
+            with open(self.log_path, "ab") as f:
+                records.tofile(f)
+            if self._log_ino is None:
+                self._log_ino = os.stat(self.log_path).st_ino
+            self._log_offset += records.nbytes
+
+            if self._log_offset // RECORD.itemsize > 2 * len(self._index) + INITIAL_ROWS:
+                self._compact()
+
+    def stats(self):
+        with self._locked():
+            hits, misses, evictions = (int(c) for c in self._counters)
+            total = hits + misses
+            return {
+                "model": self.model_name,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+                "evictions": evictions,
+                "entries": len(self._index),
+                "capacity_rows": self._capacity(),
+                "max_rows": self.max_rows,
+                "size_bytes": os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """
+    Process-wide cache for `model_name`, or None when EMBEDDING_CACHE=0
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# float32 (default, zero-copy reads), float16 (half the disk) or int8
+# (quarter of the disk, symmetric per-row quantization)
+EMBEDDING_STORE_DTYPE = os.environ.get("EMBEDDING_STORE_DTYPE", "float32")
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+
+def _scales_path(path):
+    return path[:-len(".npy")] + ".scales.npy"
+
+
+def _atomic_save(path, array):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def normalize(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+# -----------------------
+# WRITE
+# -----------------------
+def save_embeddings(path, embeddings, dtype=EMBEDDING_STORE_DTYPE):
+    """
+    Persist a sentence-embedding matrix as a .npy file.
+
+    Rows are L2-normalized before storing, so similarity against a stored
+    matrix is a plain dot product. int8 stores one float32 scale per row
+    next to the matrix (<name>.scales.npy).
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    unit = normalize(embeddings)
+
+    if dtype == "int8":
+        scales = np.abs(unit).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(unit / scales[:, None]).astype(np.int8)
+        _atomic_save(_scales_path(path), scales.astype(np.float32))
+        _atomic_save(path, quantized)
+    else:
+        _atomic_save(path, unit.astype(dtype))
+
+    return path
+
+
+# -----------------------
+# READ
+# -----------------------
+class StoredEmbeddings:
+    """
+    Read-only view over a saved matrix. float32 files are memory-mapped and
+    scored without copying; float16/int8 are upcast per query.
+    """
+
+    def __init__(self, data, scales=None):
+        self.data = data
+        self.scales = scales
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    @property
+    def dim(self):
+        return self.data.shape[1]
+
+    def scores(self, query):
+        """
+        Cosine similarity of one query vector against every stored row
+        """
+        q = normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        if self.data.dtype == np.float32:
+            sims = self.data @ q
+        else:
+            sims = self.data.astype(np.float32) @ q
+        if self.scales is not None:
+            sims *= self.scales
+        return sims
+
+    def to_array(self):
+        """
+        Dequantized float32 copy of the unit-normalized rows
+        """
+        array = np.asarray(self.data, dtype=np.float32)
+        if self.scales is not None:
+            array = array * self.scales[:, None]
+        return array
+
+
+def load_embeddings(path, mmap=True):
+    if not os.path.exists(path):
+        return None
+
+    data = np.load(path, mmap_mode="r" if mmap else None)
+    scales_path = _scales_path(path)
+    scales = np.load(scales_path) if os.path.exists(scales_path) else None
+    return StoredEmbeddings(data, scales)
@@ -1,17 +1,130 @@
-from sentence_transformers import SentenceTransformer
+import os
+from contextlib import contextmanager
+
 import numpy as np
 
-# Lightweight & fast model
-model = SentenceTransformer("paraphrase-MiniLM-L3-v2")
+from core.model_registry import get_model, embedding_model_id
+from core.embedding_cache import get_embedding_cache, text_key
+
+# Lightweight & fast model (paraphrase-MiniLM-L3-v2), loaded lazily and
+# shared with KeyBERT through the model registry
+
+# -----------------------
+# BATCHING
+# -----------------------
+# Inputs are sorted by token length and cut into batches of at most
+# EMBED_TOKEN_BUDGET padded tokens (batch size x longest item), so a
+# batch of one-word replies is large and a batch of long turns is small.
+EMBED_TOKEN_BUDGET = int(os.environ.get("EMBED_TOKEN_BUDGET", "4096"))
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", "128"))
+# torch intra-op threads while encoding (0 = leave torch's setting alone)
+EMBED_THREADS = int(os.environ.get("EMBED_THREADS", "0"))
+
+
+def token_lengths(model, texts):
+    """
+    Tokens per text as the model will see them (truncated to its max length)
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    max_length = getattr(model, "max_seq_length", None) or 512
+    if tokenizer is None:
+        return np.array([len(t.split()) * 4 // 3 + 2 for t in texts])
+    ids = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)["input_ids"]
+    return np.array([len(i) for i in ids])
+
+
+def length_buckets(lengths, token_budget=None, max_batch=None):
+    """
+    Index batches over `lengths` sorted ascending, each holding at most
+    `token_budget` padded tokens and `max_batch` items
+    """
+    token_budget = token_budget or EMBED_TOKEN_BUDGET
+    max_batch = max_batch or EMBED_MAX_BATCH
+
+    order = np.argsort(lengths, kind="stable")
+    batches = []
+    start = 0
+    for end in range(1, len(order) + 1):
+        # sorted ascending, so the newest item is the longest in the batch
+        if end - start > 1 and (
+            (end - start) * lengths[order[end - 1]] > token_budget or end - start > max_batch
+        ):
+            batches.append(order[start:end - 1])
+            start = end - 1
+    if start < len(order):
+        batches.append(order[start:])
+    return batches
+
+
+@contextmanager
+def torch_threads(n):
+    if not n:
+        yield
+        return
+    import torch
+    previous = torch.get_num_threads()
+    torch.set_num_threads(n)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def encode_uncached(texts, token_budget=None, max_batch=None, threads=None):
+    """
+    Model embeddings for `texts` through length-bucketed batches; rows come
+    back in the original order
+    """
+    model = get_model("sentence_transformer")
+    lengths = token_lengths(model, texts)
+    out = None
+
+    with torch_threads(EMBED_THREADS if threads is None else threads):
+        for batch in length_buckets(lengths, token_budget, max_batch):
+            emb = np.asarray(
+                model.encode([texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False),
+                dtype=np.float32
+            )
+            if out is None:
+                out = np.empty((len(texts), emb.shape[1]), dtype=np.float32)
+            out[batch] = emb
+
+    return out
+
+
+def encode_texts(texts):
+    """
+    float32 embeddings for `texts`, in order. Texts already in the
+    persistent embedding cache are read from it; only the distinct misses
+    go through the model, and their vectors are added to the cache.
+    """
+    model_id = embedding_model_id()
+    cache = get_embedding_cache(model_id)
+    if cache is None:
+        return encode_uncached(texts)
+
+    keys = [text_key(model_id, t) for t in texts]
+    cached, hit = cache.get_many(keys)
+
+    # each distinct missing text is encoded once, even if it repeats in `texts`
+    pending = {}
+    for i in np.flatnonzero(~hit):
+        pending.setdefault(keys[i], []).append(i)
+
+    if pending:
+        firsts = [rows[0] for rows in pending.values()]
+        fresh = encode_uncached([texts[i] for i in firsts])
+        cache.put_many(list(pending), fresh)
+        if cached is None:
+            cached = np.zeros((len(texts), fresh.shape[1]), dtype=np.float32)
+        for vector, rows in zip(fresh, pending.values()):
+            cached[rows] = vector
+
+    return cached
+
 
 def get_embeddings(sentences):
     if not sentences:
         return np.zeros((0, 384))
-        
-    texts = [s["text"] for s in sentences]
-    embeddings = model.encode(
-        texts,
-        batch_size=8,
-        show_progress_bar=False
-    )
-    return embeddings
\ No newline at end of file
+
+    return encode_texts([s["text"] for s in sentences])
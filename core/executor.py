@@ -0,0 +1,159 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# Processes that run analysis jobs. The API process then only serves HTTP,
+# so /status and /chat stay responsive while episodes are being analyzed.
+# 0 runs jobs inline in the calling thread (handy for development).
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", os.environ.get("JOB_WORKERS", "1")))
+# Models each worker loads once at start-up, before its first job
+WORKER_PRELOAD_MODELS = os.environ.get(
+    "WORKER_PRELOAD_MODELS", "whisper,sentence_transformer,keybert,summarizer"
+)
+
+
+# -----------------------
+# WORKER PROCESS SIDE
+# -----------------------
+_worker_cache = None
+
+
+def _init_worker(preload, threads, use_cache):
+    """
+    Runs once per worker process: cap torch threads so workers don't fight
+    over cores, open the stage cache and load the models.
+    """
+    global _worker_cache
+
+    if use_cache:
+        from core.cache import PipelineCache
+        _worker_cache = PipelineCache()
+
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    if preload:
+        from core.model_registry import warm_up
+        warm_up(preload)
+
+
+def analysis_job(file_path, options, progress, chapters_path=None):
+    """
+    One full analysis inside a worker process.
+
+    Returns (result, cache_counts). result carries the per-stage timings
+    under "metrics"; cache_counts are the stage-cache hits/misses of this
+    job for the API process to merge into its stats.
+    """
+    from core.instrumentation import StageMetrics
+    from core.pipeline import run_pipeline
+    from core.streaming import stream_to_file
+
+    metrics = StageMetrics()
+    asr = {
+        "transcribe_backend": options.get("transcribe_backend"),
+        "whisper_model": options.get("whisper_model"),
+    }
+    if options.get("mode") == "stream":
+        result = stream_to_file(file_path, chapters_path, progress, metrics=metrics, **asr)
+    else:
+        result = run_pipeline(
+            file_path, progress=progress, cache=_worker_cache, metrics=metrics,
+            audio_hash=options.get("audio_hash"), segmenter=options.get("segmenter"), **asr
+        )
+    result["metrics"] = metrics.report()
+
+    counts = _worker_cache.drain_counts() if _worker_cache is not None else None
+    return result, counts
+
+
+def _ping():
+    return os.getpid()
+
+
+# -----------------------
+# API PROCESS SIDE
+# -----------------------
+class AnalysisExecutor:
+    """
+    Persistent pool of spawned worker processes with models pre-loaded.
+
+    call() blocks the calling (queue worker) thread until the job is done;
+    run() is the awaitable version for async endpoints. A worker that dies
+    (e.g. killed for memory) breaks the pool: the job fails and the pool is
+    rebuilt for the next one.
+    """
+
+    def __init__(self, workers=ANALYSIS_WORKERS, preload=WORKER_PRELOAD_MODELS, use_cache=True):
+        self.workers = workers
+        self.preload = [n.strip() for n in preload.split(",") if n.strip()] if isinstance(preload, str) else preload
+        self.use_cache = use_cache
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.preload, threads, self.use_cache),
+                )
+            return self._pool
+
+    def _reset(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """
+        Spawn the workers now so model loading overlaps server start-up
+        instead of delaying the first job
+        """
+        if self.workers <= 0:
+            # inline mode: the stage cache lives in this process, models load lazily
+            _init_worker([], None, self.use_cache)
+            return
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(_ping)
+
+    def submit(self, fn, *args):
+        if self.workers <= 0:
+            raise RuntimeError("submit() needs ANALYSIS_WORKERS > 0")
+        return self._get_pool().submit(fn, *args)
+
+    def call(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        pool = self._get_pool()
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            self._reset(pool)
+            raise RuntimeError("Analysis worker process died (out of memory?)")
+
+    async def run(self, fn, *args):
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
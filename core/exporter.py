@@ -1,68 +1,316 @@
 import os
 import json
+import zlib
 from fpdf import FPDF
 
 
+def _ensure_dir(output_path):
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def _sentence_texts(transcript):
+    """
+    Transcript as an iterator of text pieces: a plain string, or an
+    iterable of sentence dicts / strings (consumed lazily)
+    """
+    if isinstance(transcript, str):
+        yield transcript
+        return
+    for sentence in transcript:
+        yield sentence["text"] if isinstance(sentence, dict) else sentence
+
+
 # -------------------------------
 # JSON EXPORT
 # -------------------------------
-def export_to_json(topics, output_path):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+def export_to_json(topics, output_path, indent=None):
+    """
+    Compact by default; pass indent=2 for a human-readable file
+    """
+    _ensure_dir(output_path)
 
+    separators = None if indent else (",", ":")
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(topics, f, indent=2, ensure_ascii=False)
+        json.dump(topics, f, indent=indent, separators=separators, ensure_ascii=False)
+
+    return output_path
+
+
+def export_result_json(topics, sentences, output_path):
+    """
+    {"topics": [...], "sentences": [...]} as compact JSON, written one
+    sentence at a time so `sentences` can be any iterator
+    """
+    _ensure_dir(output_path)
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write('{"topics":')
+        f.write(dumps(topics))
+        f.write(',"sentences":[')
+        for i, sentence in enumerate(sentences):
+            if i:
+                f.write(",")
+            f.write(dumps(sentence))
+        f.write("]}")
+
+    return output_path
+
+
+def export_to_ndjson(topics, sentences, output_path):
+    """
+    One JSON object per line: every topic, then every sentence, each tagged
+    with "type", so consumers can process the file line by line
+    """
+    _ensure_dir(output_path)
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with open(output_path, "w", encoding="utf-8") as f:
+        for i, topic in enumerate(topics):
+            f.write(dumps({"type": "topic", "index": i, **topic}) + "\n")
+        for i, sentence in enumerate(sentences):
+            f.write(dumps({"type": "sentence", "index": i, **sentence}) + "\n")
 
     return output_path
 
 
 # -------------------------------
-# PDF EXPORT (TRANSCRIPT + CHAPTERS)
+# STREAMING PDF WRITER
 # -------------------------------
-def export_to_pdf(topics, transcript_text, output_path):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
+# typographic characters outside Latin-1 that transcripts and summaries often contain
+_PDF_TRANSLATE = str.maketrans({
+    "\u00a0": " ", "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u2026": "...",
+})
+_FONTS = {"": ("F1", "Helvetica"), "B": ("F2", "Helvetica-Bold")}
+MM = 72 / 25.4  # points per millimetre
 
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Podcast Transcription & Topic Segmentation", ln=True)
-    pdf.ln(5)
 
-    # -------- TRANSCRIPTION --------
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Full Transcription", ln=True)
-    pdf.ln(3)
+class StreamingPDF:
+    """
+    Minimal text-only PDF writer that sends each page to disk as soon as it
+    is full, so memory holds one page whatever the document length (FPDF
+    keeps every page until output()).
 
-    pdf.set_font("Arial", size=11)
-    safe_text = transcript_text.replace("\u00a0", " ")
+    Uses the built-in Helvetica fonts with FPDF's metrics for line
+    wrapping; layout mirrors the old FPDF report (A4, 10 mm margins, 15 mm
+    bottom margin).
+    """
 
-    pdf.multi_cell(0, 8, safe_text)
-    pdf.ln(5)
+    def __init__(self, output_path, width=210, height=297, margin=10, bottom_margin=15):
+        self.width, self.height = width * MM, height * MM
+        self.margin, self.bottom = margin * MM, bottom_margin * MM
+        self._metrics = FPDF(unit="pt")
+        self._f = open(output_path, "wb")
+        self._offsets = {}
+        self._pages = []
+        self._content = None
+        self._next_obj = 5  # 1 pages, 2/3 fonts, 4 catalog
+        self._font = None
+        self._widths = {}   # (font, word) -> width; transcripts reuse a small vocabulary
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
 
-    # -------- CHAPTERS --------
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Chapters", ln=True)
-    pdf.ln(3)
+    # ---------- low level ----------
+    def _write(self, data):
+        self._f.write(data)
 
-    pdf.set_font("Arial", size=11)
+    def _object(self, number, body):
+        self._offsets[number] = self._f.tell()
+        self._write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
 
-    for i, topic in enumerate(topics, 1):
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 8, f"Chapter {i}: {topic['label']}", ln=True)
+    def _new_number(self):
+        number = self._next_obj
+        self._next_obj += 1
+        return number
 
-        pdf.set_font("Arial", size=11)
-        pdf.cell(
-            0,
-            8,
-            f"Time: {topic['start']:.2f}s - {topic['end']:.2f}s",
-            ln=True,
+    def _flush_page(self):
+        if self._content is None:
+            return
+        stream = zlib.compress("\n".join(self._content).encode("latin-1"))
+        content_obj, page_obj = self._new_number(), self._new_number()
+        self._object(
+            content_obj,
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + stream + b"\nendstream",
+        )
+        self._object(
+            page_obj,
+            f"<< /Type /Page /Parent 1 0 R /MediaBox [0 0 {self.width:.2f} {self.height:.2f}] "
+            f"/Resources << /Font << /F1 2 0 R /F2 3 0 R >> >> /Contents {content_obj} 0 R >>".encode("ascii"),
         )
+        self._pages.append(page_obj)
+        self._content = None
+
+    def add_page(self):
+        self._flush_page()
+        self._content = []
+        self.y = self.margin
+
+    def set_font(self, style="", size=11):
+        self._font = (style, size)
+        self._metrics.set_font("helvetica", style, size)
+
+    def string_width(self, text):
+        key = (self._font, text)
+        width = self._widths.get(key)
+        if width is None:
+            if len(self._widths) > 100000:
+                self._widths.clear()
+            width = self._widths[key] = self._metrics.get_string_width(text)
+        return width
+
+    @staticmethod
+    def _clean(text):
+        text = text.translate(_PDF_TRANSLATE)
+        return text.encode("latin-1", "replace").decode("latin-1")
+
+    def _ensure_room(self, height):
+        if self._content is None or self.y + height > self.height - self.bottom:
+            self.add_page()
+
+    # ---------- layout ----------
+    def cell_line(self, height, text):
+        """
+        One line of text, then move down `height` mm
+        """
+        h = height * MM
+        self._ensure_room(h)
+        style, size = self._font
+        name = _FONTS[style][0]
+        text = self._clean(text).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        # baseline at roughly the vertical centre of the cell, as FPDF does
+        baseline = self.height - (self.y + 0.5 * h + 0.3 * size)
+        self._content.append(f"BT /{name} {size:.2f} Tf {self.margin:.2f} {baseline:.2f} Td ({text}) Tj ET")
+        self.y += h
 
-        summary = topic["summary"].replace("\u00a0", " ")
-        pdf.multi_cell(0, 8, f"Summary: {summary}")
+    def ln(self, height):
+        self.y += height * MM
+
+    def paragraph(self, height, pieces):
+        """
+        Word-wrap an iterator of text pieces into lines as they arrive
+        """
+        max_width = self.width - 2 * self.margin
+        space = self.string_width(" ")
+        line, line_width = [], 0.0
+
+        for piece in pieces:
+            for word in self._clean(piece).split():
+                width = self.string_width(word)
+                while width > max_width:
+                    # a "word" wider than the page (URLs, runs of symbols): hard-split it
+                    if line:
+                        self.cell_line(height, " ".join(line))
+                        line, line_width = [], 0.0
+                    cut = len(word)
+                    while cut > 1 and self.string_width(word[:cut]) > max_width:
+                        cut -= 1
+                    self.cell_line(height, word[:cut])
+                    word = word[cut:]
+                    width = self.string_width(word)
+                if not word:
+                    continue
+                needed = width if not line else line_width + space + width
+                if needed > max_width:
+                    self.cell_line(height, " ".join(line))
+                    line, line_width = [word], width
+                else:
+                    line.append(word)
+                    line_width = needed
+
+        if line:
+            self.cell_line(height, " ".join(line))
+
+    def close(self):
+        self._flush_page()
+        self._object(1, f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in self._pages)}] "
+                        f"/Count {len(self._pages)} >>".encode("ascii"))
+        for number, (_, base) in zip((2, 3), _FONTS.values()):
+            self._object(number, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} "
+                                 f"/Encoding /WinAnsiEncoding >>".encode("ascii"))
+        self._object(4, b"<< /Type /Catalog /Pages 1 0 R >>")
+
+        xref = self._f.tell()
+        count = self._next_obj
+        self._write(f"xref\n0 {count}\n0000000000 65535 f \n".encode("ascii"))
+        for number in range(1, count):
+            self._write(f"{self._offsets[number]:010d} 00000 n \n".encode("ascii"))
+        self._write(f"trailer\n<< /Size {count} /Root 4 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+        self._f.close()
+
+    def abort(self):
+        self._f.close()
+        os.remove(self._f.name)
+
+
+# -------------------------------
+# PDF EXPORT (TRANSCRIPT + CHAPTERS)
+# -------------------------------
+def export_to_pdf(topics, transcript, output_path):
+    """
+    transcript: the full text, or an iterable of sentences (dicts with
+    "text" or plain strings) that is consumed lazily, page by page
+    """
+    _ensure_dir(output_path)
+
+    pdf = StreamingPDF(output_path)
+    try:
+        pdf.add_page()
+
+        pdf.set_font("B", 16)
+        pdf.cell_line(10, "Podcast Transcription & Topic Segmentation")
+        pdf.ln(5)
+
+        # -------- TRANSCRIPTION --------
+        pdf.set_font("B", 14)
+        pdf.cell_line(10, "Full Transcription")
+        pdf.ln(3)
+
+        pdf.set_font("", 11)
+        pdf.paragraph(8, _sentence_texts(transcript))
+        pdf.ln(5)
+
+        # -------- CHAPTERS --------
+        pdf.set_font("B", 14)
+        pdf.cell_line(10, "Chapters")
         pdf.ln(3)
 
-    pdf.output(output_path)
+        for i, topic in enumerate(topics, 1):
+            pdf.set_font("B", 12)
+            pdf.cell_line(8, f"Chapter {i}: {topic['label']}")
+
+            pdf.set_font("", 11)
+            pdf.cell_line(8, f"Time: {topic['start']:.2f}s - {topic['end']:.2f}s")
+
+            pdf.paragraph(8, [f"Summary: {topic['summary']}"])
+            pdf.ln(3)
+    except BaseException:
+        pdf.abort()
+        raise
+
+    pdf.close()
     return output_path
 
+
+# -------------------------------
+# BACKEND ARTIFACTS
+# -------------------------------
+EXPORT_FORMATS = {
+    "pdf": "application/pdf",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_result(fmt, topics, sentences, output_path):
+    """
+    Write one export format of an analysis result; `sentences` may be an iterator
+    """
+    if fmt == "pdf":
+        return export_to_pdf(topics, sentences, output_path)
+    if fmt == "json":
+        return export_result_json(topics, sentences, output_path)
+    if fmt == "ndjson":
+        return export_to_ndjson(topics, sentences, output_path)
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -0,0 +1,281 @@
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# Pipeline stages in execution order (also the order /metrics lists them in)
+STAGES = (
+    "preprocess",
+    "transcribe",
+    "embed",
+    "micro_segment",
+    "chunk",
+    "keyword",
+    "summarize",
+    "sentiment",
+)
+METRIC_PREFIX = "podcast"
+
+
+# -----------------------
+# PEAK RSS
+# -----------------------
+def _read_hwm_bytes():
+    """
+    Peak resident set size of this process (VmHWM), or None off Linux
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_hwm():
+    """
+    Reset VmHWM to the current RSS so the next reading is this stage's peak.
+    Needs Linux >= 4.0; elsewhere readings fall back to the lifetime peak.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    hwm = _read_hwm_bytes()
+    if hwm is not None:
+        return hwm
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+# -----------------------
+# OVERLAPPING STAGES
+# -----------------------
+# Peak RSS and CPU time are process-wide, but stages do run at the same time
+# in one process: the batch CLI analyzes one episode in a thread while it
+# transcribes the next, and JOB_WORKERS > 1 with ANALYSIS_WORKERS=0 runs jobs
+# side by side. Each running stage maps to whether another stage ran during
+# it; only a stage that ran alone gets a peak / CPU of its own.
+_active_lock = threading.Lock()
+_active_stages = {}
+
+
+def _enter_stage():
+    token = object()
+    with _active_lock:
+        if _active_stages:
+            for other in _active_stages:
+                _active_stages[other] = True
+            _active_stages[token] = True
+        else:
+            _reset_hwm()  # never while another stage is measuring its peak
+            _active_stages[token] = False
+    return token
+
+
+def _exit_stage(token):
+    """
+    True when another stage ran at some point during this one
+    """
+    with _active_lock:
+        return _active_stages.pop(token)
+
+
+# -----------------------
+# PER-TASK RECORDER
+# -----------------------
+class StageMetrics:
+    """
+    Collects wall time, CPU time, peak RSS and item counts per pipeline stage
+    for one task. A stage entered more than once (streaming mode runs every
+    stage once per audio chunk) accumulates into a single entry.
+
+    CPU time is this process only; work done in TRANSCRIBE_WORKERS child
+    processes shows up as wall time, not CPU. A stage that overlapped another
+    stage in this process (see OVERLAPPING STAGES) reports its peak RSS and
+    CPU as None; the task totals still cover it.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    @contextmanager
+    def stage(self, name, items=0, audio_seconds=0.0):
+        """
+        with metrics.stage("embed", items=len(sentences)) as counts:
+            ...
+            counts["items"] = ...      # counts may also be set inside the block
+        """
+        counts = {"items": items, "audio_seconds": audio_seconds}
+        token = _enter_stage()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield counts
+        finally:
+            self._add(
+                name,
+                wall=time.perf_counter() - wall0,
+                cpu=time.process_time() - cpu0,
+                peak=peak_rss_bytes(),
+                items=counts["items"],
+                audio_seconds=counts["audio_seconds"],
+                overlapped=_exit_stage(token),
+            )
+
+    def cached(self, *names):
+        """
+        Mark stages whose output came from the pipeline cache
+        """
+        for name in names:
+            self._add(name, cached=True)
+
+    def _add(self, name, wall=0.0, cpu=0.0, peak=0, items=0, audio_seconds=0.0, cached=False, overlapped=False):
+        entry = self.stages.setdefault(name, {
+            "calls": 0,
+            "cached": False,
+            "overlapped": False,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "peak_rss_bytes": 0,
+            "items": 0,
+            "audio_seconds": 0.0,
+        })
+        entry["calls"] += 0 if cached else 1
+        entry["cached"] = entry["cached"] or cached
+        entry["overlapped"] = entry["overlapped"] or overlapped
+        entry["wall_seconds"] += wall
+        entry["cpu_seconds"] += cpu
+        entry["peak_rss_bytes"] = max(entry["peak_rss_bytes"], peak or 0)
+        entry["items"] += items or 0
+        entry["audio_seconds"] += audio_seconds or 0.0
+
+    def report(self):
+        """
+        JSON-ready summary: one dict per stage in pipeline order (with
+        items/s and audio-seconds/s throughput) plus task totals. The totals
+        are process-wide: CPU time of the process while the task ran and the
+        highest RSS seen at the end of any of its stages.
+        """
+        order = list(STAGES) + [n for n in self.stages if n not in STAGES]
+        stages = {}
+        for name in order:
+            if name not in self.stages:
+                continue
+            entry = dict(self.stages[name])
+            wall = entry["wall_seconds"]
+            entry["items_per_second"] = round(entry["items"] / wall, 2) if wall and entry["items"] else None
+            entry["audio_seconds_per_second"] = (
+                round(entry["audio_seconds"] / wall, 2) if wall and entry["audio_seconds"] else None
+            )
+            entry["wall_seconds"] = round(wall, 4)
+            entry["cpu_seconds"] = round(entry["cpu_seconds"], 4)
+            if entry["overlapped"]:
+                entry["cpu_seconds"] = entry["peak_rss_bytes"] = None
+            entry["audio_seconds"] = round(entry["audio_seconds"], 2)
+            stages[name] = entry
+
+        return {
+            "stages": stages,
+            "total_wall_seconds": round(time.perf_counter() - self.started, 4),
+            "total_cpu_seconds": round(time.process_time() - self.cpu_started, 4),
+            "peak_rss_bytes": max((s["peak_rss_bytes"] for s in self.stages.values()), default=0),
+        }
+
+
+@contextmanager
+def stage(metrics, name, items=0, audio_seconds=0.0):
+    """
+    metrics.stage(...) when a StageMetrics is given, otherwise a no-op,
+    so pipeline code can instrument unconditionally
+    """
+    if metrics is None:
+        yield {"items": items, "audio_seconds": audio_seconds}
+    else:
+        with metrics.stage(name, items, audio_seconds) as counts:
+            yield counts
+
+
+# -----------------------
+# PROCESS-WIDE AGGREGATE (/metrics)
+# -----------------------
+class MetricsRegistry:
+    """
+    Running totals over every finished task, rendered in the Prometheus
+    text exposition format. Counters reset with the process, which
+    Prometheus' rate() handles.
+    """
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self.tasks = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def observe_task(self, status, report=None):
+        with self._lock:
+            self.tasks[status] = self.tasks.get(status, 0) + 1
+            for name, s in ((report or {}).get("stages") or {}).items():
+                total = self.stages.setdefault(name, {
+                    "runs": 0, "cached": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                    "items": 0, "audio_seconds": 0.0, "peak_rss_bytes": 0,
+                })
+                total["runs"] += s["calls"]
+                total["cached"] += 1 if s["cached"] else 0
+                total["wall_seconds"] += s["wall_seconds"]
+                total["cpu_seconds"] += s["cpu_seconds"] or 0.0
+                total["items"] += s["items"]
+                total["audio_seconds"] += s["audio_seconds"]
+                total["peak_rss_bytes"] = max(total["peak_rss_bytes"], s["peak_rss_bytes"] or 0)
+
+    def render(self, gauges=None):
+        """
+        Prometheus text format. `gauges` adds point-in-time values such as
+        {"queue_jobs": {"queued": 3, "running": 1}} → podcast_queue_jobs{state="queued"} 3
+        """
+        p = self.prefix
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{p}_{name}{{{label_text}}} {value}" if label_text else f"{p}_{name} {value}")
+
+        with self._lock:
+            tasks = dict(self.tasks)
+            stages = {name: dict(s) for name, s in self.stages.items()}
+
+        metric("tasks_total", "counter", "Finished analysis tasks by outcome.",
+               [({"status": status}, n) for status, n in sorted(tasks.items())])
+
+        per_stage = [
+            ("stage_runs_total", "counter", "Times each stage ran (cache hits excluded).", "runs"),
+            ("stage_cache_hits_total", "counter", "Tasks whose stage output came from the cache.", "cached"),
+            ("stage_wall_seconds_total", "counter", "Wall-clock seconds spent per stage.", "wall_seconds"),
+            ("stage_cpu_seconds_total", "counter", "CPU seconds spent per stage (worker process).", "cpu_seconds"),
+            ("stage_items_total", "counter", "Items processed per stage (sentences, topics, ...).", "items"),
+            ("stage_audio_seconds_total", "counter", "Seconds of audio processed per stage.", "audio_seconds"),
+            ("stage_peak_rss_bytes", "gauge", "Highest resident set size seen during a stage.", "peak_rss_bytes"),
+        ]
+        for name, kind, help_text, field in per_stage:
+            metric(name, kind, help_text,
+                   [({"stage": stage_name}, round(s[field], 6)) for stage_name, s in stages.items()])
+
+        for name, samples in (gauges or {}).items():
+            metric(name, "gauge", name.replace("_", " ").capitalize() + ".",
+                   [({"state": label}, value) for label, value in sorted(samples.items())])
+
+        return "\n".join(lines) + "\n"
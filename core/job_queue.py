@@ -0,0 +1,367 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+import numpy as np
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+JOB_DIR = os.environ.get("JOB_DIR", "jobs")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+MAX_QUEUED_JOBS = int(os.environ.get("MAX_QUEUED_JOBS", "50"))
+# Claims after which a job still running at start-up is failed instead of
+# re-queued (it most likely took the process down with it)
+MAX_JOB_ATTEMPTS = int(os.environ.get("MAX_JOB_ATTEMPTS", "3"))
+POLL_INTERVAL = 1.0  # seconds an idle worker waits before re-checking the table
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    id         TEXT UNIQUE NOT NULL,
+    file_path  TEXT NOT NULL,
+    state      TEXT NOT NULL,
+    stage      TEXT,
+    progress   INTEGER NOT NULL DEFAULT 0,
+    error      TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    options    TEXT,
+    version    INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state_seq ON jobs (state, seq);
+"""
+
+
+class QueueFullError(Exception):
+    """Raised when admission control rejects a new job"""
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class JobProgress:
+    """
+    report(stage, progress) callable that writes straight to the jobs table.
+
+    Holds only the database path and job id, so it pickles and can be handed
+    to a worker process, which then updates status without going through the
+    API process.
+    """
+
+    def __init__(self, db_path, job_id):
+        self.db_path = db_path
+        self.job_id = job_id
+
+    def __call__(self, stage, progress):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET stage = ?, progress = ?, updated_at = ?, version = version + 1 WHERE id = ?",
+                    (stage, progress, time.time(), self.job_id),
+                )
+        finally:
+            conn.close()
+
+
+class JobWatcher:
+    """
+    Lets async handlers wait for a job's version to move past one they have
+    seen (long-polling). A single loop polls the versions of every watched
+    job in one query per interval, however many requests are waiting, and
+    stops when nobody is waiting. Works across processes because workers
+    write their progress straight to the database.
+    """
+
+    def __init__(self, queue, interval=0.25):
+        self.queue = queue
+        self.interval = interval
+        self._waiters = {}   # job_id -> [(known_version, future)]
+        self._task = None
+
+    async def wait(self, job_id, known_version, timeout):
+        """
+        The job's new version once it differs from known_version, or None on timeout
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry = (known_version, future)
+        self._waiters.setdefault(job_id, []).append(entry)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(job_id, [])
+            if entry in waiters:
+                waiters.remove(entry)
+            if not waiters:
+                self._waiters.pop(job_id, None)
+
+    async def _poll(self):
+        while self._waiters:
+            versions = await asyncio.to_thread(self.queue.versions, list(self._waiters))
+            for job_id, waiters in list(self._waiters.items()):
+                version = versions.get(job_id)
+                for known, future in waiters:
+                    if version != known and not future.done():
+                        future.set_result(version)
+            await asyncio.sleep(self.interval)
+
+
+class JobQueue:
+    """
+    Durable FIFO job queue backed by SQLite, with a fixed pool of worker threads.
+
+    handler(job_id, file_path, report, options) runs one job; report(stage, progress)
+    records progress (a picklable JobProgress), options is the dict given to
+    submit(), and the returned dict is written to <root>/results/<id>.json.
+    Jobs still marked running at start-up (the process died mid-job) are
+    re-queued, so work resumes after a crash, unless they have already been
+    claimed max_attempts times, in which case they are failed.
+    """
+
+    def __init__(self, handler, root=JOB_DIR, workers=JOB_WORKERS, max_queued=MAX_QUEUED_JOBS,
+                 max_attempts=MAX_JOB_ATTEMPTS):
+        self.handler = handler
+        self.root = root
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.db_path = os.path.join(root, "jobs.db")
+        self.results_dir = os.path.join(root, "results")
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+
+        os.makedirs(self.results_dir, exist_ok=True)
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "options" not in columns:
+                # databases created before per-job options existed
+                conn.execute("ALTER TABLE jobs ADD COLUMN options TEXT")
+            if "version" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    # ---------- storage ----------
+    @contextmanager
+    def _db(self):
+        """
+        Short-lived connection per call (safe across threads and processes);
+        commits on success, rolls back on error
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._db() as conn:
+            conn.execute(f"UPDATE jobs SET {cols}, version = version + 1 WHERE id = ?", (*fields.values(), job_id))
+
+    def result_path(self, job_id):
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def artifact_path(self, job_id, name):
+        """
+        Side file stored next to the result JSON, e.g. "<id>.embeddings.npy"
+        """
+        return os.path.join(self.results_dir, f"{job_id}.{name}")
+
+    def _write_result(self, job_id, result):
+        fd, tmp_path = tempfile.mkstemp(dir=self.results_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, self.result_path(job_id))
+
+    # ---------- public API ----------
+    def submit(self, job_id, file_path, options=None):
+        """
+        Enqueue a job; raises QueueFullError once max_queued jobs are waiting
+        """
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            waiting = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = ?", (QUEUED,)
+            ).fetchone()[0]
+            if waiting >= self.max_queued:
+                raise QueueFullError(f"{waiting} jobs already queued")
+            conn.execute(
+                "INSERT INTO jobs (id, file_path, state, options, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, file_path, QUEUED, json.dumps(options or {}, sort_keys=True), now, now),
+            )
+
+        with self._wakeup:
+            self._wakeup.notify()
+        return self.position(job_id)
+
+    def find(self, options):
+        """
+        Newest job not failed that was submitted with exactly these options
+        (e.g. same audio hash + settings), or None
+        """
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE options = ? AND state != ? ORDER BY seq DESC LIMIT 1",
+                (json.dumps(options, sort_keys=True), FAILED),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_full(self):
+        return self.queued_count() >= self.max_queued
+
+    def queued_count(self):
+        with self._db() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = ?", (QUEUED,)
+            ).fetchone()[0]
+
+    def get(self, job_id):
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def versions(self, job_ids):
+        """
+        {job_id: version} for the given jobs; every status change bumps a job's version
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        marks = ", ".join("?" * len(job_ids))
+        with self._db() as conn:
+            rows = conn.execute(f"SELECT id, version FROM jobs WHERE id IN ({marks})", job_ids).fetchall()
+        return {row["id"]: row["version"] for row in rows}
+
+    def position(self, job_id):
+        """
+        1-based position among queued jobs (0 once the job has left the queue)
+        """
+        with self._db() as conn:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) FROM jobs
+                WHERE state = ? AND seq <= (SELECT seq FROM jobs WHERE id = ? AND state = ?)
+                """,
+                (QUEUED, job_id, QUEUED),
+            ).fetchone()
+        return row[0]
+
+    def load_result(self, job_id):
+        path = self.result_path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def stats(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: n for state, n in rows}
+        return {"workers": self.workers, "max_queued": self.max_queued, **counts}
+
+    # ---------- workers ----------
+    def recover(self):
+        """
+        Re-queue jobs that were running when the previous process died; fail
+        those already claimed max_attempts times, so a job that crashes the
+        process does not crash-loop the server. Returns (requeued, failed).
+        """
+        now = time.time()
+        with self._db() as conn:
+            failed = conn.execute(
+                "UPDATE jobs SET state = ?, stage = ?, error = ?, updated_at = ?, version = version + 1 "
+                "WHERE state = ? AND attempts >= ?",
+                (FAILED, FAILED, f"Interrupted {self.max_attempts} times (the process died running it)",
+                 now, RUNNING, self.max_attempts),
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET state = ?, stage = NULL, progress = 0, updated_at = ?, version = version + 1 "
+                "WHERE state = ?",
+                (QUEUED, now, RUNNING),
+            ).rowcount
+        return requeued, failed
+
+    def _claim(self):
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, file_path, options FROM jobs WHERE state = ? ORDER BY seq LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ?, version = version + 1 "
+                "WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+        return row["id"], row["file_path"], json.loads(row["options"] or "{}")
+
+    def _run(self, job_id, file_path, options):
+        report = JobProgress(self.db_path, job_id)
+
+        try:
+            result = self.handler(job_id, file_path, report, options)
+            self._write_result(job_id, result)
+            self._update(job_id, state=COMPLETED, stage=COMPLETED, progress=100)
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, state=FAILED, stage=FAILED, error=str(e))
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_INTERVAL)
+                continue
+            self._run(*job)
+
+    def start(self):
+        if self._threads:
+            return
+        recovered, abandoned = self.recover()
+        if recovered:
+            print(f"🔹 Re-queued {recovered} interrupted job(s)")
+        if abandoned:
+            print(f"⚠️ Failed {abandoned} job(s) interrupted {self.max_attempts} times")
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
@@ -1,12 +1,11 @@
-from keybert import KeyBERT
-
-# Use lightweight MiniLM model
-kw_model = KeyBERT(model="paraphrase-MiniLM-L3-v2")
+from core.model_registry import get_model
 
 def extract_keywords_keybert(topic_sentences, top_n=5):
     """
     topic_sentences: list of sentence dicts
     """
+    # Shared KeyBERT instance backed by the registry's MiniLM model
+    kw_model = get_model("keybert")
     text = " ".join([s["text"] for s in topic_sentences])
 
     keywords = kw_model.extract_keywords(
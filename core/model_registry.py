@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL", "base")
+EMBEDDING_MODEL_NAME = "paraphrase-MiniLM-L3-v2"
+# "torch" (default), "int8" (dynamic-quantized Linear layers) or "onnx"
+# (needs sentence-transformers>=3.2 with optimum[onnxruntime])
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+SUMMARIZER_MODEL_NAME = "sshleifer/distilbart-cnn-12-6"
+DEVICE = "cpu"
+
+
+# -----------------------
+# LOADERS (heavy imports stay inside so importing core is cheap)
+# -----------------------
+def _load_whisper():
+    # the configured transcription backend (TRANSCRIBE_BACKEND) at WHISPER_MODEL size
+    from core.transcription_backends import load_default_backend
+    return load_default_backend()
+
+
+def embedding_model_id():
+    """
+    Model name plus backend; quantized vectors differ slightly, so caches
+    key on this rather than the bare model name
+    """
+    if EMBEDDING_BACKEND == "torch":
+        return EMBEDDING_MODEL_NAME
+    return f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_BACKEND}"
+
+
+def _load_sentence_transformer():
+    from sentence_transformers import SentenceTransformer
+
+    if EMBEDDING_BACKEND == "onnx":
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device=DEVICE, backend="onnx")
+
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=DEVICE)
+    if EMBEDDING_BACKEND == "int8":
+        import torch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif EMBEDDING_BACKEND != "torch":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+    return model
+
+
+def _load_keybert():
+    from keybert import KeyBERT
+    # Reuse the embedding model instead of loading a second MiniLM copy
+    return KeyBERT(model=get_model("sentence_transformer"))
+
+
+def _load_summarizer():
+    from transformers import pipeline
+    # Use text-generation pipeline (compatible with new HF versions)
+    return pipeline(
+        "text-generation",
+        model=SUMMARIZER_MODEL_NAME,
+        device=-1  # CPU
+    )
+
+
+# -----------------------
+# REGISTRY
+# -----------------------
+_loaders = {
+    "whisper": _load_whisper,
+    "sentence_transformer": _load_sentence_transformer,
+    "keybert": _load_keybert,
+    "summarizer": _load_summarizer,
+}
+_models = {}
+_locks = {name: threading.Lock() for name in _loaders}
+_registry_lock = threading.Lock()
+
+# seconds spent loading each model, for startup benchmarks
+load_times = {}
+
+
+def register_model(name, loader, replace=True):
+    """
+    Register (or replace) a lazy loader. Replacing drops any loaded instance;
+    with replace=False an existing registration is left alone.
+    """
+    with _registry_lock:
+        if not replace and name in _loaders:
+            return
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        _models.pop(name, None)
+
+
+def registered_models():
+    return list(_loaders)
+
+
+def get_model(name):
+    """
+    Return the shared instance of `name`, loading it on first use.
+    Concurrent first calls block on a per-model lock so it loads only once.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    if name not in _loaders:
+        raise KeyError(f"Unknown model: {name}")
+
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            print(f"🔹 Loading {name} model (only once)...")
+            t0 = time.perf_counter()
+            model = _loaders[name]()
+            load_times[name] = time.perf_counter() - t0
+            _models[name] = model
+
+    return model
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def loaded_models():
+    return list(_models)
+
+
+def warm_up(names=None):
+    """
+    Eagerly load models (all registered ones by default), e.g. at server start
+    """
+    for name in names or list(_loaders):
+        get_model(name)
+    return dict(load_times)
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+
+from core.boundary_detection import normalize_rows
+from core.topic_chunking import (
+    MAX_TOPIC_DURATION, MIN_SENTENCES, MIN_TOPIC_DURATION, spans_to_topics, topics_to_spans,
+)
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# Cost of opening one more topic, in the units of the objective below
+# (summed 1 - cosine of sentences to their topic). Higher = fewer, longer topics.
+SEGMENT_PENALTY = float(os.environ.get("SEGMENT_PENALTY", "2.0"))
+# Cost of a topic below MIN_TOPIC_DURATION / MIN_SENTENCES: large enough that
+# the optimum only keeps one when no valid grouping of that stretch exists
+CONSTRAINT_PENALTY = 1e6
+
+
+# -----------------------
+# DYNAMIC PROGRAMMING OVER SPANS
+# -----------------------
+def optimal_spans(spans, starts, ends, sentence_embeddings, penalty=SEGMENT_PENALTY):
+    """
+    Globally optimal merge of consecutive spans (micro-topics) into topics,
+    a drop-in for chunk_spans' greedy left-to-right pass.
+
+    spans:  [(start_idx, end_idx)] per micro-topic, covering the sentences
+    starts / ends: start and end time (seconds) per micro-topic
+
+    A topic costs  n_sentences - ||sum of its unit sentence embeddings|| + penalty,
+    i.e. the summed (1 - cosine) of its sentences to the topic direction, and
+    the grouping minimizing the total is exact. ||P[i] - P[j]||^2 of the
+    prefix sums at span edges expands into precomputed squared norms and one
+    dot product per candidate.
+
+    Constraints are chunk_spans': a topic may take another micro-topic only
+    while it is shorter than MAX_TOPIC_DURATION, so each end looks back over
+    just the micro-topics within that duration: O(m * w * dim) for m
+    micro-topics and w per max-length topic. Topics under MIN_TOPIC_DURATION
+    or MIN_SENTENCES cost CONSTRAINT_PENALTY (the greedy pass tolerates them
+    at the edges too), so there is always a solution.
+    Returns merged [(start_idx, end_idx, start_time, end_time)].
+    """
+    m = len(spans)
+    if m == 0:
+        return []
+
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    edges = np.array([spans[0][0]] + [hi for _, hi in spans], dtype=np.int64)
+
+    normed = normalize_rows(sentence_embeddings)
+    prefix = np.zeros((len(normed) + 1, normed.shape[1]), dtype=np.float64)
+    np.cumsum(normed, axis=0, out=prefix[1:])
+    prefix = prefix[edges]
+    prefix_sq = np.einsum("ij,ij->i", prefix, prefix)
+
+    # topic of micro-topics j..i-1: allowed while micro-topics j..i-2 last < MAX
+    first = np.zeros(m + 1, dtype=np.int64)
+    first[2:] = np.searchsorted(starts, ends[:-1] - MAX_TOPIC_DURATION, side="right")
+
+    best = np.full(m + 1, np.inf)
+    best[0] = 0.0
+    back = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, m + 1):
+        lo = min(int(first[i]), i - 1)
+        sq = prefix_sq[i] + prefix_sq[lo:i] - 2.0 * (prefix[lo:i] @ prefix[i])
+        count = edges[i] - edges[lo:i]
+        cost = best[lo:i] + count - np.sqrt(np.maximum(sq, 0.0)) + penalty
+        too_short = (count < MIN_SENTENCES) | (ends[i - 1] - starts[lo:i] < MIN_TOPIC_DURATION)
+        cost[too_short] += CONSTRAINT_PENALTY
+
+        k = int(np.argmin(cost))
+        best[i] = cost[k]
+        back[i] = lo + k
+
+    cuts = [m]
+    while cuts[-1] > 0:
+        cuts.append(int(back[cuts[-1]]))
+    cuts.reverse()
+
+    return [
+        (int(edges[j]), int(edges[i]), float(starts[j]), float(ends[i - 1]))
+        for j, i in zip(cuts[:-1], cuts[1:])
+    ]
+
+
+def chunk_topics_optimal(topics, sentence_embeddings, penalty=SEGMENT_PENALTY):
+    """
+    chunk_topics with the DP merge instead of the greedy one
+    """
+    if not topics:
+        return []
+
+    spans = topics_to_spans(topics)
+    merged = optimal_spans(
+        spans,
+        [t["start"] for t in topics],
+        [t["end"] for t in topics],
+        sentence_embeddings,
+        penalty,
+    )
+    return spans_to_topics(topics, spans, merged)
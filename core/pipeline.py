@@ -0,0 +1,223 @@
+import os
+
+from core import model_registry
+from core.cache import hash_file
+from core.instrumentation import stage
+from core.preprocess import SAMPLE_RATE, preprocess_audio, cleanup_processed, load_audio_array
+from core.transcription import transcribe, TRANSCRIBE_WORKERS, MAX_CHUNK_SECONDS
+from core.transcription_backends import TRANSCRIBE_BACKEND
+from core.embeddings import get_embeddings
+from core.topic_segmentation import segment_topics_with_labels, TOPIC_SEGMENTER
+from core.chapter_tree import ChapterTree
+from core import topic_chunking, optimal_segmentation
+
+# "stream" pipes ffmpeg straight into a NumPy buffer for Whisper;
+# "wav" writes (and caches) an intermediate 16 kHz WAV as before
+PREPROCESS_MODE = os.environ.get("PREPROCESS_MODE", "stream")
+
+NO_SPEECH_ERROR = "AI could not detect any clear speech in this audio file. Please try a different recording."
+
+
+# -----------------------
+# STAGE CONFIGS (each one extends the previous, so cache keys chain)
+# -----------------------
+def stage_configs(threshold=0.65, window=None, transcribe_backend=None, whisper_model=None, segmenter=None):
+    processed = {"sample_rate": 16000, "channels": 1}
+    transcript = dict(
+        processed,
+        whisper=whisper_model or model_registry.WHISPER_MODEL_SIZE,
+        chunk_seconds=MAX_CHUNK_SECONDS if TRANSCRIBE_WORKERS > 1 else None,
+    )
+    backend = transcribe_backend or TRANSCRIBE_BACKEND
+    if backend != "whisper":
+        # only non-default backends enter the key, so existing fp32 entries stay valid
+        transcript["backend"] = backend
+    embeddings = dict(transcript, embedding_model=model_registry.embedding_model_id())
+    topics = dict(
+        embeddings,
+        threshold=threshold,
+        window=window,
+        min_duration=topic_chunking.MIN_TOPIC_DURATION,
+        max_duration=topic_chunking.MAX_TOPIC_DURATION,
+        min_sentences=topic_chunking.MIN_SENTENCES,
+        merge_threshold=topic_chunking.MERGE_SIM_THRESHOLD,
+        summarizer=model_registry.SUMMARIZER_MODEL_NAME,
+    )
+    segmenter = segmenter or TOPIC_SEGMENTER
+    if segmenter != "greedy":
+        # same as the backend: the default stays out of the key
+        topics.update(segmenter=segmenter, segment_penalty=optimal_segmentation.SEGMENT_PENALTY)
+    # the tree depends only on the micro-topics, not on how they are merged or labeled
+    chapter_tree = dict(embeddings, threshold=threshold, window=window, linkage="ward")
+    return {
+        "processed": processed,
+        "transcript": transcript,
+        "embeddings": embeddings,
+        "topics": topics,
+        "chapter_tree": chapter_tree,
+    }
+
+
+# -----------------------
+# TRANSCRIPTION VIA A 16 kHz WAV ("wav" preprocess mode)
+# -----------------------
+def _timed_transcribe(path, metrics, asr):
+    import soundfile as sf
+
+    with stage(metrics, "transcribe", audio_seconds=sf.info(path).duration) as counts:
+        full_text, sentences = transcribe(path, **asr)
+        counts["items"] = len(sentences)
+    return full_text, sentences
+
+
+def _transcribe_via_wav(file_path, cache, processed_key, report, metrics=None, asr=None):
+    asr = asr or {}
+    processed_path = cache.get_file("processed", processed_key) if cache else None
+    if processed_path is not None:
+        if metrics:
+            metrics.cached("preprocess")
+        report("Attempting Transcription", 30)
+        return _timed_transcribe(processed_path, metrics, asr)
+
+    with stage(metrics, "preprocess"):
+        tmp_path = preprocess_audio(file_path)
+    try:
+        if cache:
+            # keep a copy for later runs; the temp directory goes away either way
+            cache.put_file(processed_key, tmp_path)
+        report("Attempting Transcription", 30)
+        return _timed_transcribe(tmp_path, metrics, asr)
+    finally:
+        cleanup_processed(tmp_path)
+
+
+# -----------------------
+# SENTIMENT
+# -----------------------
+def add_sentiment(topics):
+    from textblob import TextBlob
+
+    for topic in topics:
+        blob = TextBlob(topic['summary'])
+        sentiment = blob.sentiment.polarity
+        if sentiment > 0.1:
+            topic['sentiment'] = "Positive 😊"
+        elif sentiment < -0.1:
+            topic['sentiment'] = "Negative 😟"
+        else:
+            topic['sentiment'] = "Neutral 😐"
+    return topics
+
+
+# -----------------------
+# FULL PIPELINE
+# -----------------------
+def run_pipeline(file_path, progress=None, cache=None, threshold=0.65, window=None, metrics=None,
+                 transcribe_backend=None, whisper_model=None, audio_hash=None, segmenter=None):
+    """
+    preprocess → transcribe → embed → segment/label/summarize → sentiment
+
+    progress: optional callback(status, percent) for UI feedback
+    cache:    optional PipelineCache; each stage is looked up by audio content
+              hash + the config of every stage up to it, so repeat uploads skip
+              everything and config changes only re-run the affected stages.
+    metrics:  optional StageMetrics recording time/CPU/memory per stage
+    transcribe_backend / whisper_model: per-job transcription choice
+              (defaults: TRANSCRIBE_BACKEND, WHISPER_MODEL)
+    audio_hash: sha256 of the original upload when the caller already has it
+              (computed while the upload streamed in; the stored file may be
+              a transcoded copy), saving a second pass over the file
+    segmenter: per-job topic segmentation engine, "greedy" or "dp"
+              (default: TOPIC_SEGMENTER)
+
+    Returns {"full_text", "sentences", "embeddings", "topics", "chapter_tree"}
+    (chapter_tree: ChapterTree.to_dict() of the micro-topics).
+    """
+    def report(status, percent):
+        if progress:
+            progress(status, percent)
+
+    configs = stage_configs(threshold, window, transcribe_backend, whisper_model, segmenter)
+    asr = {"backend": transcribe_backend, "model_size": whisper_model}
+    if cache and audio_hash is None:
+        audio_hash = hash_file(file_path)
+
+    def key(name):
+        return cache.key(audio_hash, name, configs[name])
+
+    # Step 1 + 2: Preprocessing & Transcription
+    transcript = cache.get_json("transcript", key("transcript")) if cache else None
+
+    if transcript is None:
+        report(" Attempting Preprocessing", 10)
+        if PREPROCESS_MODE == "stream":
+            # ffmpeg → float32 buffer → Whisper, no WAV on disk
+            with stage(metrics, "preprocess") as counts:
+                audio = load_audio_array(file_path)
+                counts["audio_seconds"] = len(audio) / SAMPLE_RATE
+            report("Attempting Transcription", 30)
+            with stage(metrics, "transcribe", audio_seconds=len(audio) / SAMPLE_RATE) as counts:
+                full_text, sentences = transcribe(audio, **asr)
+                counts["items"] = len(sentences)
+            del audio
+        else:
+            full_text, sentences = _transcribe_via_wav(
+                file_path, cache, key("processed") if cache else None, report, metrics, asr
+            )
+        transcript = {"full_text": full_text, "sentences": sentences}
+        if cache and sentences:
+            cache.put_json(key("transcript"), transcript)
+    elif metrics:
+        metrics.cached("preprocess", "transcribe")
+
+    full_text = transcript["full_text"]
+    sentences = transcript["sentences"]
+
+    if not sentences:
+        raise ValueError(NO_SPEECH_ERROR)
+
+    # Step 3: Embeddings
+    embeddings = cache.get_array("embeddings", key("embeddings")) if cache else None
+    if embeddings is None:
+        report("Now Analysis & Embedding", 50)
+        with stage(metrics, "embed", items=len(sentences)):
+            embeddings = get_embeddings(sentences)
+        if cache:
+            cache.put_array(key("embeddings"), embeddings)
+    elif metrics:
+        metrics.cached("embed")
+
+    # Step 4 + 5: Topic Segmentation & Sentiment
+    topics = cache.get_json("topics", key("topics")) if cache else None
+    chapter_tree = cache.get_json("chapter_tree", key("chapter_tree")) if cache else None
+    if topics is None:
+        report("Segmenting The Topics", 80)
+        topics, tree = segment_topics_with_labels(
+            sentences, embeddings, threshold=threshold, window=window, metrics=metrics, segmenter=segmenter,
+            with_tree=True,
+        )
+        chapter_tree = tree.to_dict()
+        with stage(metrics, "sentiment", items=len(topics)):
+            add_sentiment(topics)
+        if cache:
+            cache.put_json(key("topics"), topics)
+            cache.put_json(key("chapter_tree"), chapter_tree)
+    else:
+        if metrics:
+            metrics.cached("micro_segment", "chunk", "keyword", "summarize", "sentiment")
+        if chapter_tree is None:
+            # topics cached before trees existed: rebuilding it is cheap, embeddings are at hand
+            with stage(metrics, "chapter_tree", items=len(sentences)):
+                chapter_tree = ChapterTree.from_sentences(sentences, embeddings, threshold, window).to_dict()
+            if cache:
+                cache.put_json(key("chapter_tree"), chapter_tree)
+        elif metrics:
+            metrics.cached("chapter_tree")
+
+    return {
+        "full_text": full_text,
+        "sentences": sentences,
+        "embeddings": embeddings,
+        "topics": topics,
+        "chapter_tree": chapter_tree,
+    }
@@ -1,6 +1,13 @@
 import os
+import shutil
 import subprocess
 import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+READ_CHUNK_SAMPLES = 1 << 20   # ~65 s of 16 kHz audio per pipe read
 
 def preprocess_audio(input_path):
     output_path = os.path.join(
@@ -19,3 +26,108 @@ def preprocess_audio(input_path):
 
     subprocess.run(cmd, check=True)
     return output_path
+
+
+def cleanup_processed(processed_path):
+    """
+    Remove the temp directory preprocess_audio created for `processed_path`
+    """
+    shutil.rmtree(os.path.dirname(processed_path), ignore_errors=True)
+
+
+@contextmanager
+def processed_audio(input_path):
+    """
+    preprocess_audio() whose temp directory is always removed afterwards
+    """
+    processed_path = preprocess_audio(input_path)
+    try:
+        yield processed_path
+    finally:
+        cleanup_processed(processed_path)
+
+
+# -------------------------------
+# STREAMING DECODE (no intermediate WAV)
+# -------------------------------
+def probe_duration(input_path):
+    """
+    Duration in seconds from container metadata (ffprobe), without decoding
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        input_path
+    ]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.strip()
+    try:
+        return float(out)
+    except ValueError:
+        return None
+
+
+def load_audio_array(input_path, duration=None):
+    """
+    Decode any ffmpeg-readable file to 16 kHz mono float32 in one pass.
+
+    ffmpeg writes s16le to a pipe; each chunk is scaled straight into a
+    float32 buffer preallocated from the ffprobe duration, so the full
+    signal is only ever held once (4 bytes/sample) and nothing touches disk.
+    """
+    if duration is None:
+        duration = probe_duration(input_path)
+
+    capacity = int((duration or 60) * SAMPLE_RATE) + SAMPLE_RATE
+    audio = np.empty(capacity, dtype=np.float32)
+    scratch = np.empty(READ_CHUNK_SAMPLES, dtype=np.int16)
+    scratch_bytes = memoryview(scratch).cast("B")
+
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel", "error",
+        "-i", input_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "pipe:1"
+    ]
+    # stderr goes to a file, not a pipe: with both piped, >64 KB of decode
+    # warnings would block ffmpeg while we block reading stdout
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+
+    n = 0
+    pending = b""
+    try:
+        while True:
+            read = proc.stdout.readinto(scratch_bytes[len(pending):])
+            if not read and not pending:
+                break
+            if pending:
+                scratch_bytes[:len(pending)] = pending
+            total = len(pending) + (read or 0)
+            usable = total - total % 2
+            pending = bytes(scratch_bytes[usable:total])
+            if usable == 0:
+                break
+
+            samples = usable // 2
+            if n + samples > capacity:
+                capacity = max(capacity * 2, n + samples)
+                audio = np.resize(audio, capacity)
+            np.multiply(scratch[:samples], 1 / 32768.0, out=audio[n:n + samples], casting="unsafe")
+            n += samples
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        errors.seek(0)
+        stderr = errors.read().decode("utf-8", "replace")
+        errors.close()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+
+    return audio[:n]
@@ -0,0 +1,236 @@
+import base64
+import gzip
+import json
+import os
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: ~5-10x faster encoding when installed
+    orjson = None
+
+# one row per sentence: byte offset of its NDJSON line + its time span
+ROW = np.dtype([("offset", "<i8"), ("start", "<f8"), ("end", "<f8")])
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5  # most of level 9's ratio on JSON at a fraction of the time
+
+
+# -----------------------
+# ENCODING
+# -----------------------
+def dumps(value):
+    """
+    Compact UTF-8 JSON bytes (orjson when installed)
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def maybe_gzip(body, accept_encoding):
+    """
+    (body, extra headers): gzip-compressed when the client accepts it and it pays off
+    """
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in (accept_encoding or ""):
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    return body, {"Vary": "Accept-Encoding"}
+
+
+def encode_cursor(position, stop):
+    return base64.urlsafe_b64encode(f"{position}:{stop}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, total):
+    """
+    (position, stop) from a cursor over `total` rows; ValueError when it is
+    malformed or out of range
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    position, stop = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+    position, stop = int(position), int(stop)
+    if not 0 <= position <= stop <= total:
+        raise ValueError(f"cursor range {position}:{stop} outside 0:{total}")
+    return position, stop
+
+
+# -----------------------
+# TOPICS
+# -----------------------
+def compact_topics(topics):
+    """
+    Topics with their nested sentence lists replaced by an index range into
+    the flat sentence list (first_sentence, sentence_count). Topics cover
+    the transcript contiguously and in order, so a running count suffices.
+    Topics already compact are returned unchanged.
+    """
+    compact = []
+    first = 0
+    for topic in topics:
+        if "sentences" not in topic:
+            compact.append(topic)
+            continue
+        count = len(topic["sentences"])
+        topic = {k: v for k, v in topic.items() if k != "sentences"}
+        topic.update(first_sentence=first, sentence_count=count)
+        compact.append(topic)
+        first += count
+    return compact
+
+
+def project(items, fields):
+    """
+    Keep only `fields` of each dict (None keeps everything)
+    """
+    if not fields:
+        return items
+    return [{k: item[k] for k in fields if k in item} for item in items]
+
+
+# -----------------------
+# SENTENCE INDEX
+# -----------------------
+class SentenceIndex:
+    """
+    A result's sentences as NDJSON (<prefix>.ndjson) with a table of
+    (byte offset, start, end) per sentence (<prefix>.idx.npy).
+
+    A page is one contiguous read of the NDJSON file, sent on as-is (no
+    parse / re-serialize); time ranges are two binary searches over the
+    start/end columns. Only the table is loaded, memory-mapped.
+    """
+
+    def __init__(self, prefix, rows):
+        self.prefix = prefix
+        self.rows = rows
+
+    @staticmethod
+    def paths(prefix):
+        return prefix + ".ndjson", prefix + ".idx.npy"
+
+    @classmethod
+    def build(cls, prefix, sentences):
+        data_path, index_path = cls.paths(prefix)
+        rows = np.empty(len(sentences), dtype=ROW)
+
+        tmp_data = data_path + ".tmp"
+        with open(tmp_data, "wb") as f:
+            for i, sentence in enumerate(sentences):
+                rows[i] = (f.tell(), sentence["start"], sentence["end"])
+                f.write(dumps(sentence) + b"\n")
+        os.replace(tmp_data, data_path)
+
+        tmp_index = index_path + ".tmp"
+        with open(tmp_index, "wb") as f:
+            np.save(f, rows)
+        os.replace(tmp_index, index_path)  # written last: its presence means the pair is complete
+        return cls(prefix, rows)
+
+    @classmethod
+    def load(cls, prefix):
+        data_path, index_path = cls.paths(prefix)
+        if not (os.path.exists(index_path) and os.path.exists(data_path)):
+            return None
+        rows = np.load(index_path, mmap_mode="r")
+        return cls(prefix, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def time_range(self, t_start=None, t_end=None):
+        """
+        Index range [lo, hi) of sentences overlapping [t_start, t_end)
+        """
+        lo = 0 if t_start is None else int(np.searchsorted(self.rows["end"], t_start, side="right"))
+        hi = len(self.rows) if t_end is None else int(np.searchsorted(self.rows["start"], t_end, side="left"))
+        return lo, max(lo, hi)
+
+    def __getitem__(self, i):
+        return loads(self.raw_lines(i, i + 1))
+
+    def raw_lines(self, lo, hi):
+        """
+        NDJSON bytes of sentences lo..hi-1 in a single read
+        """
+        if lo >= hi:
+            return b""
+        begin = int(self.rows["offset"][lo])
+        with open(self.paths(self.prefix)[0], "rb") as f:
+            f.seek(begin)
+            if hi < len(self.rows):
+                return f.read(int(self.rows["offset"][hi]) - begin)
+            return f.read()
+
+    def read(self, lo, hi):
+        """
+        Sentences lo..hi-1 as dicts
+        """
+        return [loads(line) for line in self.raw_lines(lo, hi).splitlines()]
+
+    def __iter__(self):
+        """
+        Every sentence in order, parsed one line at a time
+        """
+        with open(self.paths(self.prefix)[0], "rb") as f:
+            for line in f:
+                yield loads(line)
+
+    def json_array(self, lo, hi, fields=None):
+        """
+        Sentences lo..hi-1 as a JSON array (bytes); untouched lines are spliced
+        in directly, projection parses only the requested page
+        """
+        lines = self.raw_lines(lo, hi).splitlines()
+        if fields:
+            return dumps(project([loads(line) for line in lines], fields))
+        return b"[" + b",".join(lines) + b"]"
+
+
+# -----------------------
+# RESULT SIDE FILES
+# -----------------------
+def write_result_index(prefix, result):
+    """
+    Read-optimized side files of a finished result:
+        <prefix>.summary.json    compact topics + metadata
+        <prefix>.text.txt        full transcript text
+        <prefix>.sentences.*     SentenceIndex
+    """
+    SentenceIndex.build(prefix + ".sentences", result["sentences"])
+    for path, data in (
+        (prefix + ".text.txt", result.get("full_text", "").encode("utf-8")),
+        (prefix + ".summary.json", dumps({
+            "topics": compact_topics(result["topics"]),
+            "metadata": result.get("metadata"),
+        })),
+    ):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def load_result_index(prefix, load_result):
+    """
+    (summary dict, SentenceIndex) for a result, building the side files from
+    load_result() first for results stored before they existed
+    """
+    index = SentenceIndex.load(prefix + ".sentences")
+    if index is None or not os.path.exists(prefix + ".summary.json"):
+        result = load_result()
+        if result is None:
+            return None, None
+        write_result_index(prefix, result)
+        index = SentenceIndex.load(prefix + ".sentences")
+    with open(prefix + ".summary.json", "rb") as f:
+        summary = loads(f.read())
+    return summary, index
+
+
+def load_full_text(prefix):
+    with open(prefix + ".text.txt", "r", encoding="utf-8") as f:
+        return f.read()
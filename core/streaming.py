@@ -0,0 +1,207 @@
+import json
+import os
+
+import numpy as np
+
+from core.audio_chunking import SAMPLE_RATE, split_on_silence
+from core.boundary_detection import detect_boundaries
+from core.embeddings import get_embeddings
+from core.instrumentation import stage
+from core.pipeline import add_sentiment, NO_SPEECH_ERROR
+from core.preprocess import load_audio_array
+from core.summarizer import summarize_topics
+from core.topic_chunking import chunk_spans, span_sums
+from core.topic_labeling import extract_keywords_batch, generate_topic_label
+from core.transcription import transcribe_chunk
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+STREAM_CHUNK_SECONDS = float(os.environ.get("STREAM_CHUNK_SECONDS", "60"))
+
+
+# -----------------------
+# HELPERS
+# -----------------------
+def stable_chapters(sentences, embeddings, open_start, threshold, final=False, metrics=None):
+    """
+    Run micro-segmentation + chunking over the still-open tail of the episode
+    (sentences[open_start:]) and return the chapters whose extent can no
+    longer change, as global (start_idx, end_idx, start_time, end_time).
+
+    Adjacent-pair boundaries never change once both sentences exist, and the
+    greedy merge only compares a chapter with the next micro-topic. So every
+    chapter is final except the one holding the last (still growing)
+    micro-topic, and, when that micro-topic is a chapter on its own, the
+    chapter before it, whose merge decision depended on it.
+    """
+    region = sentences[open_start:]
+    if not region:
+        return []
+
+    emb = embeddings[open_start:]
+    with stage(metrics, "micro_segment", items=len(region)):
+        edges = [0] + [int(b) for b in detect_boundaries(emb, threshold)] + [len(region)]
+        spans = list(zip(edges[:-1], edges[1:]))
+
+    with stage(metrics, "chunk", items=len(spans)):
+        merged = chunk_spans(
+            spans,
+            [region[lo]["start"] for lo, _ in spans],
+            [region[hi - 1]["end"] for _, hi in spans],
+            span_sums(spans, emb),
+        )
+
+    if not final:
+        last = merged.pop()
+        if merged and last[0] == spans[-1][0]:
+            merged.pop()
+
+    return [(lo + open_start, hi + open_start, start, end) for lo, hi, start, end in merged]
+
+
+def finish_chapters(spans, sentences, embeddings, metrics=None):
+    """
+    Label, summarize and score sentiment for a run of closed chapters
+    """
+    topics = [
+        {"sentences": sentences[lo:hi], "start": start, "end": end}
+        for lo, hi, start, end in spans
+    ]
+    if not topics:
+        return []
+
+    lo, hi = spans[0][0], spans[-1][1]
+    with stage(metrics, "keyword", items=len(topics)):
+        keywords = extract_keywords_batch(topics, embeddings[lo:hi])
+    with stage(metrics, "summarize", items=len(topics)):
+        try:
+            summaries = summarize_topics(topics)
+        except Exception:
+            summaries = [" ".join(s["text"] for s in t["sentences"][:2]) for t in topics]
+
+    for topic, kw, summary in zip(topics, keywords, summaries):
+        topic["keywords"] = kw
+        topic["label"] = generate_topic_label(kw)
+        topic["summary"] = summary
+
+    with stage(metrics, "sentiment", items=len(topics)):
+        return add_sentiment(topics)
+
+
+def chapter_event(index, topic):
+    """
+    Compact chapter payload for clients (no nested sentence list)
+    """
+    return {
+        "type": "chapter",
+        "index": index,
+        "chapter": {
+            "label": topic["label"],
+            "start": topic["start"],
+            "end": topic["end"],
+            "summary": topic["summary"],
+            "keywords": topic["keywords"],
+            "sentiment": topic.get("sentiment"),
+            # stored results keep compact topics (sentence_count instead of sentences)
+            "sentence_count": topic.get("sentence_count", len(topic.get("sentences", ()))),
+        },
+    }
+
+
+# -----------------------
+# STREAMING PIPELINE
+# -----------------------
+def stream_analysis(file_path, chunk_seconds=None, threshold=0.65, metrics=None,
+                    transcribe_backend=None, whisper_model=None):
+    """
+    Generator over the episode in audio chunks. For each chunk it
+    transcribes, embeds, closes every chapter whose boundaries are now
+    stable and labels/summarizes those right away.
+
+    Yields events:
+      {"type": "progress", "audio_seconds", "duration", "sentences"}
+      {"type": "chapter", "index", "chapter"}        as soon as one is final
+      {"type": "done", "result"}                     same dict as run_pipeline
+
+    metrics: optional StageMetrics; per-chunk stage timings accumulate into it
+    """
+    chunk_seconds = chunk_seconds or STREAM_CHUNK_SECONDS
+
+    with stage(metrics, "preprocess") as counts:
+        audio = load_audio_array(file_path)
+        counts["audio_seconds"] = len(audio) / SAMPLE_RATE
+    duration = len(audio) / SAMPLE_RATE
+    if duration < 1:
+        raise ValueError("Audio is empty or too short for transcription")
+
+    texts = []
+    sentences = []
+    embeddings = np.zeros((0, 0), dtype=np.float32)
+    topics = []
+    open_start = 0
+
+    chunks = split_on_silence(audio, chunk_seconds)
+    del audio
+
+    for n, (offset, chunk) in enumerate(chunks):
+        is_last = n == len(chunks) - 1
+
+        if len(chunk) >= SAMPLE_RATE:  # Whisper needs at least ~1 s
+            with stage(metrics, "transcribe", audio_seconds=len(chunk) / SAMPLE_RATE) as counts:
+                text, new_sentences = transcribe_chunk(chunk, offset, transcribe_backend, whisper_model)
+                counts["items"] = len(new_sentences)
+            if text:
+                texts.append(text)
+            if new_sentences:
+                sentences.extend(new_sentences)
+                with stage(metrics, "embed", items=len(new_sentences)):
+                    new_emb = np.asarray(get_embeddings(new_sentences), dtype=np.float32)
+                embeddings = new_emb if len(embeddings) == 0 else np.concatenate([embeddings, new_emb])
+
+        yield {
+            "type": "progress",
+            "audio_seconds": round(offset + len(chunk) / SAMPLE_RATE, 2),
+            "duration": round(duration, 2),
+            "sentences": len(sentences),
+        }
+
+        closed = stable_chapters(sentences, embeddings, open_start, threshold, final=is_last, metrics=metrics)
+        for topic in finish_chapters(closed, sentences, embeddings, metrics):
+            topics.append(topic)
+            yield chapter_event(len(topics) - 1, topic)
+        if closed:
+            open_start = closed[-1][1]
+
+    if not sentences:
+        raise ValueError(NO_SPEECH_ERROR)
+
+    yield {
+        "type": "done",
+        "result": {
+            "full_text": " ".join(texts),
+            "sentences": sentences,
+            "embeddings": embeddings,
+            "topics": topics,
+        },
+    }
+
+
+def stream_to_file(file_path, chapters_path, progress=None, chunk_seconds=None, threshold=0.65, metrics=None,
+                   transcribe_backend=None, whisper_model=None):
+    """
+    Run stream_analysis(), appending each final chapter event as one NDJSON
+    line to `chapters_path` and reporting progress through progress(stage, pct).
+    Returns the same dict as run_pipeline.
+    """
+    with open(chapters_path, "w", encoding="utf-8") as out:  # truncates a previous, interrupted attempt
+        for event in stream_analysis(file_path, chunk_seconds, threshold, metrics, transcribe_backend, whisper_model):
+            if event["type"] == "progress":
+                if progress:
+                    done = event["audio_seconds"] / max(event["duration"], 1e-9)
+                    progress("Streaming Analysis", int(10 + 85 * done))
+            elif event["type"] == "chapter":
+                out.write(json.dumps(event, ensure_ascii=False) + "\n")
+                out.flush()
+            else:
+                return event["result"]
@@ -1,39 +1,103 @@
-from transformers import pipeline
+import os
+import time
 
-# Use text-generation pipeline (compatible with new HF versions)
-summarizer = pipeline(
-    "text-generation",
-    model="sshleifer/distilbart-cnn-12-6",
-    device=-1  # CPU
+from core.model_registry import get_model
+
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "8"))
+MAX_INPUT_WORDS = 400
+MIN_SUMMARY_WORDS = 25
+
+GENERATION_KWARGS = dict(
+    max_length=150,
+    min_length=30,
+    do_sample=False,
+    truncation=True
 )
 
+
+def _extract_summary(result, text):
+    # Handle different result keys depending on pipeline
+    if isinstance(result, list):
+        result = result[0]
+    summary = result.get("summary_text") or result.get("generated_text")
+    return summary.strip() if summary else text
+
+
 def summarize_topic(sentences, max_sentences=2):
     # Join sentences into text
     text = " ".join(s["text"] for s in sentences).strip()
-    
+
     if not text:
         return "No content to summarize."
 
     # Very small topics -> return first few sentences
     word_count = len(text.split())
-    if word_count < 25:
+    if word_count < MIN_SUMMARY_WORDS:
         return text
 
     try:
         # Truncate if too long for DistilBART
-        input_text = " ".join(text.split()[:400])
-        
-        result = summarizer(
-            input_text,
-            max_length=150,
-            min_length=30,
-            do_sample=False,
-            truncation=True
-        )
-        # Handle different result keys depending on pipeline
-        summary = result[0].get("summary_text") or result[0].get("generated_text")
-        return summary.strip() if summary else text
+        input_text = " ".join(text.split()[:MAX_INPUT_WORDS])
+
+        summarizer = get_model("summarizer")
+        result = summarizer(input_text, **GENERATION_KWARGS)
+        return _extract_summary(result, text)
     except Exception as e:
         print(f"Summarization error: {e}")
         # Fallback to first few sentences
         return " ".join(s["text"] for s in sentences[:max_sentences])
+
+
+def summarize_topics(topics, batch_size=None, max_sentences=2, batch_stats=None):
+    """
+    Summaries for many topics through batched pipeline calls.
+
+    Inputs are sorted by length so each batch pads to similar sizes. Empty
+    and very short topics skip the model exactly as in summarize_topic, and
+    a failing batch is retried topic by topic so each one still gets its own
+    fallback. If `batch_stats` is a list, one
+    {"batch", "size", "words", "seconds"} dict per model call is appended.
+    Returns summaries in the order of `topics`.
+    """
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    summaries = [None] * len(topics)
+    pending = []
+
+    for i, topic in enumerate(topics):
+        text = " ".join(s["text"] for s in topic["sentences"]).strip()
+        words = text.split()
+        if not text:
+            summaries[i] = "No content to summarize."
+        elif len(words) < MIN_SUMMARY_WORDS:
+            summaries[i] = text
+        else:
+            pending.append((i, text, " ".join(words[:MAX_INPUT_WORDS])))
+
+    pending.sort(key=lambda p: len(p[2]))
+    summarizer = get_model("summarizer") if pending else None
+
+    for batch_no, lo in enumerate(range(0, len(pending), batch_size)):
+        batch = pending[lo:lo + batch_size]
+        t0 = time.perf_counter()
+        try:
+            results = summarizer(
+                [input_text for _, _, input_text in batch],
+                batch_size=len(batch),
+                **GENERATION_KWARGS
+            )
+            for (i, text, _), result in zip(batch, results):
+                summaries[i] = _extract_summary(result, text)
+        except Exception as e:
+            print(f"Batched summarization error, retrying per topic: {e}")
+            for i, _, _ in batch:
+                summaries[i] = summarize_topic(topics[i]["sentences"], max_sentences)
+
+        if batch_stats is not None:
+            batch_stats.append({
+                "batch": batch_no,
+                "size": len(batch),
+                "words": sum(len(p[2].split()) for p in batch),
+                "seconds": round(time.perf_counter() - t0, 4),
+            })
+
+    return summaries
@@ -1,11 +1,11 @@
 from core.preprocess import preprocess_audio
 from core.transcription import transcribe
 from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics
+from core.segment_topics import segment_topics
 
 # Step 1: preprocess + transcribe
 audio_path = preprocess_audio("data/sample.mp3")
-sentences = transcribe(audio_path)
+_, sentences = transcribe(audio_path)
 
 # Step 2: embeddings
 embeddings = get_embeddings(sentences)
@@ -1,4 +1,3 @@
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 # -----------------------
@@ -17,57 +16,68 @@ def topic_duration(topic):
     return topic["end"] - topic["start"]
 
 
-def get_topic_embedding(topic, sentence_embeddings, index_map):
+def cosine(a, b):
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
+
+
+def topics_to_spans(topics):
     """
-    Average embedding of all sentences in a topic
+    Micro-topics are contiguous runs over the sentence array, so each one
+    can be represented by its (start_idx, end_idx) half-open span.
     """
-    indices = [index_map[id(s)] for s in topic["sentences"]]
-    return np.mean(sentence_embeddings[indices], axis=0).reshape(1, -1)
+    spans = []
+    idx = 0
+    for topic in topics:
+        n = len(topic["sentences"])
+        spans.append((idx, idx + n))
+        idx += n
+    return spans
 
 
-def merge_topics(t1, t2):
-    return {
-        "sentences": t1["sentences"] + t2["sentences"],
-        "start": t1["start"],
-        "end": t2["end"],
-    }
+def span_sums(spans, sentence_embeddings):
+    """
+    Embedding sum of each span via one prefix sum over the sentence matrix
+    """
+    emb = np.asarray(sentence_embeddings, dtype=np.float64)
+    prefix = np.zeros((len(emb) + 1, emb.shape[1]), dtype=np.float64)
+    np.cumsum(emb, axis=0, out=prefix[1:])
+
+    starts = np.array([s for s, _ in spans], dtype=np.int64)
+    ends = np.array([e for _, e in spans], dtype=np.int64)
+    return prefix[ends] - prefix[starts]
 
 
 # -----------------------
-# MAIN CHUNKING LOGIC
+# SPAN-LEVEL CHUNKING
 # -----------------------
-def chunk_topics(topics, sentence_embeddings):
-    """
-    Merge micro-topics into macro topics using:
-    - duration
-    - semantic similarity
-    - sentence count
+def chunk_spans(spans, starts, ends, sums):
     """
+    Greedy left-to-right merge over spans.
 
-    if not topics:
-        return []
-
-    # 🔹 Build sentence → embedding index map (GLOBAL, CORRECT)
-    index_map = {}
-    global_idx = 0
-    for topic in topics:
-        for s in topic["sentences"]:
-            index_map[id(s)] = global_idx
-            global_idx += 1
+    spans:  [(start_idx, end_idx)] per micro-topic
+    starts / ends: start and end time (seconds) per micro-topic
+    sums:   (n_topics, dim) embedding sum per micro-topic
 
-    chunked_topics = [topics[0]]
-
-    for i in range(1, len(topics)):
-        current = topics[i]
-        prev = chunked_topics[-1]
+    A merged topic keeps a running embedding sum, so its centroid updates in
+    O(dim) per merge. Cosine similarity is scale-invariant, so the sums are
+    compared directly instead of dividing by the sentence count.
+    Returns merged [(start_idx, end_idx, start_time, end_time)].
+    """
+    if not spans:
+        return []
 
-        prev_duration = topic_duration(prev)
-        curr_duration = topic_duration(current)
+    lo, hi = spans[0]
+    merged = [[lo, hi, starts[0], ends[0]]]
+    running = sums[0].copy()
 
-        prev_emb = get_topic_embedding(prev, sentence_embeddings, index_map)
-        curr_emb = get_topic_embedding(current, sentence_embeddings, index_map)
+    for i in range(1, len(spans)):
+        prev = merged[-1]
+        cur_lo, cur_hi = spans[i]
 
-        similarity = cosine_similarity(prev_emb, curr_emb)[0][0]
+        prev_duration = prev[3] - prev[2]
+        curr_duration = ends[i] - starts[i]
+        similarity = cosine(running, sums[i])
 
         # -----------------------
         # MERGE DECISION
@@ -77,14 +87,66 @@ def chunk_topics(topics, sentence_embeddings):
             and (
                 similarity >= MERGE_SIM_THRESHOLD
                 or curr_duration < MIN_TOPIC_DURATION
-                or len(current["sentences"]) < MIN_SENTENCES
+                or cur_hi - cur_lo < MIN_SENTENCES
             )
         )
 
         if should_merge:
-            chunked_topics[-1] = merge_topics(prev, current)
+            prev[1] = cur_hi
+            prev[3] = ends[i]
+            running += sums[i]
         else:
-            chunked_topics.append(current)
+            merged.append([cur_lo, cur_hi, starts[i], ends[i]])
+            running = sums[i].copy()
+
+    return [tuple(m) for m in merged]
 
-    return chunked_topics
 
+# -----------------------
+# MAIN CHUNKING LOGIC
+# -----------------------
+def chunk_topics(topics, sentence_embeddings):
+    """
+    Merge micro-topics into macro topics using:
+    - duration
+    - semantic similarity
+    - sentence count
+    """
+
+    if not topics:
+        return []
+
+    spans = topics_to_spans(topics)
+    sums = span_sums(spans, sentence_embeddings)
+    merged = chunk_spans(
+        spans,
+        [t["start"] for t in topics],
+        [t["end"] for t in topics],
+        sums,
+    )
+
+    return spans_to_topics(topics, spans, merged)
+
+
+def spans_to_topics(topics, spans, merged):
+    """
+    Topic dicts for merged [(start_idx, end_idx, start_time, end_time)].
+    Topics that were never merged are returned as-is; merged ones are
+    materialized once from the flat sentence array.
+    """
+    first_topic_at = {span[0]: topic for span, topic in zip(spans, topics)}
+    sentences = [s for topic in topics for s in topic["sentences"]]
+
+    chunked_topics = []
+    for lo, hi, start, end in merged:
+        original = first_topic_at[lo]
+        if len(original["sentences"]) == hi - lo:
+            chunked_topics.append(original)
+        else:
+            chunked_topics.append({
+                "sentences": sentences[lo:hi],
+                "start": start,
+                "end": end,
+            })
+
+    return chunked_topics
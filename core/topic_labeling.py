@@ -1,22 +1,13 @@
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
-_embedding_model = None
-_kw_model = None
+from core.model_registry import get_model
+from core.topic_chunking import topics_to_spans, span_sums
+from core.embeddings import encode_texts
 
 
 def get_kw_model():
-    global _kw_model, _embedding_model
-
-    if _kw_model is None:
-        print("🔹 Loading keyword model (only once)...")
-        _embedding_model = SentenceTransformer(
-            "paraphrase-MiniLM-L3-v2",
-            device="cpu"
-        )
-        _kw_model = KeyBERT(model=_embedding_model)
-
-    return _kw_model
+    # KeyBERT shares the registry's SentenceTransformer instance
+    return get_model("keybert")
 
 
 def extract_topic_keywords(sentences, top_n=3):
@@ -35,6 +26,52 @@ def extract_topic_keywords(sentences, top_n=3):
     return [k[0] for k in keywords]
 
 
+def extract_keywords_batch(topics, sentence_embeddings, top_n=3):
+    """
+    Keywords for every topic in one pass (same scoring as KeyBERT's default:
+    single-word candidates ranked by cosine similarity to the document).
+
+    - one CountVectorizer fit over all topics
+    - each distinct candidate word is embedded once, however many topics use it
+    - topic (document) vectors are the mean of the sentence embeddings that
+      get_embeddings already produced, so no topic text is re-encoded
+
+    topics: contiguous topics covering the sentence array in order
+    Returns one keyword list per topic.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    if not topics:
+        return []
+
+    docs = [" ".join(s["text"] for s in t["sentences"]) for t in topics]
+    vectorizer = CountVectorizer(ngram_range=(1, 1), stop_words="english")
+    try:
+        doc_terms = vectorizer.fit_transform(docs).tocsr()
+    except ValueError:
+        # empty vocabulary: every topic is stop words only
+        return [[] for _ in topics]
+
+    words = vectorizer.get_feature_names_out()
+    word_emb = encode_texts(list(words))  # common words hit the embedding cache
+    word_emb /= np.maximum(np.linalg.norm(word_emb, axis=1, keepdims=True), 1e-12)
+
+    doc_emb = span_sums(topics_to_spans(topics), sentence_embeddings)
+    doc_emb /= np.maximum(np.linalg.norm(doc_emb, axis=1, keepdims=True), 1e-12)
+
+    keywords = []
+    for i in range(len(topics)):
+        cols = doc_terms.indices[doc_terms.indptr[i]:doc_terms.indptr[i + 1]]
+        if len(cols) == 0:
+            keywords.append([])
+            continue
+        scores = word_emb[cols] @ doc_emb[i]
+        best = np.argsort(-scores, kind="stable")[:top_n]
+        keywords.append([str(words[cols[j]]) for j in best])
+
+    return keywords
+
+
 def generate_topic_label(keywords):
     if not keywords:
         return "General Discussion"
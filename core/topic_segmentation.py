@@ -1,69 +1,81 @@
-from sklearn.metrics.pairwise import cosine_similarity
+import os
 
-from core.topic_labeling import extract_topic_keywords, generate_topic_label
-from core.summarizer import summarize_topic
+from core.topic_labeling import extract_keywords_batch, generate_topic_label
+from core.summarizer import summarize_topics
 from core.topic_chunking import chunk_topics
+from core.boundary_detection import segment_micro_topics
+from core.optimal_segmentation import chunk_topics_optimal
+from core.chapter_tree import ChapterTree
+from core.instrumentation import stage
 
+# how micro-topics are merged into topics: "greedy" left-to-right, or
+# "dp" for the globally optimal grouping under the same duration/sentence limits
+SEGMENTERS = ("greedy", "dp")
+TOPIC_SEGMENTER = os.environ.get("TOPIC_SEGMENTER", "greedy")
 
-def segment_topics_with_labels(sentences, embeddings, threshold=0.65):
+
+def segment_topics_with_labels(sentences, embeddings, threshold=0.65, window=None, summary_stats=None, metrics=None,
+                               segmenter=None, with_tree=False):
     """
     Step 1: Create micro-topics using sentence similarity
+            (window=k switches to TextTiling-style depth scoring)
     Step 2: Chunk micro-topics into macro topics
+            (segmenter="dp": one global optimization instead of the greedy merge)
     Step 3: Label + summarize final topics
+            (summary_stats: optional list collecting per-batch summarizer latency)
+
+    metrics: optional StageMetrics timing micro_segment / chunk / chapter_tree / keyword / summarize
+    with_tree: also return the ChapterTree over the same micro-topics,
+               as (topics, tree)
     """
 
     # -------------------------------
     # STEP 1: MICRO-TOPIC SEGMENTATION
     # -------------------------------
-    micro_topics = []
-
-    current_topic = {
-        "sentences": [sentences[0]],
-        "start": sentences[0]["start"]
-    }
-
-    for i in range(1, len(sentences)):
-        sim = cosine_similarity(
-            embeddings[i - 1].reshape(1, -1),
-            embeddings[i].reshape(1, -1)
-        )[0][0]
-
-        if sim < threshold:
-            current_topic["end"] = sentences[i - 1]["end"]
-            micro_topics.append(current_topic)
-
-            current_topic = {
-                "sentences": [sentences[i]],
-                "start": sentences[i]["start"]
-            }
-        else:
-            current_topic["sentences"].append(sentences[i])
-
-    current_topic["end"] = current_topic["sentences"][-1]["end"]
-    micro_topics.append(current_topic)
+    with stage(metrics, "micro_segment", items=len(sentences)):
+        micro_topics = segment_micro_topics(
+            sentences, embeddings, threshold=threshold, window=window
+        )
 
     # -------------------------------
     # STEP 2: CHUNK MICRO → MACRO TOPICS
     # -------------------------------
-    chunked_topics = chunk_topics(micro_topics, embeddings)
+    merge = chunk_topics_optimal if (segmenter or TOPIC_SEGMENTER) == "dp" else chunk_topics
+    with stage(metrics, "chunk", items=len(micro_topics)):
+        chunked_topics = merge(micro_topics, embeddings)
+
+    # Every other granularity, cut on demand later (labels/summaries per level are lazy)
+    tree = None
+    if with_tree:
+        with stage(metrics, "chapter_tree", items=len(micro_topics)):
+            tree = ChapterTree.build(micro_topics, embeddings)
 
     # -------------------------------
     # STEP 3: LABEL + SUMMARIZE
     # -------------------------------
     final_topics = []
 
-    for topic in chunked_topics:
-        keywords = extract_topic_keywords(topic["sentences"])
-        topic["keywords"] = keywords
-        topic["label"] = generate_topic_label(keywords)
+    # Keywords for all topics in one batched pass over the shared embeddings
+    with stage(metrics, "keyword", items=len(chunked_topics)):
+        all_keywords = extract_keywords_batch(chunked_topics, embeddings)
 
+    # Summaries for all topics through length-sorted pipeline batches
+    with stage(metrics, "summarize", items=len(chunked_topics)):
         try:
-            topic["summary"] = summarize_topic(topic["sentences"])
+            all_summaries = summarize_topics(chunked_topics, batch_stats=summary_stats)
         except Exception:
-            topic["summary"] = " ".join(
-                s["text"] for s in topic["sentences"][:2]
-            )
+            all_summaries = [
+                " ".join(s["text"] for s in topic["sentences"][:2])
+                for topic in chunked_topics
+            ]
+
+    for topic, keywords, summary in zip(chunked_topics, all_keywords, all_summaries):
+        topic["keywords"] = keywords
+        topic["label"] = generate_topic_label(keywords)
+        topic["summary"] = summary
 
         final_topics.append(topic)
 
+    if with_tree:
+        return final_topics, tree
     return final_topics
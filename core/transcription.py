@@ -1,35 +1,154 @@
 import os
-import whisper
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import soundfile as sf
 
-model = whisper.load_model("base")
+from core.audio_chunking import SAMPLE_RATE, split_on_silence
+from core.transcription_backends import get_transcriber
 
-def transcribe(audio_path):
-    # 1️⃣ Check file exists
-    if not os.path.exists(audio_path):
-        raise ValueError("Audio file does not exist")
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# TRANSCRIBE_WORKERS > 1 splits the audio on silence and transcribes the
+# chunks across a process pool; 1 keeps the single-pass behaviour.
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", "1"))
+MAX_CHUNK_SECONDS = float(os.environ.get("MAX_CHUNK_SECONDS", "120"))
 
-    # 2️⃣ Check duration
-    data, samplerate = sf.read(audio_path)
-    duration = len(data) / samplerate
+_pools = {}  # worker count -> ProcessPoolExecutor
+_pools_lock = threading.Lock()
 
-    if duration < 1:
-        raise ValueError("Audio is empty or too short for transcription")
-
-    # 3️⃣ Transcribe safely
-    result = model.transcribe(
-        audio_path,
-        fp16=False,
-        condition_on_previous_text=False
-    )
 
-    full_text = result["text"].strip()
+# -----------------------
+# HELPERS
+# -----------------------
+def _segments_to_sentences(segments, offset=0.0, limit=None):
     sentences = []
-    for seg in result["segments"]:
+    for seg in segments:
+        end = seg["end"] if limit is None else min(seg["end"], limit)
         sentences.append({
             "text": seg["text"].strip(),
-            "start": seg["start"],
-            "end": seg["end"]
+            "start": seg["start"] + offset,
+            "end": end + offset
         })
+    return sentences
+
+
+def _run_whisper(audio, backend=None, model_size=None):
+    return get_transcriber(backend, model_size).transcribe(audio)
+
+
+def _init_worker(threads):
+    # One torch thread pool per worker; oversubscribing cores kills the speedup
+    import torch
+    torch.set_num_threads(threads)
+    get_transcriber()
+
+
+def transcribe_chunk(audio, offset=0.0, backend=None, model_size=None):
+    """
+    Transcribe one in-memory chunk (float32, 16 kHz) whose first sample sits
+    `offset` seconds into the episode -> (text, sentences on the episode timeline)
+    """
+    result = _run_whisper(audio, backend, model_size)
+    return result["text"].strip(), _segments_to_sentences(
+        result["segments"], offset=offset, limit=len(audio) / SAMPLE_RATE
+    )
+
+
+def _transcribe_chunk(job):
+    offset, audio, backend, model_size = job
+    return transcribe_chunk(audio, offset, backend, model_size)
+
+
+def _get_pool(workers):
+    """
+    Worker processes are kept between calls so each loads Whisper only once.
+    Spawned (not forked) so they never inherit a half-initialised torch runtime.
+    One pool per worker count, never replaced: job threads may transcribe
+    concurrently, and another thread may still be mapping over any of them.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+        return pool
+
+
+# -----------------------
+# TRANSCRIPTION
+# -----------------------
+def transcribe_parallel(audio, workers=None, max_chunk_seconds=None, backend=None, model_size=None):
+    """
+    audio: float32 mono samples at 16 kHz
+    Splits on silence into chunks of at most max_chunk_seconds, transcribes
+    them across `workers` processes and stitches the segment timestamps back
+    onto the episode timeline.
+    """
+    workers = workers or TRANSCRIBE_WORKERS
+    max_chunk_seconds = max_chunk_seconds or MAX_CHUNK_SECONDS
+
+    chunks = split_on_silence(audio, max_chunk_seconds)
+    jobs = [(offset, chunk, backend, model_size) for offset, chunk in chunks]
+    results = _get_pool(workers).map(_transcribe_chunk, jobs)
+
+    texts = []
+    sentences = []
+    for text, chunk_sentences in results:
+        if text:
+            texts.append(text)
+        sentences.extend(chunk_sentences)
+
+    return " ".join(texts), sentences
+
+
+def transcribe(audio_path, workers=None, max_chunk_seconds=None, backend=None, model_size=None):
+    """
+    audio_path: a 16 kHz WAV path, or float32 16 kHz mono samples already
+    decoded by preprocess.load_audio_array (passed to Whisper as-is)
+    backend / model_size: transcription backend and Whisper size for this
+    call (defaults: TRANSCRIBE_BACKEND, WHISPER_MODEL)
+    """
+    workers = workers or TRANSCRIBE_WORKERS
+    max_chunk_seconds = max_chunk_seconds or MAX_CHUNK_SECONDS
+
+    if isinstance(audio_path, np.ndarray):
+        data, samplerate = audio_path, SAMPLE_RATE
+        duration = len(data) / samplerate
+    else:
+        # 1️⃣ Check file exists
+        if not os.path.exists(audio_path):
+            raise ValueError("Audio file does not exist")
+
+        # 2️⃣ Check duration from the header only
+        info = sf.info(audio_path)
+        data, samplerate = None, info.samplerate
+        duration = info.duration
+
+    if duration < 1:
+        raise ValueError("Audio is empty or too short for transcription")
+
+    # 3️⃣ Long 16 kHz mono audio → chunked, parallel transcription
+    if workers > 1 and duration > max_chunk_seconds and samplerate == SAMPLE_RATE:
+        if data is None:
+            data, _ = sf.read(audio_path, dtype="float32")
+        if data.ndim == 1:
+            return transcribe_parallel(
+                np.ascontiguousarray(data, dtype=np.float32), workers, max_chunk_seconds, backend, model_size
+            )
+
+    # 4️⃣ Transcribe safely
+    result = _run_whisper(audio_path, backend, model_size)
+
+    full_text = result["text"].strip()
+    sentences = _segments_to_sentences(result["segments"])
 
     return full_text, sentences
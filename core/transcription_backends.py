@@ -0,0 +1,114 @@
+import os
+from abc import ABC, abstractmethod
+
+from core import model_registry
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+# "whisper"        openai-whisper, fp32 (the original behaviour)
+# "whisper-int8"   openai-whisper with int8 dynamic-quantized Linear layers
+# "faster-whisper" CTranslate2 int8 (needs the faster-whisper package)
+TRANSCRIBE_BACKEND = os.environ.get("TRANSCRIBE_BACKEND", "whisper")
+WHISPER_MODEL_SIZES = ("tiny", "base", "small", "medium", "large-v3")
+
+
+class TranscriptionBackend(ABC):
+    """
+    One loaded speech-to-text model. Subclasses implement load(), which
+    returns the model (called once from __init__), and transcribe().
+
+    transcribe(audio) takes a file path or float32 16 kHz mono samples and
+    returns Whisper's result shape: {"text", "segments": [{"start", "end", "text"}]}.
+    """
+
+    name = None
+
+    def __init__(self, model_size):
+        self.model_size = model_size
+        self.model = self.load()
+
+    @abstractmethod
+    def load(self):
+        pass
+
+    @abstractmethod
+    def transcribe(self, audio):
+        pass
+
+
+class WhisperBackend(TranscriptionBackend):
+    name = "whisper"
+
+    def load(self):
+        import whisper
+        return whisper.load_model(self.model_size, device=model_registry.DEVICE)
+
+    def transcribe(self, audio):
+        return self.model.transcribe(
+            audio,
+            fp16=False,
+            condition_on_previous_text=False
+        )
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """
+    Dynamic int8 quantization of every Linear layer (attention + MLP, most
+    of the compute). Weights are quantized once at load, activations on the
+    fly, so no calibration data is needed.
+    """
+
+    name = "whisper-int8"
+
+    def load(self):
+        import torch
+        model = super().load()
+        # whisper's Linear subclass only adds fp16 casting; quantize_dynamic
+        # matches exact types, so hand it plain nn.Linear modules
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    name = "faster-whisper"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        threads = int(os.environ.get("TRANSCRIBE_THREADS", "0"))
+        return WhisperModel(self.model_size, device="cpu", compute_type="int8", cpu_threads=threads)
+
+    def transcribe(self, audio):
+        segments, _ = self.model.transcribe(audio, condition_on_previous_text=False)
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+BACKENDS = {cls.name: cls for cls in (WhisperBackend, QuantizedWhisperBackend, FasterWhisperBackend)}
+
+
+def _registry_name(backend, model_size):
+    if (backend, model_size) == (TRANSCRIBE_BACKEND, model_registry.WHISPER_MODEL_SIZE):
+        return "whisper"  # the default shows up (and warms up) under its usual name
+    return f"whisper:{backend}:{model_size}"
+
+
+def load_default_backend():
+    return BACKENDS[TRANSCRIBE_BACKEND](model_registry.WHISPER_MODEL_SIZE)
+
+
+def get_transcriber(backend=None, model_size=None):
+    """
+    Shared backend instance for (backend, model size), loaded on first use
+    through the model registry; defaults come from TRANSCRIBE_BACKEND/WHISPER_MODEL
+    """
+    backend = backend or TRANSCRIBE_BACKEND
+    model_size = model_size or model_registry.WHISPER_MODEL_SIZE
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {backend}")
+
+    name = _registry_name(backend, model_size)
+    model_registry.register_model(name, lambda: BACKENDS[backend](model_size), replace=False)
+    return model_registry.get_model(name)
@@ -0,0 +1,310 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "temp_uploads")
+MAX_UPLOAD_MB = int(os.environ.get("MAX_UPLOAD_MB", "1024"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Pipe single-shot uploads through ffmpeg to 16 kHz mono FLAC while they arrive,
+# so a 44.1 kHz stereo WAV lands on disk ~10x smaller
+UPLOAD_TRANSCODE = os.environ.get("UPLOAD_TRANSCODE", "0") == "1"
+# Resumable upload sessions untouched for this long are deleted
+UPLOAD_SESSION_TTL_HOURS = float(os.environ.get("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+# containers ffmpeg can't decode from a non-seekable pipe (index at the end)
+NON_STREAMABLE_EXTENSIONS = (".m4a", ".mp4", ".mov", ".3gp")
+
+
+class UploadTooLarge(Exception):
+    """Raised once an upload passes the configured size limit"""
+
+
+class UploadConflict(Exception):
+    """Raised when a resumable chunk doesn't start at the session's offset"""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def max_upload_bytes():
+    return MAX_UPLOAD_MB * 1024 * 1024
+
+
+def safe_filename(name):
+    name = os.path.basename(name or "upload")
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)[:120] or "upload"
+
+
+# -----------------------
+# STREAMING WRITER
+# -----------------------
+class UploadWriter:
+    """
+    Sink for an upload arriving in chunks: each chunk is hashed (sha256 of
+    the original bytes, the pipeline's cache key) and size-checked before it
+    is written, so memory stays at one chunk whatever the file size.
+
+    With transcode=True the bytes go to an ffmpeg process that writes 16 kHz
+    mono FLAC to `path` as they arrive; the hash is still of the original.
+    """
+
+    def __init__(self, path, max_bytes=None, transcode=False, append=False, hasher=None, offset=0):
+        self.path = path
+        self.max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+        self.size = offset
+        self.hasher = hasher or hashlib.sha256()
+        self._proc = None
+        self._stderr = None
+
+        if transcode:
+            self._stderr = tempfile.TemporaryFile()
+            with open(path, "wb") as out:
+                self._proc = subprocess.Popen(
+                    [
+                        "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+                        "-i", "pipe:0", "-ac", "1", "-ar", "16000", "-f", "flac", "pipe:1",
+                    ],
+                    stdin=subprocess.PIPE, stdout=out, stderr=self._stderr,
+                )
+            self._file = self._proc.stdin
+        else:
+            self._file = open(path, "ab" if append else "wb")
+
+    def write(self, chunk):
+        if self.size + len(chunk) > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+        self.hasher.update(chunk)
+        try:
+            self._file.write(chunk)
+        except BrokenPipeError:
+            raise ValueError(f"Could not transcode upload: {self._ffmpeg_error()}")
+        self.size += len(chunk)
+
+    def _ffmpeg_error(self):
+        self._proc.wait()
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", "replace").strip() or f"ffmpeg exited {self._proc.returncode}"
+
+    def close(self):
+        """
+        Finish the file; returns (sha256 hex, bytes received)
+        """
+        try:
+            self._file.close()
+        except BrokenPipeError:
+            pass
+        if self._proc is not None:
+            if self._proc.wait() != 0:
+                raise ValueError(f"Could not transcode upload: {self._ffmpeg_error()}")
+            self._stderr.close()
+        return self.hasher.hexdigest(), self.size
+
+    def abort(self):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._stderr.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def upload_path(task_id, filename, transcode=False):
+    """
+    Where a single-shot upload for `task_id` is stored, and whether it is
+    transcoded on the way in
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    filename = safe_filename(filename)
+    transcode = transcode and not filename.lower().endswith(NON_STREAMABLE_EXTENSIONS)
+    if transcode:
+        filename = os.path.splitext(filename)[0] + ".flac"
+    return os.path.join(UPLOAD_DIR, f"{task_id}_{filename}"), transcode
+
+
+def save_upload(src, path, max_bytes=None, transcode=False, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Copy a file-like object to `path` chunk by chunk; returns (sha256, size).
+    Removes the partial file and re-raises on any error (UploadTooLarge, ...).
+    """
+    writer = UploadWriter(path, max_bytes, transcode)
+    try:
+        for block in iter(lambda: src.read(chunk_size), b""):
+            writer.write(block)
+        return writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+
+
+async def save_upload_stream(chunks, path, max_bytes=None, transcode=False):
+    """
+    save_upload() for an async iterator of bytes (e.g. request.stream());
+    disk writes run in a thread so the event loop keeps serving
+    """
+    writer = UploadWriter(path, max_bytes, transcode)
+    try:
+        async for chunk in chunks:
+            if chunk:
+                await asyncio.to_thread(writer.write, chunk)
+        return await asyncio.to_thread(writer.close)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+# -----------------------
+# RESUMABLE UPLOAD SESSIONS
+# -----------------------
+class UploadSessions:
+    """
+    Resumable uploads: create a session, append byte ranges at the current
+    offset (a dropped connection keeps whatever arrived), ask for the offset
+    to resume, then finish to get the complete file.
+
+    Each session is <root>/<id>/{meta.json, data}. The running sha256 is
+    kept in memory; after a server restart it is rebuilt from the bytes on
+    disk, once, on the next append.
+    """
+
+    def __init__(self, root=None, max_bytes=None, ttl_hours=UPLOAD_SESSION_TTL_HOURS):
+        self.root = root or os.path.join(UPLOAD_DIR, "sessions")
+        self.max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+        self.ttl_seconds = ttl_hours * 3600
+        self._hashers = {}    # id -> (offset, sha256 state)
+        self._busy = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, upload_id):
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+
+    def _meta(self, upload_id):
+        try:
+            with open(os.path.join(self._dir(upload_id), "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def create(self, filename, size=None):
+        if size is not None and size > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        path = self._dir(upload_id)
+        os.makedirs(path)
+        open(os.path.join(path, "data"), "wb").close()
+        meta = {"upload_id": upload_id, "filename": safe_filename(filename), "size": size, "created_at": time.time()}
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return self.get(upload_id)
+
+    def get(self, upload_id):
+        meta = self._meta(upload_id)
+        meta["offset"] = os.path.getsize(os.path.join(self._dir(upload_id), "data"))
+        meta["max_bytes"] = self.max_bytes
+        return meta
+
+    def _hasher_at(self, upload_id, data_path, offset):
+        state = self._hashers.get(upload_id)
+        if state is not None and state[0] == offset:
+            return state[1]
+        hasher = hashlib.sha256()
+        with open(data_path, "rb") as f:
+            for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(block)
+        return hasher
+
+    async def append(self, upload_id, offset, chunks):
+        """
+        Append an async stream of bytes starting at `offset`; returns the new
+        offset. Bytes received before a disconnect are kept. Hashing and disk
+        writes run in a thread: rebuilding the hash after a restart reads the
+        whole partial upload, which must not stall the event loop.
+        """
+        meta = self.get(upload_id)
+        with self._lock:
+            if upload_id in self._busy:
+                raise UploadConflict("Another request is writing to this upload", meta["offset"])
+            if offset != meta["offset"]:
+                raise UploadConflict(f"Upload is at offset {meta['offset']}, not {offset}", meta["offset"])
+            self._busy.add(upload_id)
+
+        data_path = os.path.join(self._dir(upload_id), "data")
+        limit = min(self.max_bytes, meta["size"]) if meta["size"] is not None else self.max_bytes
+        try:
+            hasher = await asyncio.to_thread(self._hasher_at, upload_id, data_path, offset)
+            writer = UploadWriter(data_path, limit, append=True, hasher=hasher, offset=offset)
+        except BaseException:
+            with self._lock:
+                self._busy.discard(upload_id)
+            raise
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    await asyncio.to_thread(writer.write, chunk)
+        finally:
+            await asyncio.to_thread(writer.close)
+            with self._lock:
+                self._hashers[upload_id] = (writer.size, writer.hasher)
+                self._busy.discard(upload_id)
+        return writer.size
+
+    def finish(self, upload_id, dest_dir=UPLOAD_DIR):
+        """
+        Move the completed upload to `dest_dir`; returns (path, sha256, size)
+        """
+        meta = self.get(upload_id)
+        if meta["size"] is not None and meta["offset"] != meta["size"]:
+            raise UploadConflict(f"Upload incomplete: {meta['offset']} of {meta['size']} bytes", meta["offset"])
+
+        data_path = os.path.join(self._dir(upload_id), "data")
+        with self._lock:
+            if upload_id in self._busy:
+                raise UploadConflict("Another request is writing to this upload", meta["offset"])
+            hasher = self._hasher_at(upload_id, data_path, meta["offset"])
+            self._hashers.pop(upload_id, None)
+
+        os.makedirs(dest_dir, exist_ok=True)
+        path = os.path.join(dest_dir, f"{upload_id}_{meta['filename']}")
+        os.replace(data_path, path)
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+        return path, hasher.hexdigest(), meta["offset"]
+
+    def delete(self, upload_id):
+        path = self._dir(upload_id)
+        if not os.path.isdir(path):
+            raise KeyError(upload_id)
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def expire(self):
+        """
+        Drop sessions whose data hasn't changed for ttl_hours
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.root):
+            data_path = os.path.join(self.root, name, "data")
+            try:
+                if os.path.getmtime(data_path) < cutoff and name not in self._busy:
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            except OSError:
+                continue
@@ -0,0 +1,369 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.embedding_store import normalize
+
+# -----------------------
+# CONFIGURATION
+# -----------------------
+LIBRARY_DIR = os.environ.get("LIBRARY_INDEX_DIR", "jobs/library")
+LIBRARY_QUANTIZE = os.environ.get("LIBRARY_INDEX_INT8", "1") != "0"
+MIN_IVF_SIZE = 4096          # below this, exact (flat) search is already fast
+TRAIN_SAMPLE = 50_000        # k-means trains on at most this many rows
+KMEANS_ITERS = 10
+DEFAULT_PROBE_FRACTION = 0.1 # probe ~10% of the lists unless told otherwise
+ASSIGN_BATCH = 65_536
+
+
+# -----------------------
+# HELPERS
+# -----------------------
+def top_k(scores, k):
+    """
+    Indices of the k highest scores, best first: argpartition + sort of k only
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def quantize_rows(unit):
+    """
+    Symmetric per-row int8 quantization of unit vectors -> (int8 rows, scales)
+    """
+    scales = np.abs(unit).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(unit / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def row_scores(data, scales, q, rows=None):
+    block = data if rows is None else data[rows]
+    sims = block @ q if block.dtype == np.float32 else block.astype(np.float32) @ q
+    if scales is not None:
+        sims *= scales if rows is None else scales[rows]
+    return sims
+
+
+def kmeans(vectors, n_lists, iters=KMEANS_ITERS, seed=0):
+    """
+    Spherical k-means (cosine) on a sample of unit vectors -> centroids
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > TRAIN_SAMPLE:
+        vectors = vectors[rng.choice(len(vectors), TRAIN_SAMPLE, replace=False)]
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        # re-seed empty lists with random points so every list stays usable
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+def assign_lists(vectors, centroids):
+    out = np.empty(len(vectors), dtype=np.int32)
+    for lo in range(0, len(vectors), ASSIGN_BATCH):
+        block = np.asarray(vectors[lo:lo + ASSIGN_BATCH], dtype=np.float32)
+        out[lo:lo + ASSIGN_BATCH] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def default_n_lists(n):
+    return 1 if n < MIN_IVF_SIZE else int(np.sqrt(n))
+
+
+# -----------------------
+# IVF INDEX (one matrix, e.g. one episode)
+# -----------------------
+class IVFIndex:
+    """
+    Inverted-file index over a fixed matrix of unit vectors.
+
+    data/scales: the stored rows (float32/float16, or int8 + per-row scales)
+    centroids:   (n_lists, dim) coarse quantizer
+    assignments: list id per row
+    With a single list this is exact brute-force search.
+    """
+
+    def __init__(self, data, scales, centroids, assignments):
+        self.data = data
+        self.scales = scales
+        self.centroids = centroids
+        self.assignments = assignments
+        self.order = np.argsort(assignments, kind="stable")
+        self.offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))]
+        )
+
+    def __len__(self):
+        return len(self.data)
+
+    @classmethod
+    def build(cls, data, scales=None, n_lists=None, seed=0):
+        n = len(data)
+        n_lists = min(n_lists or default_n_lists(n), max(1, n))
+        if n_lists <= 1:
+            dim = data.shape[1] if n else 0
+            return cls(data, scales, np.zeros((1, dim), dtype=np.float32), np.zeros(n, dtype=np.int32))
+
+        unit = data if scales is None else np.asarray(data, dtype=np.float32) * scales[:, None]
+        centroids = kmeans(unit, n_lists, seed=seed)
+        return cls(data, scales, centroids, assign_lists(unit, centroids))
+
+    def candidates(self, q, n_probe):
+        if len(self.centroids) == 1:
+            return None
+        lists = top_k(self.centroids @ q, n_probe)
+        return np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+
+    def search(self, query, k=5, n_probe=None):
+        """
+        -> (row ids, scores), best first
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        q = normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        n_probe = n_probe or max(1, int(np.ceil(len(self.centroids) * DEFAULT_PROBE_FRACTION)))
+
+        rows = self.candidates(q, n_probe)
+        if rows is None:
+            sims = row_scores(self.data, self.scales, q)
+            best = top_k(sims, k)
+            return best, sims[best]
+
+        rows = np.sort(rows)  # sequential access into the (memory-mapped) matrix
+        sims = row_scores(self.data, self.scales, q, rows)
+        best = top_k(sims, k)
+        return rows[best], sims[best]
+
+    # ---------- persistence (matrix itself is stored separately) ----------
+    def save(self, prefix):
+        np.save(prefix + ".centroids.npy", self.centroids)
+        np.save(prefix + ".assignments.npy", self.assignments)
+
+    @classmethod
+    def load(cls, prefix, data, scales=None):
+        centroids_path = prefix + ".centroids.npy"
+        if not os.path.exists(centroids_path):
+            return None
+        return cls(data, scales, np.load(centroids_path), np.load(prefix + ".assignments.npy"))
+
+
+# -----------------------
+# LIBRARY INDEX (all episodes)
+# -----------------------
+class LibraryIndex:
+    """
+    Cross-episode IVF index stored as append-only files under `root`:
+
+    vectors.bin      row vectors (int8 when quantized, else float32)
+    scales.bin       float32 per-row scale (quantized only)
+    rows.bin         int32 (episode number, sentence index) per row
+    assignments.bin  int32 list id per row
+    centroids.npy    coarse quantizer, retrained when the library doubles
+    episodes.json    episode number -> task id
+    """
+
+    def __init__(self, root=LIBRARY_DIR, dim=384, quantize=LIBRARY_QUANTIZE):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+        # an existing library keeps the layout it was created with
+        meta = self._read_json("meta.json", None)
+        if meta is None:
+            meta = {"dim": dim, "quantize": quantize, "trained_on": 0}
+            self._write_json("meta.json", meta)
+        self.dim, self.quantize = meta["dim"], meta["quantize"]
+        self.dtype = np.int8 if self.quantize else np.float32
+        self.trained_on = meta["trained_on"]
+        self.episodes = self._read_json("episodes.json", [])
+        self._episode_ids = {task_id: i for i, task_id in enumerate(self.episodes)}
+        self._centroids = self._load_centroids()
+        self._repair()
+        self._open()
+
+    # ---------- files ----------
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _read_json(self, name, default):
+        path = self._path(name)
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_json(self, name, value):
+        tmp_path = self._path(name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, self._path(name))
+
+    def _memmap(self, name, dtype, width=None):
+        path = self._path(name)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        itemsize = np.dtype(dtype).itemsize * (width or 1)
+        n = size // itemsize
+        if n == 0:
+            shape = (0, width) if width else (0,)
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(n, width) if width else (n,))
+
+    def _load_centroids(self):
+        path = self._path("centroids.npy")
+        return np.load(path) if os.path.exists(path) else None
+
+    def _repair(self):
+        """
+        Truncate every file to the rows of episodes recorded in episodes.json,
+        dropping a partial append left behind by a crash
+        """
+        rows = self._memmap("rows.bin", np.int32, 2)
+        valid = int(np.searchsorted(np.asarray(rows[:, 0]), len(self.episodes))) if len(rows) else 0
+        del rows
+
+        widths = {
+            "vectors.bin": np.dtype(self.dtype).itemsize * self.dim,
+            "scales.bin": 4,
+            "rows.bin": 8,
+            "assignments.bin": 4,
+        }
+        for name, row_bytes in widths.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > valid * row_bytes:
+                os.truncate(path, valid * row_bytes)
+
+    def _open(self):
+        self.vectors = self._memmap("vectors.bin", self.dtype, self.dim)
+        self.scales = self._memmap("scales.bin", np.float32) if self.quantize else None
+        self.rows = self._memmap("rows.bin", np.int32, 2)
+        assignments = self._memmap("assignments.bin", np.int32)
+        self.index = None
+        if self._centroids is None:
+            return
+        if len(assignments) != len(self.vectors):
+            # list assignments fell behind (crash mid-append): rebuild them
+            self._retrain()
+            return
+        self.index = IVFIndex(self.vectors, self.scales, self._centroids, np.asarray(assignments))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def __contains__(self, task_id):
+        return task_id in self._episode_ids
+
+    # ---------- writes ----------
+    def add_episode(self, task_id, embeddings):
+        """
+        Append one episode's sentence embeddings. Files are only appended to;
+        the coarse quantizer is retrained (and every row reassigned) only when
+        the library has doubled since the last training.
+        """
+        unit = normalize(embeddings)
+        if len(unit) == 0:
+            return
+
+        with self._lock:
+            if task_id in self._episode_ids:
+                return
+            if len(self.vectors) == 0 and unit.shape[1] != self.dim:
+                # an empty library takes its width from the first episode
+                self.dim = unit.shape[1]
+                self._write_json("meta.json", {"dim": self.dim, "quantize": self.quantize, "trained_on": 0})
+            episode = len(self.episodes)
+
+            if self.quantize:
+                data, scales = quantize_rows(unit)
+            else:
+                data, scales = unit.astype(np.float32), None
+
+            with open(self._path("vectors.bin"), "ab") as f:
+                f.write(np.ascontiguousarray(data).tobytes())
+            if scales is not None:
+                with open(self._path("scales.bin"), "ab") as f:
+                    f.write(scales.tobytes())
+            rows = np.stack(
+                [np.full(len(unit), episode, dtype=np.int32), np.arange(len(unit), dtype=np.int32)], axis=1
+            )
+            with open(self._path("rows.bin"), "ab") as f:
+                f.write(rows.tobytes())
+            if self._centroids is not None:
+                with open(self._path("assignments.bin"), "ab") as f:
+                    f.write(assign_lists(unit, self._centroids).tobytes())
+
+            self.episodes.append(task_id)
+            self._episode_ids[task_id] = episode
+            self._write_json("episodes.json", self.episodes)
+
+            self._open()
+            total = len(self.vectors)
+            if total >= MIN_IVF_SIZE and total >= 2 * max(self.trained_on, MIN_IVF_SIZE // 2):
+                self._retrain()
+
+    def _retrain(self):
+        """
+        Retrain the coarse quantizer without loading the library: k-means
+        sees at most TRAIN_SAMPLE rows read from the memmap, and assignments
+        are computed ASSIGN_BATCH rows at a time straight into the new file
+        """
+        n = len(self.vectors)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(n, min(n, TRAIN_SAMPLE), replace=False))
+        unit = np.asarray(self.vectors[sample], dtype=np.float32)
+        if self.scales is not None:
+            unit *= self.scales[sample][:, None]
+        centroids = kmeans(unit, default_n_lists(n))
+
+        np.save(self._path("centroids.npy.tmp.npy"), centroids)
+        os.replace(self._path("centroids.npy.tmp.npy"), self._path("centroids.npy"))
+        # per-row scales are positive, so they never change a row's best list
+        with open(self._path("assignments.bin.tmp"), "wb") as f:
+            for lo in range(0, n, ASSIGN_BATCH):
+                f.write(assign_lists(self.vectors[lo:lo + ASSIGN_BATCH], centroids).tobytes())
+        os.replace(self._path("assignments.bin.tmp"), self._path("assignments.bin"))
+
+        self.trained_on = n
+        self._write_json("meta.json", {"dim": self.dim, "quantize": self.quantize, "trained_on": self.trained_on})
+        self._centroids = centroids
+        self._open()
+
+    # ---------- reads ----------
+    def search(self, query, k=5, n_probe=None):
+        """
+        -> [{"task_id", "sentence_index", "score"}], best first
+        """
+        with self._lock:
+            vectors, scales, rows, index = self.vectors, self.scales, self.rows, self.index
+
+        if len(vectors) == 0:
+            return []
+
+        if index is None:
+            q = normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+            sims = row_scores(vectors, scales, q)
+            ids = top_k(sims, k)
+            scores = sims[ids]
+        else:
+            ids, scores = index.search(query, k=k, n_probe=n_probe)
+
+        return [
+            {
+                "task_id": self.episodes[rows[i, 0]],
+                "sentence_index": int(rows[i, 1]),
+                "score": float(s),
+            }
+            for i, s in zip(ids, scores)
+        ]
@@ -1,130 +1,715 @@
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Body
+from fastapi import FastAPI, UploadFile, File, Body, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, FileResponse, Response
 from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+from typing import Optional
 import uuid
 import os
-import shutil
-from textblob import TextBlob
+import asyncio
+import threading
 from groq import Groq
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import json
 
 client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
 
 # --- IMPORTING YOUR HARD WORK FROM THE CORE FOLDER ---
-from core.preprocess import preprocess_audio
-from core.transcription import transcribe
-from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics_with_labels
+from core.streaming import chapter_event
+from core.executor import AnalysisExecutor, analysis_job
+from core.cache import PipelineCache, fingerprint
+from core.embedding_store import save_embeddings, load_embeddings
+from core.vector_index import IVFIndex, LibraryIndex
+from core.job_queue import JobQueue, JobWatcher, QueueFullError, QUEUED, RUNNING, COMPLETED, FAILED
+from core.model_registry import warm_up, embedding_model_id, WHISPER_MODEL_SIZE, SUMMARIZER_MODEL_NAME
+from core.instrumentation import MetricsRegistry
+from core.transcription_backends import BACKENDS as TRANSCRIPTION_BACKENDS, TRANSCRIBE_BACKEND, WHISPER_MODEL_SIZES
+from core.topic_segmentation import SEGMENTERS, TOPIC_SEGMENTER
+from core.chapter_tree import ChapterTree, describe_chapters
+from core.embedding_cache import get_embedding_cache
+from core.exporter import EXPORT_FORMATS, export_result
+from core.result_index import (
+    compact_topics, decode_cursor, dumps, encode_cursor, load_full_text, load_result_index, loads, maybe_gzip,
+    project, write_result_index,
+)
+from core.uploads import (
+    UploadConflict, UploadSessions, UploadTooLarge, UPLOAD_CHUNK_SIZE, UPLOAD_TRANSCODE,
+    max_upload_bytes, save_upload, upload_path,
+)
 
 app = FastAPI()
 
-# Memory to store task results
-from typing import Dict, Any
-tasks: Dict[str, Any] = {}
+# Models load lazily on first use. Set WARMUP_MODELS=all (or a comma list such as
+# "whisper,sentence_transformer") to load them at server start instead.
+WARMUP_MODELS = os.environ.get("WARMUP_MODELS", "").strip()
 
-def process_podcast_task(task_id: str, file_path: str):
+@app.on_event("startup")
+def warm_up_models():
+    if not WARMUP_MODELS:
+        return
+    names = None if WARMUP_MODELS == "all" else [n.strip() for n in WARMUP_MODELS.split(",") if n.strip()]
+    warm_up(names)
+
+# Content-addressed stage cache (set PIPELINE_CACHE=0 to disable). Workers write
+# to it; this instance only aggregates their hit/miss counts for /cache/stats.
+pipeline_cache = PipelineCache() if os.environ.get("PIPELINE_CACHE", "1") != "0" else None
+
+# CPU-bound analysis runs in separate worker processes (ANALYSIS_WORKERS)
+analysis_executor = AnalysisExecutor(use_cache=pipeline_cache is not None)
+
+# Per-stage totals over all finished tasks, served at /metrics
+metrics_registry = MetricsRegistry()
+
+def process_podcast_task(task_id: str, file_path: str, report, options=None):
     """
-    Background worker with detailed status updates for professional UI feedback.
+    Queue worker with detailed status updates for professional UI feedback.
+    The analysis itself runs in a worker process (core.executor); only the
+    small bookkeeping below happens in the API process.
     """
+    options = options or {}
     try:
-        # Step 1: Preprocessing
-        tasks[task_id] = {"status": " Attempting Preprocessing", "progress": 10}
-        processed_path = preprocess_audio(file_path)
-        
-        # Step 2: Transcription
-        tasks[task_id] = {"status": "Attempting Transcription", "progress": 30}
-        full_text, sentences = transcribe(processed_path)
-        
-        if not sentences:
-            tasks[task_id] = {"status": "failed", "error": "AI could not detect any clear speech in this audio file. Please try a different recording."}
-            return
+        result, cache_counts = analysis_executor.call(
+            analysis_job, file_path, options, report, chapters_path(task_id)
+        )
+        if pipeline_cache is not None and cache_counts:
+            pipeline_cache.merge_counts(cache_counts)
 
-        # Step 3: Embeddings
-        tasks[task_id] = {"status": "Now Analysis & Embedding", "progress": 50}
-        embeddings = get_embeddings(sentences)
-        
-        # Step 4: Topic Segmentation
-        tasks[task_id] = {"status": "Segmenting The Topics", "progress": 80}
-        topics = segment_topics_with_labels(sentences, embeddings)
-
-        # Step 5: Sentiment Analysis
-        for topic in topics:
-            blob = TextBlob(topic['summary'])
-            sentiment = blob.sentiment.polarity
-            if sentiment > 0.1:
-                topic['sentiment'] = "Positive 😊"
-            elif sentiment < -0.1:
-                topic['sentiment'] = "Negative 😟"
-            else:
-                topic['sentiment'] = "Neutral 😐"
+        # Embeddings for RAG go to a compact .npy beside the result, not into the JSON
+        save_embeddings(embeddings_path(task_id), result["embeddings"])
+
+        # Vector indexes: this episode's IVF lists + the cross-episode library
+        stored = load_embeddings(embeddings_path(task_id))
+        IVFIndex.build(stored.data, stored.scales).save(index_prefix(task_id))
+        library_index.add_episode(task_id, result["embeddings"])
 
         # Final Step: Store everything with Metadata
-        tasks[task_id] = {
-            "status": "completed",
-            "progress": 100,
-            "result": {
-                "full_text": full_text,
-                "topics": topics,
-                "sentences": sentences,  # For RAG
-                "embeddings": embeddings.tolist(),  # For RAG (serialize to list for JSON/Memory)
-                "metadata": {
-                    "safety_check": "Passed ✅",
-                    "cost_estimate": "$0.005",
-                    "model_used": "Whisper Base + BERT"
-                }
+        stage_metrics = result["metrics"]
+        metrics_registry.observe_task(COMPLETED, stage_metrics)
+        preprocess = stage_metrics["stages"].get("preprocess", {})
+        output = {
+            "full_text": result["full_text"],
+            # topics point into `sentences` by index instead of nesting copies of them
+            "topics": compact_topics(result["topics"]),
+            "sentences": result["sentences"],  # For RAG
+            "metadata": {
+                "models": {
+                    "transcription": "{}/{}".format(
+                        options.get("transcribe_backend") or TRANSCRIBE_BACKEND,
+                        options.get("whisper_model") or WHISPER_MODEL_SIZE,
+                    ),
+                    "embeddings": embedding_model_id(),
+                    "summarizer": SUMMARIZER_MODEL_NAME,
+                },
+                "segmenter": options.get("segmenter") or TOPIC_SEGMENTER,
+                # a cached transcript skips decoding; fall back to the last timestamp
+                "audio_seconds": preprocess.get("audio_seconds") or result["sentences"][-1]["end"],
+                "sentence_count": len(result["sentences"]),
+                "topic_count": len(result["topics"]),
+                "performance": stage_metrics,
             }
         }
-    except Exception as e:
-        tasks[task_id] = {"status": "failed", "error": str(e)}
+
+        # Side files /result pages and time ranges are served from
+        write_result_index(result_prefix(task_id), output)
+
+        # Merge tree for /chapters/{id}/tree (streamed analyses come without one)
+        tree = result.get("chapter_tree") or ChapterTree.from_sentences(
+            result["sentences"], result["embeddings"]
+        ).to_dict()
+        write_json_artifact(chapter_tree_path(task_id), tree)
+        return output
+    except Exception:
+        metrics_registry.observe_task(FAILED)
+        raise
     finally:
         if os.path.exists(file_path):
             os.remove(file_path)
 
+# Durable job queue (SQLite under JOB_DIR); survives restarts and bounds concurrency
+job_queue = JobQueue(process_podcast_task)
+
+def embeddings_path(task_id: str):
+    return job_queue.artifact_path(task_id, "embeddings.npy")
+
+def index_prefix(task_id: str):
+    return job_queue.artifact_path(task_id, "index")
+
+def result_prefix(task_id: str):
+    return job_queue.artifact_path(task_id, "view")
+
+def chapters_path(task_id: str):
+    return job_queue.artifact_path(task_id, "chapters.ndjson")
+
+def chapter_tree_path(task_id: str):
+    return job_queue.artifact_path(task_id, "chapter_tree.json")
+
+def chapter_labels_path(task_id: str):
+    return job_queue.artifact_path(task_id, "chapter_labels.json")
+
+def write_json_artifact(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps(value))
+    os.replace(tmp_path, path)
+
+# Wakes long-polling /status requests when a job changes
+job_watcher = JobWatcher(job_queue)
+
+# Cross-episode sentence index for /search
+library_index = LibraryIndex()
+QUEUE_RETRY_AFTER = "30"  # seconds, sent with 429 responses
+STREAM_POLL_SECONDS = 0.5
+STATUS_MAX_WAIT = 30       # seconds a long-poll /status request may be held
+RESULT_PAGE_SIZE = 500     # sentences per /result page by default
+RESULT_MAX_PAGE = 5000
+
+@app.on_event("startup")
+def start_job_queue():
+    analysis_executor.start()
+    job_queue.start()
+
+@app.on_event("shutdown")
+def stop_job_queue():
+    job_queue.stop(timeout=5)
+    analysis_executor.shutdown()
+
+def queue_full_response():
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Analysis queue is full, please retry later.", "queued": job_queue.queued_count()},
+        headers={"Retry-After": QUEUE_RETRY_AFTER},
+    )
+
+# Identical uploads (same content hash + options) reuse the existing job
+UPLOAD_DEDUPE = os.environ.get("UPLOAD_DEDUPE", "1") != "0"
+
+# Resumable uploads for large files over flaky connections
+upload_sessions = UploadSessions()
+
+def upload_too_large_response(message=None):
+    return JSONResponse(
+        status_code=413,
+        content={"error": message or f"Upload exceeds the {max_upload_bytes() // (1024 * 1024)} MB limit"},
+    )
+
+@app.middleware("http")
+async def reject_uploads_early(request: Request, call_next):
+    """
+    Admission control for /analyze, before the multipart parser spools the
+    body to disk: 429 while the queue is full, 413 when the declared size is
+    already over the limit
+    """
+    if request.method == "POST" and request.url.path == "/analyze":
+        if await run_in_threadpool(job_queue.is_full):
+            return queue_full_response()
+        declared = request.headers.get("content-length")
+        # one chunk of slack for the multipart boundaries and headers
+        if declared and declared.isdigit() and int(declared) > max_upload_bytes() + UPLOAD_CHUNK_SIZE:
+            return upload_too_large_response()
+    return await call_next(request)
+
+def enqueue_upload(task_id: str, file_path: str, options: dict):
+    if UPLOAD_DEDUPE:
+        existing = job_queue.find(options)
+        if existing is not None:
+            os.remove(file_path)
+            return {"task_id": existing, "queue_position": job_queue.position(existing), "deduplicated": True}
+
+    try:
+        position = job_queue.submit(task_id, file_path, options)
+    except QueueFullError:
+        os.remove(file_path)
+        return queue_full_response()
+
+    return {"task_id": task_id, "queue_position": position}
+
 @app.post("/analyze")
-async def start_analysis(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def start_analysis(
+    file: UploadFile = File(...),
+    mode: str = Query("batch", pattern="^(batch|stream)$"),
+    transcribe_backend: str = Query(None, pattern=f"^({'|'.join(TRANSCRIPTION_BACKENDS)})$"),
+    whisper_model: str = Query(None, pattern=f"^({'|'.join(WHISPER_MODEL_SIZES)})$"),
+    segmenter: str = Query(None, pattern=f"^({'|'.join(SEGMENTERS)})$"),
+):
+    """
+    transcribe_backend / whisper_model pick speed vs accuracy per job, e.g.
+    whisper-int8 + tiny for a quick preview, whisper + small for the archive.
+    segmenter="dp" finds globally optimal chapter boundaries instead of the
+    greedy threshold + merge pass (batch mode; streaming stays greedy).
+    """
+    # (a full queue was already refused by reject_uploads_early, before the
+    # body was read; one that filled up meanwhile is caught by enqueue_upload)
     task_id = str(uuid.uuid4())
-    os.makedirs("temp_uploads", exist_ok=True)
-    file_path = f"temp_uploads/{task_id}_{file.filename}"
-    
-    # Save the uploaded file temporarily
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Tell the worker to start in the background
-    background_tasks.add_task(process_podcast_task, task_id, file_path)
-    
-    return {"task_id": task_id}
+    file_path, transcode = upload_path(task_id, file.filename, UPLOAD_TRANSCODE)
+
+    # Stream the upload to disk in fixed-size chunks, hashing as it goes
+    # (kept until the job finishes so it can be resumed)
+    try:
+        audio_hash, _ = await run_in_threadpool(save_upload, file.file, file_path, None, transcode)
+    except UploadTooLarge as e:
+        return upload_too_large_response(str(e))
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"error": str(e)})
+
+    options = {
+        "mode": mode,
+        "transcribe_backend": transcribe_backend,
+        "whisper_model": whisper_model,
+        "segmenter": segmenter,
+        "audio_hash": audio_hash,
+    }
+    return await run_in_threadpool(enqueue_upload, task_id, file_path, options)
+
+class UploadRequest(BaseModel):
+    filename: str
+    size: Optional[int] = None
+
+@app.post("/uploads")
+def create_upload(request: UploadRequest):
+    """
+    Start a resumable upload. Send the bytes with PATCH /uploads/{id}?offset=N
+    (any number of requests), check GET /uploads/{id} for the offset to
+    resume from after a dropped connection, then POST /uploads/{id}/analyze.
+    """
+    try:
+        return upload_sessions.create(request.filename, request.size)
+    except UploadTooLarge as e:
+        return upload_too_large_response(str(e))
+
+@app.get("/uploads/{upload_id}")
+def upload_status(upload_id: str):
+    try:
+        return upload_sessions.get(upload_id)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+
+@app.patch("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """
+    Append the raw request body at `offset`; the body is streamed to disk,
+    never held in memory
+    """
+    try:
+        new_offset = await upload_sessions.append(upload_id, offset, request.stream())
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    except UploadConflict as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "offset": e.offset})
+    except UploadTooLarge as e:
+        return upload_too_large_response(str(e))
+    except ClientDisconnect:
+        return None  # the bytes that arrived are kept; the client resumes from GET's offset
+    return {"upload_id": upload_id, "offset": new_offset}
+
+@app.post("/uploads/{upload_id}/analyze")
+def analyze_upload(
+    upload_id: str,
+    mode: str = Query("batch", pattern="^(batch|stream)$"),
+    transcribe_backend: str = Query(None, pattern=f"^({'|'.join(TRANSCRIPTION_BACKENDS)})$"),
+    whisper_model: str = Query(None, pattern=f"^({'|'.join(WHISPER_MODEL_SIZES)})$"),
+    segmenter: str = Query(None, pattern=f"^({'|'.join(SEGMENTERS)})$"),
+):
+    if job_queue.is_full():
+        return queue_full_response()  # the upload stays, so the client can retry
+
+    try:
+        file_path, audio_hash, _ = upload_sessions.finish(upload_id)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    except UploadConflict as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "offset": e.offset})
+
+    options = {
+        "mode": mode,
+        "transcribe_backend": transcribe_backend,
+        "whisper_model": whisper_model,
+        "segmenter": segmenter,
+        "audio_hash": audio_hash,
+    }
+    return enqueue_upload(upload_id, file_path, options)
+
+@app.delete("/uploads/{upload_id}")
+def cancel_upload(upload_id: str):
+    try:
+        upload_sessions.delete(upload_id)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    return {"upload_id": upload_id, "deleted": True}
+
+def status_payload(task_id: str, job):
+    """
+    Small status body: never the result itself, which lives at /result/{task_id}
+    """
+    payload = {"status": job["stage"] or "running", "progress": job["progress"], "version": job["version"]}
+    if job["state"] == COMPLETED:
+        payload.update(status="completed", progress=100, result_url=f"/result/{task_id}")
+    elif job["state"] == FAILED:
+        payload.update(status="failed", error=job["error"])
+    elif job["state"] == QUEUED:
+        payload.update(status="queued", progress=0, queue_position=job_queue.position(task_id))
+    return payload
 
 @app.get("/status/{task_id}")
-async def check_status(task_id: str):
-    return tasks.get(task_id, {"status": "not_found"})
+async def check_status(
+    task_id: str,
+    request: Request,
+    version: Optional[int] = Query(None, description="last version the client has seen"),
+    wait: float = Query(0, ge=0, le=STATUS_MAX_WAIT, description="seconds to hold the request for a change"),
+):
+    """
+    Lightweight job status.
+
+    Long-poll: pass the last seen `version` and `wait`; the response comes
+    as soon as the job moves past that version, or after `wait` seconds
+    with the unchanged status. Plain polling can send If-None-Match with
+    the previous ETag and gets an empty 304 while nothing changed.
+    """
+    job = await run_in_threadpool(job_queue.get, task_id)
+    if job is None:
+        return {"status": "not_found"}
+
+    if wait and version == job["version"] and job["state"] not in (COMPLETED, FAILED):
+        if await job_watcher.wait(task_id, version, wait) is not None:
+            job = await run_in_threadpool(job_queue.get, task_id)
+
+    payload = await run_in_threadpool(status_payload, task_id, job)
+    etag = f'"{fingerprint(payload)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+RESULT_PARTS = ("topics", "metadata", "sentences", "full_text")
+
+def comma_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+@app.get("/result/{task_id}")
+def get_result(
+    task_id: str,
+    request: Request,
+    include: str = Query("topics,metadata,sentences", description="comma list of " + ", ".join(RESULT_PARTS)),
+    sentence_fields: str = Query(None, description="e.g. start,end,text"),
+    topic_fields: str = Query(None, description="e.g. label,start,end"),
+    cursor: str = Query(None, description="next_cursor of the previous page"),
+    offset: int = Query(None, ge=0),
+    limit: int = Query(RESULT_PAGE_SIZE, ge=0, le=RESULT_MAX_PAGE),
+    start: float = Query(None, ge=0, description="only sentences overlapping [start, end) seconds"),
+    end: float = Query(None, ge=0),
+    full_text: bool = Query(False, description="shorthand for adding full_text to include"),
+):
+    """
+    Finished analysis, only the parts asked for.
+
+    Sentences come a page at a time: follow next_cursor until it is null.
+    start/end restrict them to a time window (binary search over the
+    sentence start/end index), and the cursor keeps that window. Responses
+    are gzip-compressed for clients that accept it.
+    """
+    parts = comma_list(include) or []
+    if full_text and "full_text" not in parts:
+        parts.append("full_text")
+    unknown = [p for p in parts if p not in RESULT_PARTS]
+    if unknown:
+        return JSONResponse(status_code=400, content={"error": f"Unknown result parts: {', '.join(unknown)}"})
+
+    job = job_queue.get(task_id)
+    if job is None or job["state"] != COMPLETED:
+        return JSONResponse(status_code=404, content={"error": "Podcast analysis not found or not completed."})
+
+    prefix = result_prefix(task_id)
+    summary, index = load_result_index(prefix, lambda: job_queue.load_result(task_id))
+    if summary is None:
+        return JSONResponse(status_code=404, content={"error": "Podcast analysis not found or not completed."})
+
+    # Each part is encoded on its own and spliced in, so a sentence page
+    # goes out as the stored bytes without being parsed
+    body = []
+    if "topics" in parts:
+        body.append((b"topics", dumps(project(summary["topics"], comma_list(topic_fields)))))
+    if "metadata" in parts:
+        body.append((b"metadata", dumps(summary["metadata"])))
+    if "full_text" in parts:
+        body.append((b"full_text", dumps(load_full_text(prefix))))
+    if "sentences" in parts:
+        if cursor:
+            try:
+                position, stop = decode_cursor(cursor, len(index))
+            except ValueError:
+                return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+        elif start is not None or end is not None:
+            position, stop = index.time_range(start, end)
+        else:
+            position, stop = min(offset or 0, len(index)), len(index)
+        stop = min(stop, len(index))
+        page_end = max(position, min(position + limit, stop))
+        more = page_end < stop
+        body += [
+            (b"sentences", index.json_array(position, page_end, comma_list(sentence_fields))),
+            (b"offset", dumps(position)),
+            (b"total_sentences", dumps(len(index))),
+            (b"next_offset", dumps(page_end if more else None)),
+            (b"next_cursor", dumps(encode_cursor(page_end, stop) if more else None)),
+        ]
+
+    content = b"{" + b",".join(b'"' + key + b'":' + value for key, value in body) + b"}"
+    content, headers = maybe_gzip(content, request.headers.get("accept-encoding"))
+    return Response(content, media_type="application/json", headers=headers)
+
+_export_locks = {}
+_export_locks_guard = threading.Lock()
+
+def export_artifact(task_id: str, fmt: str):
+    """
+    Path of the cached export, generated on first request. Concurrent
+    requests for the same artifact wait for one writer instead of each
+    rendering it.
+    """
+    path = job_queue.artifact_path(task_id, f"export.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    with _export_locks_guard:
+        lock = _export_locks.setdefault((task_id, fmt), threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            summary, sentences = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+            tmp_path = path + ".tmp"
+            export_result(fmt, summary["topics"], iter(sentences), tmp_path)
+            os.replace(tmp_path, path)
+    return path
+
+@app.get("/export/{task_id}/{fmt}")
+def download_export(task_id: str, fmt: str):
+    """
+    PDF report, compact JSON or NDJSON of a finished analysis. Each file is
+    rendered once per task and then served from disk with Range support,
+    so interrupted downloads can resume.
+    """
+    if fmt not in EXPORT_FORMATS:
+        return JSONResponse(status_code=404, content={"error": f"Unknown export format: {fmt}"})
+    job = job_queue.get(task_id)
+    if job is None or job["state"] != COMPLETED:
+        return JSONResponse(status_code=404, content={"error": "Podcast analysis not found or not completed."})
+
+    return FileResponse(
+        export_artifact(task_id, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        filename=f"podcast_{task_id[:8]}.{fmt}",
+    )
+
+# -----------------------
+# CHAPTER TREE
+# -----------------------
+_tree_locks = {}
+_tree_locks_guard = threading.Lock()
+
+def load_chapter_tree(task_id: str):
+    """
+    The task's ChapterTree, built from the stored sentences and embeddings
+    for results analyzed before trees existed
+    """
+    path = chapter_tree_path(task_id)
+    if not os.path.exists(path):
+        _, sentences = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+        stored = load_embeddings(embeddings_path(task_id))
+        if sentences is None or stored is None:
+            return None
+        tree = ChapterTree.from_sentences(list(sentences), stored.to_array())
+        write_json_artifact(path, tree.to_dict())
+        return tree
+    with open(path, "rb") as f:
+        return ChapterTree.from_dict(loads(f.read()))
+
+def load_chapter_labels(task_id: str, tree: ChapterTree):
+    """
+    {node id: {label, keywords, summary, sentiment}} described so far. The
+    first call seeds it with the flat chapters the pipeline already
+    labeled, wherever one of them is also a tree node.
+    """
+    path = chapter_labels_path(task_id)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return {int(node): text for node, text in loads(f.read()).items()}
+
+    summary, _ = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+    nodes = {(int(lo), int(hi)): node for node, (lo, hi) in enumerate(tree.spans)}
+    labels = {}
+    for topic in summary["topics"] if summary else []:
+        lo = topic.get("first_sentence")
+        node = nodes.get((lo, lo + topic.get("sentence_count", 0))) if lo is not None else None
+        if node is not None:
+            labels[node] = {k: topic.get(k) for k in ("label", "keywords", "summary", "sentiment")}
+    return labels
+
+def describe_level(task_id: str, tree: ChapterTree, level, labels):
+    """
+    Label/summarize the chapters of `level` missing from `labels` (in an
+    analysis worker) and store the grown label cache
+    """
+    missing = [i for i, node in enumerate(level) if node not in labels]
+    if not missing:
+        return labels
+    _, sentences = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+    topics = []
+    for node in level:
+        lo, hi = (int(x) for x in tree.spans[node])
+        start, end = (float(x) for x in tree.times[node])
+        topics.append({"sentences": sentences.read(lo, hi), "start": start, "end": end})
+
+    described = analysis_executor.call(describe_chapters, topics, embeddings_path(task_id), missing)
+    labels = dict(labels)
+    for i, text in zip(missing, described):
+        labels[level[i]] = text
+    write_json_artifact(chapter_labels_path(task_id), {str(node): text for node, text in labels.items()})
+    return labels
+
+@app.get("/chapters/{task_id}/tree")
+def chapter_tree(
+    task_id: str,
+    k: int = Query(None, ge=1, description="number of chapters; default: as many as the pipeline's own chapters"),
+    describe: bool = Query(True, description="add label/keywords/summary/sentiment per chapter"),
+):
+    """
+    Chapters of a finished analysis at any granularity: k=4 for coarse
+    navigation, k=max_k for every micro-topic. Each chapter's `children`
+    are the two chapters it splits into one level finer.
+
+    Cutting a level is O(k) over the stored merge tree. Labels and summaries
+    are generated the first time a chapter is asked for and kept, so a
+    level only pays for the chapters no earlier level contained.
+    """
+    job = job_queue.get(task_id)
+    if job is None or job["state"] != COMPLETED:
+        return JSONResponse(status_code=404, content={"error": "Podcast analysis not found or not completed."})
+
+    tree = load_chapter_tree(task_id)
+    if tree is None:
+        return JSONResponse(status_code=404, content={"error": "Podcast analysis not found or not completed."})
+    if k is None:
+        summary, _ = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+        k = len(summary["topics"])
+
+    level = tree.cut(k)
+    chapters = [tree.node_info(node) for node in level]
+    if describe and chapters:
+        # one describer per task at a time, so concurrent requests for a level share the work
+        with _tree_locks_guard:
+            lock = _tree_locks.setdefault(task_id, threading.Lock())
+        with lock:
+            labels = describe_level(task_id, tree, level, load_chapter_labels(task_id, tree))
+        for chapter, node in zip(chapters, level):
+            chapter.update(labels[node])
+
+    return {"task_id": task_id, "k": len(level), "max_k": tree.n_leaves, "chapters": chapters}
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.get("/stream/{task_id}")
+async def stream_chapters(task_id: str):
+    """
+    Server-Sent Events: progress updates, each chapter as soon as it is final,
+    then a closing "done" event. Jobs analyzed in batch mode send all their
+    chapters when they complete.
+    """
+    async def events():
+        offset = 0
+        chapters_sent = 0
+        last_progress = None
+        while True:
+            job = await run_in_threadpool(job_queue.get, task_id)
+            if job is None:
+                yield sse("error", {"status": "not_found"})
+                return
+
+            path = chapters_path(task_id)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                # only whole lines: a line still being written may end mid character
+                complete = chunk[:chunk.rfind(b"\n") + 1]
+                offset += len(complete)
+                for line in complete.decode("utf-8").splitlines():
+                    yield sse("chapter", json.loads(line))
+                    chapters_sent += 1
+
+            progress = (job["stage"], job["progress"])
+            if progress != last_progress and job["state"] not in (COMPLETED, FAILED):
+                yield sse("progress", {"status": job["stage"] or job["state"], "progress": job["progress"]})
+                last_progress = progress
+
+            if job["state"] == FAILED:
+                yield sse("done", {"status": "failed", "error": job["error"]})
+                return
+            if job["state"] == COMPLETED:
+                if chapters_sent == 0:
+                    result = await run_in_threadpool(job_queue.load_result, task_id)
+                    for i, topic in enumerate(result["topics"] if result else []):
+                        yield sse("chapter", chapter_event(i, topic))
+                yield sse("done", {"status": "completed"})
+                return
+
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/queue/stats")
+def queue_stats():
+    return job_queue.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Per-stage time / CPU / memory / throughput totals in Prometheus text format
+    """
+    stats = job_queue.stats()
+    queue = {state: stats.get(state, 0) for state in (QUEUED, RUNNING, COMPLETED, FAILED)}
+    return PlainTextResponse(
+        metrics_registry.render({"queue_jobs": queue}),
+        media_type="text/plain; version=0.0.4",
+    )
+
+@app.get("/cache/stats")
+def cache_stats():
+    embedding_cache = get_embedding_cache(embedding_model_id())
+    embeddings = {"enabled": True, **embedding_cache.stats()} if embedding_cache else {"enabled": False}
+    if pipeline_cache is None:
+        return {"enabled": False, "embeddings": embeddings}
+    return {"enabled": True, **pipeline_cache.stats(), "embeddings": embeddings}
 
 class ChatRequest(BaseModel):
     task_id: str
     query: str
 
 @app.post("/chat")
-async def chat_interaction(request: ChatRequest):
+def chat_interaction(request: ChatRequest):
     task_id = request.task_id
     query = request.query
     try:
         if not client:
             return {"error": "Groq API key not configured."}
             
-        if task_id not in tasks or tasks[task_id]["status"] != "completed":
+        job = job_queue.get(task_id)
+        if job is None or job["state"] != COMPLETED:
             return {"error": "Podcast analysis not found or not completed."}
         
-        result = tasks[task_id]["result"]
-        topics = result["topics"]
-        sentences = result["sentences"]
-        embeddings = np.array(result["embeddings"])
+        summary, sentences = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))
+        if summary is None:
+            return {"error": "Podcast analysis not found or not completed."}
+        topics = summary["topics"]
+        embeddings = load_embeddings(embeddings_path(task_id))  # memory-mapped, no copy
+        if embeddings is None:
+            return {"error": "Embeddings for this podcast are missing. Please analyze it again."}
         
         # RAG: Find top 5 relevant chunks
         from core.embeddings import get_embeddings
-        query_embedding = get_embeddings([{"text": query}])[0].reshape(1, -1)
-        similarities = cosine_similarity(query_embedding, embeddings)[0]
-        top_indices = np.argsort(similarities)[-5:][::-1]
+        query_embedding = get_embeddings([{"text": query}])[0]
+        index = (
+            IVFIndex.load(index_prefix(task_id), embeddings.data, embeddings.scales)
+            or IVFIndex.build(embeddings.data, embeddings.scales)
+        )
+        top_indices, _ = index.search(query_embedding, k=5)
         
         relevant_context = "\n".join([f"[Chunk {i}]: {sentences[i]['text']}" for i in top_indices])
         summaries = "\n".join([f"Chapter {i+1}: {t['label']} - {t['summary']}" for i, t in enumerate(topics)])
@@ -153,6 +738,31 @@ async def chat_interaction(request: ChatRequest):
     except Exception as e:
         return {"error": str(e)}
 
+class SearchRequest(BaseModel):
+    query: str
+    k: int = 10
+
+@app.post("/search")
+def search_library(request: SearchRequest):
+    """
+    Semantic search over every analyzed episode
+    """
+    from core.embeddings import get_embeddings
+    query_embedding = get_embeddings([{"text": request.query}])[0]
+    hits = library_index.search(query_embedding, k=request.k)
+
+    indexes = {}
+    for hit in hits:
+        task_id = hit["task_id"]
+        if task_id not in indexes:
+            # only the hit sentences are read, not whole results
+            indexes[task_id] = load_result_index(result_prefix(task_id), lambda: job_queue.load_result(task_id))[1]
+        sentences = indexes[task_id]
+        if sentences is not None:
+            sentence = sentences[hit["sentence_index"]]
+            hit.update(text=sentence["text"], start=sentence["start"], end=sentence["end"])
+    return {"results": hits}
+
 @app.get("/")
 def home():
     return {"message": "The AI Engine is Ready for Work!"}
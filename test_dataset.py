@@ -1,26 +1,29 @@
+import json
 import os
-from core.preprocess import preprocess_audio
-from core.transcription import transcribe
-from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics_with_labels
+
+from core.batch import DONE, collect_inputs, run_batch
 
 DATA_DIR = "data"
+OUT_DIR = "outputs/dataset"
 
-for file in os.listdir(DATA_DIR):
-    if not file.endswith((".mp3", ".wav", ".m4a")):
-        continue
 
+def print_topics(record):
     print(f"\n==============================")
-    print(f"Processing: {file}")
+    print(f"Processed: {record['path']}")
     print(f"==============================")
 
-    audio_path = os.path.join(DATA_DIR, file)
+    if record["status"] != DONE:
+        print(f"❌ {record['error']}")
+        return
 
-    audio = preprocess_audio(audio_path)
-    sentences = transcribe(audio)
-    embeddings = get_embeddings(sentences)
-    topics = segment_topics_with_labels(sentences, embeddings)
+    with open(os.path.join(OUT_DIR, "results", record["result"]), "r", encoding="utf-8") as f:
+        topics = json.load(f)["topics"]
 
     for i, t in enumerate(topics):
         print(f"\n🟢 Topic {i+1}: {t['label']}")
-        print(f"Time: {t['start']:.2f} - {t['end']:.2f}")
\ No newline at end of file
+        print(f"Time: {t['start']:.2f} - {t['end']:.2f}")
+
+
+# pipelined across files and resumable; see batch.py for the full CLI
+summary = run_batch(collect_inputs([DATA_DIR]), OUT_DIR, on_file=print_topics)
+print(f"\n📊 {summary['audio_hours_per_wall_hour']} audio-hours per wall-hour")
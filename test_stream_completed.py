@@ -0,0 +1,82 @@
+"""
+/stream on a job that finished in batch mode: the stored (compact) topics
+are replayed as chapter events and the stream closes with "done". Then a
+streamed job whose chapters file is caught mid-write, in the middle of a
+multibyte character: the partial line is held back until it is complete.
+
+No models needed:
+    python test_stream_completed.py
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+work = tempfile.mkdtemp(prefix="stream_check_")
+os.environ["JOB_DIR"] = os.path.join(work, "jobs")
+os.environ["LIBRARY_INDEX_DIR"] = os.path.join(work, "library")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["ANALYSIS_WORKERS"] = "0"
+
+from fastapi.testclient import TestClient
+
+import main
+from core.job_queue import COMPLETED, RUNNING
+from core.result_index import compact_topics
+
+sentences = [{"text": f"Sentence {i}.", "start": 2.0 * i, "end": 2.0 * i + 1.5} for i in range(6)]
+topics = [
+    {"label": f"Topic {j}", "start": 6.0 * j, "end": 6.0 * j + 5.5, "summary": "s", "keywords": ["k"],
+     "sentiment": "Neutral 😐", "sentences": sentences[3 * j:3 * j + 3]}
+    for j in range(2)
+]
+task_id = "stream-check"
+main.job_queue.submit(task_id, "episode.wav", {})
+main.job_queue._write_result(task_id, {"full_text": "", "topics": compact_topics(topics), "sentences": sentences})
+with main.job_queue._db() as conn:
+    conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (COMPLETED, task_id))
+
+with TestClient(main.app).stream("GET", f"/stream/{task_id}") as response:
+    lines = [line for line in response.iter_lines() if line]
+
+events = [line.split(": ", 1)[1] for line in lines if line.startswith("event: ")]
+data = [json.loads(line.split(": ", 1)[1]) for line in lines if line.startswith("data: ")]
+assert events == ["chapter", "chapter", "done"], events
+assert [d["chapter"]["sentence_count"] for d in data[:2]] == [3, 3], data
+print("✅ /stream replays stored chapters:", events)
+
+task_id = "stream-partial"
+main.job_queue.submit(task_id, "episode.wav", {"mode": "stream"})
+with main.job_queue._db() as conn:
+    conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (RUNNING, task_id))
+written = [
+    json.dumps({"index": i, "chapter": {"sentiment": "Positive 😊"}}, ensure_ascii=False).encode("utf-8") + b"\n"
+    for i in range(2)
+]
+cut = written[1].index("😊".encode("utf-8")) + 2
+with open(main.chapters_path(task_id), "wb") as f:
+    f.write(written[0] + written[1][:cut])
+
+
+def finish_writing():
+    time.sleep(2 * main.STREAM_POLL_SECONDS)
+    with open(main.chapters_path(task_id), "ab") as f:
+        f.write(written[1][cut:])
+    with main.job_queue._db() as conn:
+        conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (COMPLETED, task_id))
+
+
+writer = threading.Thread(target=finish_writing)
+writer.start()
+with TestClient(main.app).stream("GET", f"/stream/{task_id}") as response:
+    lines = [line for line in response.iter_lines() if line]
+writer.join()
+
+events = [line.split(": ", 1)[1] for line in lines if line.startswith("event: ")]
+data = [json.loads(line.split(": ", 1)[1]) for line in lines if line.startswith("data: ")]
+chapters = [d for e, d in zip(events, data) if e == "chapter"]
+assert [c["index"] for c in chapters] == [0, 1], events
+assert chapters[1]["chapter"]["sentiment"] == "Positive 😊", chapters
+assert events[-1] == "done", events
+print("✅ /stream waits out a partially written chapter:", events)
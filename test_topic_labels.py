@@ -6,7 +6,7 @@ from core.topic_segmentation import segment_topics_with_labels
 RAW_AUDIO = "data/long_audio.mp3"
 
 audio = preprocess_audio(RAW_AUDIO)
-sentences = transcribe(audio)
+_, sentences = transcribe(audio)
 embeddings = get_embeddings(sentences)
 
 topics = segment_topics_with_labels(sentences, embeddings)
@@ -1,7 +1,7 @@
 from core.preprocess import preprocess_audio
 from core.transcription import transcribe
 from core.embeddings import get_embeddings
-from core.topic_segmentation import segment_topics
+from core.segment_topics import segment_topics
 
 RAW_AUDIO = "data/sample.mp3"
 
@@ -9,7 +9,7 @@ print("Preprocessing...")
 audio = preprocess_audio(RAW_AUDIO)
 
 print("Transcribing...")
-sentences = transcribe(audio)
+_, sentences = transcribe(audio)
 
 print("Creating embeddings...")
 embeddings = get_embeddings(sentences)
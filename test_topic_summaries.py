@@ -12,7 +12,7 @@ print("🔹 Preprocessing audio...")
 audio = preprocess_audio(RAW_AUDIO)
 
 print("🔹 Transcribing audio...")
-sentences = transcribe(audio)
+_, sentences = transcribe(audio)
 
 print("🔹 Creating sentence embeddings...")
 embeddings = get_embeddings(sentences)
@@ -30,6 +30,4 @@ for i, ch in enumerate(chapters, 1):
     print(f"Time: {ch['start']:.2f} - {ch['end']:.2f}")
     print(f"Summary: {ch['summary']}\n")
 
-from core.exporter import export_to_json
-
-export_to_json(chapters)
+export_to_json(chapters, "outputs/chapters.json")
@@ -8,7 +8,7 @@ print("🔹 Preprocessing audio...")
 processed_audio = preprocess_audio(RAW_AUDIO)
 
 print("🔹 Running Whisper transcription...")
-segments = transcribe(processed_audio)
+_, segments = transcribe(processed_audio)
 
 print("\n🔹 Transcription output (first 10 lines):\n")
 for seg in segments[:10]: